@@ -0,0 +1,77 @@
+"""
+Cold import time of the tool packages.
+
+Each target is imported in a fresh interpreter, so the numbers include every
+third-party module it drags in. Run from the repository root:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget 0.5 data_sources "from functional import TextUtils"
+
+With ``--budget`` the script exits non-zero if any target is slower, which
+makes a lazy-import regression visible in CI.
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TARGETS = [
+    "import data_sources",
+    "import functional",
+    "from data_sources import FMPUtils",
+    "from data_sources import YFinanceUtils",
+    "from functional import TextUtils",
+    "from functional import BackTraderUtils",
+]
+
+
+def time_import(statement: str, repeat: int) -> float | None:
+    """Median wall time of ``statement`` in a fresh interpreter, None if it fails."""
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"{statement}; "
+        "print(time.perf_counter() - t)"
+    )
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return None
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("targets", nargs="*", help="import statements or module names")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per target (median is reported)")
+    parser.add_argument("--budget", type=float, help="fail if any target takes longer, in seconds")
+    args = parser.parse_args()
+
+    targets = [
+        t if t.startswith(("import ", "from ")) else f"import {t}"
+        for t in args.targets or DEFAULT_TARGETS
+    ]
+    failed = False
+    width = max(len(t) for t in targets)
+    for target in targets:
+        seconds = time_import(target, args.repeat)
+        if seconds is None:
+            print(f"{target:<{width}}  import failed (missing dependency?)")
+            failed = True
+            continue
+        over = args.budget is not None and seconds > args.budget
+        failed |= over
+        print(f"{target:<{width}}  {seconds * 1000:8.1f} ms{'  over budget' if over else ''}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,31 @@
+import importlib
 import importlib.util
 
-from data_sources.finnhub_utils import FinnHubUtils
-from data_sources.yfinance_utils import YFinanceUtils
-from data_sources.fmp_utils import FMPUtils
-from data_sources.sec_utils import SECUtils
-from data_sources.reddit_utils import RedditUtils
+# Each tool is imported on first attribute access, so a process that needs
+# one data source does not pay for every client library at start-up.
+_MODULES = {
+    "FinnHubUtils": "data_sources.finnhub_utils",
+    "YFinanceUtils": "data_sources.yfinance_utils",
+    "FMPUtils": "data_sources.fmp_utils",
+    "SECUtils": "data_sources.sec_utils",
+    "RedditUtils": "data_sources.reddit_utils",
+    "FinNLPUtils": "data_sources.finnlp_utils",
+}
 
 
 __all__ = ["FinnHubUtils", "YFinanceUtils", "FMPUtils", "SECUtils"]
 
 if importlib.util.find_spec("finnlp") is not None:
-    from data_sources.finnlp_utils import FinNLPUtils
-    __all__.append("FinNLPUtils")
\ No newline at end of file
+    __all__.append("FinNLPUtils")
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_MODULES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
@@ -0,0 +1,190 @@
+import os
+import time
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Annotated, Any, Callable, Hashable, Optional
+
+from utils import record_io
+
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+_MISSING = object()
+
+# Writes between two sweeps of a disk tier.
+DISK_SWEEP_EVERY = 64
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a time-to-live.
+
+    Entries live in memory, bounded by ``maxsize`` (least recently used ones
+    are evicted first). With ``disk_path`` set, every entry is also pickled to
+    disk so that later processes can reuse it until it expires. Expired files
+    are removed when read, and every ``DISK_SWEEP_EVERY`` writes a sweep drops
+    expired files, then the oldest ones beyond ``disk_max_bytes`` or
+    ``disk_max_files``.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 512,
+        ttl: float = 3600,
+        disk_path: Optional[str] = None,
+        disk_max_bytes: int = 512 * 1024**2,
+        disk_max_files: int = 10000,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_max_files = disk_max_files
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._writes = 0
+
+    def _disk_file(self, key: Hashable) -> str:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.disk_path, f"{digest}.pkl")
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _read_disk(self, key: Hashable) -> Any:
+        path = self._disk_file(key)
+        if not os.path.exists(path):
+            return _MISSING
+        try:
+            with open(path, "rb") as f:
+                # The expiry is pickled ahead of the value, so it is read alone first.
+                expires_at = pickle.load(f)
+                if expires_at <= time.time():
+                    value = _MISSING
+                else:
+                    value = pickle.load(f)
+        except Exception:
+            value = _MISSING
+        if value is _MISSING:  # expired or unreadable
+            self._remove(path)
+            return _MISSING
+        self._remember(key, expires_at, value)
+        return value
+
+    def _write_disk(self, key: Hashable, expires_at: float, value: Any) -> None:
+        os.makedirs(self.disk_path, exist_ok=True)
+        path = self._disk_file(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(expires_at, f)
+            pickle.dump(value, f)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._writes += 1
+            sweep = self._writes % DISK_SWEEP_EVERY == 1
+        if sweep:
+            self.sweep_disk()
+
+    def _disk_files(self) -> list:
+        if not self.disk_path or not os.path.isdir(self.disk_path):
+            return []
+        return [
+            entry.path for entry in os.scandir(self.disk_path)
+            if entry.is_file() and entry.name.endswith(".pkl")
+        ]
+
+    def sweep_disk(self) -> None:
+        """Remove expired disk entries, then the oldest ones beyond the size and count budgets."""
+        now, kept = time.time(), []
+        for path in self._disk_files():
+            try:
+                with open(path, "rb") as f:
+                    expires_at = pickle.load(f)
+                stat = os.stat(path)
+            except Exception:  # unreadable, or removed meanwhile
+                expires_at, stat = None, None
+            if not isinstance(expires_at, (int, float)) or expires_at <= now:
+                self._remove(path)
+            elif stat is not None:
+                kept.append((stat.st_mtime, stat.st_size, path))
+        kept.sort()
+        total = sum(size for _, size, _ in kept)
+        count = len(kept)
+        for _, size, path in kept:
+            if total <= self.disk_max_bytes and count <= self.disk_max_files:
+                break
+            self._remove(path)
+            total -= size
+            count -= 1
+
+    def _remember(self, key: Hashable, expires_at: float, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value of key, or default if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+        if self.disk_path:
+            value = self._read_disk(key)
+            if value is not _MISSING:
+                return value
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._remember(key, expires_at, value)
+        if self.disk_path:
+            self._write_disk(key, expires_at, value)
+
+    def get_or_load(
+        self,
+        key: Annotated[Hashable, "cache key"],
+        loader: Annotated[Callable[[], Any], "computes the value on a miss"],
+        ttl: Annotated[Optional[float], "seconds to keep the value, default to the cache ttl"] = None,
+    ) -> Any:
+        """Cached value of key, calling loader at most once per key across threads on a miss."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            record_io(cache_hit=True)
+            return value
+        record_io(cache_hit=False)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Another thread may have loaded it while we waited.
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                value = loader()
+                self.set(key, value, ttl)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.disk_path:
+            self._remove(self._disk_file(key))
+
+    def clear(self) -> None:
+        """Drop every entry, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+        for path in self._disk_files():
+            self._remove(path)
@@ -1,13 +1,78 @@
 import os
 import finnhub
+import numpy as np
 import pandas as pd
 import json
 import random
+import threading
 from typing import Annotated
-from collections import defaultdict
 from functools import wraps
-from datetime import datetime
-from utils import decorate_all_methods, save_output, SavePathType
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from finnhub.exceptions import FinnhubAPIException
+from utils import decorate_all_methods, save_output, SavePathType, in_current_context, instrument, record_io
+from data_sources.http_utils import RETRY_STATUSES, TokenBucket, mount_pool
+from data_sources.cache_utils import TTLCache
+from data_sources.news_store import NEWS_STORE
+
+
+# Finnhub's per-minute quota (60 on the free tier). Every thread in the
+# process draws from the same bucket, so bulk jobs are paced instead of
+# failing with 429s.
+FINNHUB_RATE_LIMIT = int(os.environ.get("FINNHUB_RATE_LIMIT", 60))
+FINNHUB_RATE_LIMITER = TokenBucket(FINNHUB_RATE_LIMIT, per=60)
+
+_client = None
+_client_lock = threading.Lock()
+
+# Parsed company_basic_financials payloads, keyed by symbol.
+BASIC_FINANCIALS_CACHE = TTLCache(maxsize=1024, ttl=12 * 3600)
+
+
+class RateLimitedClient:
+    """finnhub.Client proxy that takes a token before each call and retries on 429."""
+
+    def __init__(self, client: finnhub.Client, limiter: TokenBucket, max_retries: int = 3):
+        self._client = client
+        self._limiter = limiter
+        self._max_retries = max_retries
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        @wraps(attr)
+        def call(*args, **kwargs):
+            for attempt in range(self._max_retries + 1):
+                self._limiter.acquire()
+                try:
+                    return attr(*args, **kwargs)
+                except FinnhubAPIException as e:
+                    if e.status_code != 429 or attempt == self._max_retries:
+                        raise
+                    # The quota is spent; wait for the bucket to refill.
+                    self._limiter.drain()
+
+        return call
+
+
+def get_finnhub_client() -> RateLimitedClient:
+    """Process-wide Finnhub client on a pooled keep-alive session."""
+    global _client
+    api_key = os.environ["FINNHUB_API_KEY"]
+    with _client_lock:
+        if _client is None or _client.api_key != api_key:
+            client = finnhub.Client(api_key=api_key)
+            # 429s are left to RateLimitedClient, which waits for the shared
+            # bucket to refill instead of retrying on its own backoff.
+            mount_pool(client._session, [s for s in RETRY_STATUSES if s != 429])
+            client._session.hooks["response"].append(
+                lambda response, *args, **kwargs: record_io(len(response.content))
+            )
+            _client = RateLimitedClient(client, FINNHUB_RATE_LIMITER)
+            print("Finnhub client initialized")
+        return _client
 
 
 def init_finnhub_client(func):
@@ -20,17 +85,44 @@ def init_finnhub_client(func):
             )
             return None
         else:
-            finnhub_client = finnhub.Client(api_key=os.environ["FINNHUB_API_KEY"])
-            print("Finnhub client initialized")
+            finnhub_client = get_finnhub_client()
             return func(*args, **kwargs)
 
     # wrapper.__annotations__ = func.__annotations__
     return wrapper
 
 
+@decorate_all_methods(instrument)
 @decorate_all_methods(init_finnhub_client)
 class FinnHubUtils:
 
+    def bulk_request(
+        method: Annotated[
+            str,
+            "name of a FinnHubUtils method whose first argument is the ticker symbol, e.g. 'get_company_news'",
+        ],
+        symbols: Annotated[list[str], "list of ticker symbols"],
+        kwargs: Annotated[
+            dict | None, "keyword arguments passed to every call, e.g. start_date and end_date"
+        ] = None,
+        max_workers: Annotated[int, "number of concurrent requests, default to 8"] = 8,
+    ) -> dict:
+        """
+        run one FinnHubUtils method for many symbols concurrently, paced by the shared rate limit
+        """
+        func = getattr(FinnHubUtils, method)
+        kwargs = kwargs or {}
+
+        def run(symbol):
+            try:
+                return func(symbol, **kwargs)
+            except Exception as e:
+                return f"Failed to run {method} for symbol {symbol}: {e}"
+
+        symbols = list(dict.fromkeys(symbols))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(symbols, executor.map(run, symbols)))
+
     def get_company_profile(symbol: Annotated[str, "ticker symbol"]) -> str:
         """
         get a company's profile information
@@ -69,7 +161,7 @@ class FinnHubUtils:
         """
         retrieve market news related to designated company
         """
-        news = finnhub_client.company_news(symbol, _from=start_date, to=end_date)
+        news = _company_news(symbol, start_date, end_date).to_dict("records")
         if len(news) == 0:
             print(f"No company news found for symbol {symbol} from finnhub!")
         news = [
@@ -82,13 +174,32 @@ class FinnHubUtils:
         ]
         # Randomly select a subset of news if the number of news exceeds the maximum
         if len(news) > max_news_num:
-            news = random.choices(news, k=max_news_num)
+            news = random.sample(news, k=max_news_num)
         news.sort(key=lambda x: x["date"])
         output = pd.DataFrame(news)
         save_output(output, f"company news of {symbol}", save_path=save_path)
 
         return output
 
+    def get_all_company_news(
+        symbol: Annotated[str, "ticker symbol"],
+        start_date: Annotated[str, "start date of the search period, yyyy-mm-dd"],
+        end_date: Annotated[str, "end date of the search period (inclusive), yyyy-mm-dd"],
+        window_days: Annotated[
+            int, "days covered by each company_news request, default to 7"
+        ] = 7,
+        max_workers: Annotated[
+            int, "number of windows fetched concurrently, default to 4"
+        ] = 4,
+        save_path: SavePathType = None,
+    ) -> pd.DataFrame:
+        """
+        retrieve every news article of a company in a date range, one row per unique article
+        """
+        output = _company_news(symbol, start_date, end_date, window_days, max_workers)
+        save_output(output, f"all company news of {symbol}", save_path=save_path)
+        return output
+
     def get_basic_financials_history(
         symbol: Annotated[str, "ticker symbol"],
         freq: Annotated[
@@ -115,19 +226,20 @@ class FinnHubUtils:
         if freq not in ["annual", "quarterly"]:
             return f"Invalid reporting frequency {freq}. Please specify either 'annual' or 'quarterly'."
 
-        basic_financials = finnhub_client.company_basic_financials(symbol, "all")
-        if not basic_financials["series"]:
+        basic_financials = _basic_financials(symbol)
+        if basic_financials is None:
             return f"Failed to find basic financials for symbol {symbol} from finnhub! Try a different symbol."
 
-        output_dict = defaultdict(dict)
-        for metric, value_list in basic_financials["series"][freq].items():
+        output_dict = {}
+        for metric, (periods, values) in basic_financials["series"].get(freq, {}).items():
             if selected_columns and metric not in selected_columns:
                 continue
-            for value in value_list:
-                if value["period"] >= start_date and value["period"] <= end_date:
-                    output_dict[metric].update({value["period"]: value["v"]})
+            lo = np.searchsorted(periods, start_date, side="left")
+            hi = np.searchsorted(periods, end_date, side="right")
+            if hi > lo:
+                output_dict[metric] = pd.Series(values[lo:hi], index=periods[lo:hi])
 
-        financials_output = pd.DataFrame(output_dict)
+        financials_output = pd.DataFrame(output_dict).sort_index(ascending=False)
         financials_output = financials_output.rename_axis(index="date")
         save_output(financials_output, "basic financials", save_path=save_path)
 
@@ -143,18 +255,103 @@ class FinnHubUtils:
         """
         get latest basic financials for a designated company
         """
-        basic_financials = finnhub_client.company_basic_financials(symbol, "all")
-        if not basic_financials["series"]:
+        basic_financials = _basic_financials(symbol)
+        if basic_financials is None:
             return f"Failed to find basic financials for symbol {symbol} from finnhub! Try a different symbol."
 
-        output_dict = basic_financials["metric"]
-        for metric, value_list in basic_financials["series"]["quarterly"].items():
-            value = value_list[0]
-            output_dict.update({metric: value["v"]})
-
-        for k in output_dict.keys():
-            if selected_columns and k not in selected_columns:
-                output_dict.pop(k)
+        output_dict = _latest_financials(basic_financials)
+        if selected_columns:
+            output_dict = {k: v for k, v in output_dict.items() if k in selected_columns}
 
         return json.dumps(output_dict, indent=2)
 
+    def get_basic_financials_panel(
+        symbols: Annotated[list[str], "list of ticker symbols"],
+        selected_columns: Annotated[
+            list[str] | None,
+            "List of metric names to keep, same choices as get_basic_financials. Default to all",
+        ] = None,
+        max_workers: Annotated[int, "number of concurrent requests, default to 8"] = 8,
+    ) -> pd.DataFrame:
+        """
+        get latest basic financials of many companies as one symbol x metric table for screening
+        """
+        symbols = list(dict.fromkeys(symbols))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            parsed = dict(
+                zip(symbols, executor.map(in_current_context(_basic_financials), symbols))
+            )
+
+        panel = pd.DataFrame.from_dict(
+            {
+                symbol: _latest_financials(financials)
+                for symbol, financials in parsed.items()
+                if financials is not None
+            },
+            orient="index",
+        )
+        if selected_columns:
+            panel = panel.reindex(columns=selected_columns)
+        return panel.rename_axis(index="symbol")
+
+
+def _company_news(
+    symbol: str,
+    start_date: str,
+    end_date: str,
+    window_days: int = 7,
+    max_workers: int = 4,
+) -> pd.DataFrame:
+    """
+    Articles of [start_date, end_date] from the local news store.
+
+    Finnhub caps the articles returned per call, so uncovered days are requested
+    in windows of ``window_days``, concurrently and within the shared rate limit.
+    """
+
+    def fetch(window_start: str, window_end: str) -> pd.DataFrame:
+        last_day = (date.fromisoformat(window_end) - timedelta(days=1)).isoformat()
+        return pd.DataFrame(finnhub_client.company_news(symbol, _from=window_start, to=last_day))
+
+    end = (date.fromisoformat(end_date) + timedelta(days=1)).isoformat()
+    return NEWS_STORE.get(symbol, start_date, end, fetch, window_days, max_workers)
+
+
+def _basic_financials(symbol: str) -> dict | None:
+    """
+    Parsed company_basic_financials payload of a symbol, shared by every method.
+
+    Each series is kept as a pair of period-sorted arrays, ``(periods, values)``,
+    per frequency and metric, so slicing by date range is a searchsorted.
+    Returns None if Finnhub has no series for the symbol.
+    """
+
+    def load():
+        payload = finnhub_client.company_basic_financials(symbol, "all")
+        if not payload or not payload.get("series"):
+            return None
+        series = {}
+        for freq, metrics in payload["series"].items():
+            series[freq] = {}
+            for metric, value_list in metrics.items():
+                periods = np.array([value["period"] for value in value_list], dtype=str)
+                values = np.array(
+                    [value["v"] for value in value_list], dtype=np.float64
+                )
+                order = np.argsort(periods, kind="stable")
+                series[freq][metric] = (periods[order], values[order])
+        return {"metric": payload.get("metric") or {}, "series": series}
+
+    parsed = BASIC_FINANCIALS_CACHE.get_or_load(symbol, load)
+    if parsed is None:
+        BASIC_FINANCIALS_CACHE.invalidate(symbol)
+    return parsed
+
+
+def _latest_financials(basic_financials: dict) -> dict:
+    """Snapshot metrics overlaid with the latest quarterly value of every series."""
+    output_dict = dict(basic_financials["metric"])
+    for metric, (periods, values) in basic_financials["series"].get("quarterly", {}).items():
+        if len(values):
+            output_dict[metric] = None if np.isnan(values[-1]) else float(values[-1])
+    return output_dict
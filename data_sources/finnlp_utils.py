@@ -1,6 +1,12 @@
 import os
+import json
+import shutil
+import hashlib
+import threading
+import pandas as pd
 from typing import Annotated
 from pandas import DataFrame
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from FinNLP.data_sources.news.cnbc_streaming import CNBC_Streaming
 from FinNLP.data_sources.news.yicai_streaming import Yicai_Streaming
@@ -15,6 +21,7 @@ from FinNLP.data_sources.news.sina_finance_date_range import Sina_Finance_Date_R
 from FinNLP.data_sources.news.finnhub_date_range import Finnhub_Date_Range
 
 from utils import save_output, SavePathType
+from data_sources.cache_utils import CACHE_PATH
 
 US_Proxy = {
     "use_proxy": "us_free",
@@ -28,7 +35,7 @@ CN_Proxy = {
 }
 
 
-def streaming_download(streaming, config, tag, keyword, rounds, selected_columns, save_path):
+def run_streaming(streaming, config, keyword, rounds):
     downloader = streaming(config)
     if hasattr(downloader, 'download_streaming_search'):
         downloader.download_streaming_search(keyword, rounds)
@@ -36,8 +43,13 @@ def streaming_download(streaming, config, tag, keyword, rounds, selected_columns
         downloader.download_streaming_stock(keyword, rounds)
     else:
         downloader.download_streaming_all(rounds)
-    # print(downloader.dataframe.columns)
-    selected = downloader.dataframe[selected_columns]
+    return downloader.dataframe
+
+
+def streaming_download(streaming, config, tag, keyword, rounds, selected_columns, save_path):
+    dataframe = run_streaming(streaming, config, keyword, rounds)
+    # print(dataframe.columns)
+    selected = dataframe[selected_columns]
     save_output(selected, tag, save_path)
     return selected
 
@@ -56,6 +68,102 @@ def date_range_download(date_range, config, tag, start_date, end_date, stock, se
     return selected_news
 
 
+STREAMING_SOURCES = {
+    "cnbc": CNBC_Streaming,
+    "yicai": Yicai_Streaming,
+    "investorplace": InvestorPlace_Streaming,
+    "xueqiu": Xueqiu_Streaming,
+    "stocktwits": Stocktwits_Streaming,
+}
+
+CRAWL_PATH = os.path.join(CACHE_PATH, "finnlp_crawl")
+
+# Columns that identify a record, in order of preference.
+DEDUP_KEYS = ["id", "url", "docid", "link"]
+
+
+def _record_key(record: dict) -> str:
+    for key in DEDUP_KEYS:
+        if record.get(key) not in (None, ""):
+            return f"{key}:{record[key]}"
+    return hashlib.sha1(json.dumps(record, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class StreamingCrawl:
+    """
+    State of one crawl run kept under ``crawl_dir``: one JSON-lines file of
+    de-duplicated records per source, each tagged with the keyword that found
+    it, plus a manifest of the (source, keyword, rounds) jobs already
+    completed so a restarted run skips them. The directory is discarded once
+    every job of the run has completed, so a later run crawls fresh news.
+    """
+
+    def __init__(self, crawl_dir: str):
+        self.crawl_dir = crawl_dir
+        self._lock = threading.Lock()
+        os.makedirs(crawl_dir, exist_ok=True)
+        self.manifest_path = os.path.join(crawl_dir, "manifest.json")
+        self.completed = set()
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r") as f:
+                self.completed = set(json.load(f))
+        self.seen = {
+            source: {_record_key(record) for record in self._read(source)}
+            for source in STREAMING_SOURCES
+        }
+
+    def _records_path(self, source: str) -> str:
+        return os.path.join(self.crawl_dir, f"{source}.jsonl")
+
+    def _read(self, source: str) -> list:
+        path = self._records_path(source)
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    @staticmethod
+    def job_id(source: str, keyword: str, rounds: int) -> str:
+        return f"{source}|{keyword}|{rounds}"
+
+    def append(self, source: str, keyword: str, rounds: int, frame: DataFrame) -> int:
+        """Append the unseen records of a finished job to disk and mark the job done."""
+        records = json.loads(frame.to_json(orient="records", force_ascii=False, date_format="iso"))
+        with self._lock:
+            new_records = []
+            for record in records:
+                key = _record_key(record)
+                if key not in self.seen[source]:
+                    self.seen[source].add(key)
+                    record["keyword"] = keyword
+                    new_records.append(record)
+            with open(self._records_path(source), "a", encoding="utf-8") as f:
+                for record in new_records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.completed.add(self.job_id(source, keyword, rounds))
+            tmp_path = self.manifest_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(sorted(self.completed), f)
+            os.replace(tmp_path, self.manifest_path)
+        return len(new_records)
+
+    def records(self, source: str, keywords: list[str] | None = None) -> DataFrame:
+        """Stored records of source, only those found by one of keywords if given."""
+        records = self._read(source)
+        if keywords is not None:
+            records = [record for record in records if record.get("keyword") in keywords]
+        return DataFrame(records)
+
+    def discard(self) -> None:
+        shutil.rmtree(self.crawl_dir, ignore_errors=True)
+
+
+def crawl_id_of(sources: list[str], keywords: list[str], rounds: int) -> str:
+    """Default crawl id: the same request resumes the same unfinished run."""
+    request = json.dumps([sorted(sources), sorted(keywords), rounds])
+    return hashlib.sha1(request.encode()).hexdigest()[:16]
+
+
 class FinNLPUtils:
 
     """
@@ -100,6 +208,56 @@ class FinNLPUtils:
     #     return streaming_download(Eastmoney_Streaming, "Eastmoney", stock, pages, selected_columns, save_path)
 
 
+    def multi_source_download(
+            keywords: Annotated[list[str], "Keywords (or stock symbols for social media sources) to crawl"],
+            sources: Annotated[list[str], "Streaming sources to crawl, chosen from 'cnbc', 'yicai', 'investorplace', 'xueqiu', 'stocktwits'. Default to all"] = list(STREAMING_SOURCES),
+            rounds: Annotated[int, "Number of rounds to search per keyword and source. Default to 1"] = 1,
+            crawl_id: Annotated[str | None, "Name of the crawl run; an interrupted run is resumed by calling again with the same id. Default to an id derived from sources, keywords and rounds"] = None,
+            max_workers: Annotated[int, "Number of (source, keyword) jobs crawled concurrently. Default to 4"] = 4,
+            save_path: SavePathType = None
+        ) -> DataFrame:
+        """Crawl several streaming sources for several keywords concurrently, resumable and de-duplicated"""
+        crawl_id = crawl_id or crawl_id_of(sources, keywords, rounds)
+        crawl = StreamingCrawl(os.path.join(CRAWL_PATH, crawl_id))
+        jobs = [
+            (source, keyword)
+            for source in sources
+            for keyword in keywords
+            if crawl.job_id(source, keyword, rounds) not in crawl.completed
+        ]
+        # FinNLP pages through the rounds of a search internally, so a job
+        # (all rounds of one source and keyword) is the unit that is
+        # checkpointed and skipped on resume.
+        failed = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(run_streaming, STREAMING_SOURCES[source], {}, keyword, rounds): (source, keyword)
+                for source, keyword in jobs
+            }
+            for future in as_completed(futures):
+                source, keyword = futures[future]
+                try:
+                    added = crawl.append(source, keyword, rounds, future.result())
+                    print(f"{source} / {keyword}: {added} new records")
+                except Exception as e:
+                    failed.append((source, keyword))
+                    print(f"{source} / {keyword} failed, will retry on the next run with crawl_id={crawl_id!r}: {e}")
+
+        frames = []
+        for source in sources:
+            records = crawl.records(source, keywords)
+            if not records.empty:
+                records.insert(0, "source", source)
+                frames.append(records)
+        output = pd.concat(frames, ignore_index=True) if frames else DataFrame()
+        # Only an unfinished run is kept for resuming; a finished one must not
+        # make later calls skip their jobs and return stale records.
+        if not failed:
+            crawl.discard()
+        save_output(output, "Multi-source crawl", save_path)
+        return output
+
+
     """
     Date Range News Download
     """
@@ -1,14 +1,31 @@
 import os
-import requests
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from utils import decorate_all_methods, get_next_weekday
+from concurrent.futures import ThreadPoolExecutor
+from utils import decorate_all_methods, get_next_weekday, in_current_context, instrument
+from data_sources.http_utils import cached_get, ttl_for
+from data_sources.cache_utils import TTLCache
 
 from functools import wraps
 from typing import Annotated
 
 
+# How long each FMP endpoint's responses are served from the local cache.
+FMP_CACHE_TTLS = {
+    "historical-market-capitalization": 7 * 24 * 3600,
+    "price-target": 24 * 3600,
+    "sec_filings": 24 * 3600,
+    "key-metrics": 24 * 3600,
+    "income-statement": 24 * 3600,
+    "ratios": 24 * 3600,
+}
+
+
+def _get(url: str):
+    return cached_get(url, ttl=ttl_for(url, FMP_CACHE_TTLS))
+
+
 def init_fmp_api(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -24,6 +41,7 @@ def init_fmp_api(func):
     return wrapper
 
 
+@decorate_all_methods(instrument)
 @decorate_all_methods(init_fmp_api)
 class FMPUtils:
 
@@ -36,33 +54,35 @@ class FMPUtils:
         date: Annotated[str, "date of the target price, should be 'yyyy-mm-dd'"],
     ) -> str:
         """Get the target price for a given stock on a given date"""
-        # API URL
-        url = f"https://financialmodelingprep.com/api/v4/price-target?symbol={ticker_symbol}&apikey={fmp_api_key}"
-
-        price_target = "Not Given"
-        response = requests.get(url)
+        series = _price_target_series(ticker_symbol)
+        if isinstance(series, str):
+            return series
+        return _target_price_around(*series, np.datetime64(date, "D"))
 
-        if response.status_code == 200:
-            data = response.json()
-            est = []
-
-            date = datetime.strptime(date, "%Y-%m-%d")
-            for tprice in data:
-                tdate = tprice["publishedDate"].split("T")[0]
-                tdate = datetime.strptime(tdate, "%Y-%m-%d")
-                if abs((tdate - date).days) <= 1:
-                    est.append(tprice["priceTarget"])
-
-            if est:
-                price_target = f"{np.min(est)} - {np.max(est)} (md. {np.median(est)})"
+    def get_target_price_batch(
+        queries: Annotated[
+            list[tuple[str, str]], "(ticker symbol, 'yyyy-mm-dd' date) pairs"
+        ],
+        max_workers: Annotated[int, "number of concurrent symbol fetches, default to 8"] = 8,
+    ) -> pd.DataFrame:
+        """Get the target price for many (stock, date) pairs, fetching each stock's history once"""
+        series = _load_series(_price_target_series, queries, max_workers)
+        results = []
+        for symbol, date in queries:
+            if isinstance(series[symbol], str):
+                results.append(series[symbol])
             else:
-                price_target = "N/A"
-        else:
-            return f"Failed to retrieve data: {response.status_code}"
-
-        return price_target
+                results.append(
+                    _target_price_around(*series[symbol], np.datetime64(date, "D"))
+                )
+        return pd.DataFrame(
+            {
+                "symbol": [q[0] for q in queries],
+                "date": [q[1] for q in queries],
+                "target_price": results,
+            }
+        )
 
-    
     def get_sec_report(
         ticker_symbol: Annotated[str, "ticker symbol"],
         fyear: Annotated[
@@ -75,7 +95,8 @@ class FMPUtils:
         url = f"https://financialmodelingprep.com/api/v3/sec_filings/{ticker_symbol}?type=10-k&page=0&apikey={fmp_api_key}"
 
         filing_url = None
-        response = requests.get(url)
+        filing_date = None
+        response = _get(url)
 
         if response.status_code == 200:
             data = response.json()
@@ -104,7 +125,7 @@ class FMPUtils:
         url = f"https://financialmodelingprep.com/api/v3/historical-market-capitalization/{ticker_symbol}?limit=100&from={date}&to={date}&apikey={fmp_api_key}"
 
         mkt_cap = None
-        response = requests.get(url)
+        response = _get(url)
 
         if response.status_code == 200:
             data = response.json()
@@ -119,73 +140,187 @@ class FMPUtils:
         target_date: Annotated[str, "date of the BVPS, should be 'yyyy-mm-dd'"],
     ) -> str:
         """Get the historical book value per share for a given stock on a given date"""
-        url = f"https://financialmodelingprep.com/api/v3/key-metrics/{ticker_symbol}?limit=40&apikey={fmp_api_key}"
-        response = requests.get(url)
-        data = response.json()
-
-        if not data:
-            return "No data available"
+        series = _bvps_series(ticker_symbol)
+        if isinstance(series, str):
+            return series
+        dates, values = series
+        return values[_closest_dates(dates, np.array([target_date], dtype="datetime64[D]"))[0]]
 
-        closest_data = None
-        min_date_diff = float("inf")
-        target_date = datetime.strptime(target_date, "%Y-%m-%d")
-        for entry in data:
-            date_of_data = datetime.strptime(entry["date"], "%Y-%m-%d")
-            date_diff = abs(target_date - date_of_data).days
-            if date_diff < min_date_diff:
-                min_date_diff = date_diff
-                closest_data = entry
-
-        if closest_data:
-            return closest_data.get("bookValuePerShare", "No BVPS data available")
-        else:
-            return "No close date data found"
+    def get_historical_bvps_batch(
+        queries: Annotated[
+            list[tuple[str, str]], "(ticker symbol, 'yyyy-mm-dd' date) pairs"
+        ],
+        max_workers: Annotated[int, "number of concurrent symbol fetches, default to 8"] = 8,
+    ) -> pd.DataFrame:
+        """Get the historical book value per share for many (stock, date) pairs, fetching each stock's key metrics once"""
+        series = _load_series(_bvps_series, queries, max_workers)
+        frame = pd.DataFrame(
+            {
+                "symbol": [q[0] for q in queries],
+                "date": [q[1] for q in queries],
+                "bvps": None,
+            },
+            dtype=object,
+        )
+        for symbol, rows in frame.groupby("symbol").groups.items():
+            if isinstance(series[symbol], str):
+                frame.loc[rows, "bvps"] = series[symbol]
+                continue
+            dates, values = series[symbol]
+            targets = frame.loc[rows, "date"].to_numpy(dtype="datetime64[D]")
+            frame.loc[rows, "bvps"] = pd.Series(
+                [values[i] for i in _closest_dates(dates, targets)], index=rows, dtype=object
+            )
+        return frame
 
-    
     def get_financial_metrics(
-        ticker_symbol: Annotated[str, "ticker symbol"],
+        ticker_symbol: Annotated[
+            str | list[str], "ticker symbol, or a list of ticker symbols"
+        ],
         years: Annotated[int, "number of the years to search from, default to 4"] = 4,
+        max_workers: Annotated[
+            int, "number of concurrent requests, default to 8"
+        ] = 8,
     ) -> pd.DataFrame:
-        """Get the financial metrics for a given stock for the last 'years' years"""
-        # Base URL setup for FMP API
-        base_url = "https://financialmodelingprep.com/api/v3"
-        # Create DataFrame
-        df = pd.DataFrame()
-
-        # Iterate over the last 'years' years of data
-        for year_offset in range(years):
-            # Construct URL for income statement and ratios for each year
-            income_statement_url = f"{base_url}/income-statement/{ticker_symbol}?limit={years}&apikey={fmp_api_key}"
-            ratios_url = (
-                f"{base_url}/ratios/{ticker_symbol}?limit={years}&apikey={fmp_api_key}"
+        """Get the financial metrics for a given stock (or stocks) for the last 'years' years"""
+        symbols = [ticker_symbol] if isinstance(ticker_symbol, str) else list(ticker_symbol)
+
+        # Income statement, ratios and key metrics are each requested once per
+        # symbol, all of them concurrently.
+        requests_to_make = [
+            (symbol, endpoint) for symbol in symbols for endpoint in FINANCIAL_METRICS_ENDPOINTS
+        ]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            responses = executor.map(
+                in_current_context(lambda job: _fetch_json(job[1], job[0], years)),
+                requests_to_make,
             )
-            key_metrics_url = f"{base_url}/key-metrics/{ticker_symbol}?limit={years}&apikey={fmp_api_key}"
-
-            # Requesting data from the API
-            income_data = requests.get(income_statement_url).json()
-            key_metrics_data = requests.get(key_metrics_url).json()
-            ratios_data = requests.get(ratios_url).json()
-
-            # Extracting needed metrics for each year
-            if income_data and key_metrics_data and ratios_data:
-                metrics = {
-                    "Operating Revenue": income_data[year_offset]["revenue"] / 1e6,
-                    "Adjusted Net Profit": income_data[year_offset]["netIncome"] / 1e6,
-                    "Adjusted EPS": income_data[year_offset]["eps"],
-                    "EBIT Margin": ratios_data[year_offset]["ebitPerRevenue"],
-                    "ROE": key_metrics_data[year_offset]["roe"],
-                    "PE Ratio": ratios_data[year_offset]["priceEarningsRatio"],
-                    "EV/EBITDA": key_metrics_data[year_offset][
-                        "enterpriseValueOverEBITDA"
-                    ],
-                    "PB Ratio": key_metrics_data[year_offset]["pbRatio"],
-                }
-                # Append the year and metrics to the DataFrame
-                # Extracting the year from the date
-                year = income_data[year_offset]["date"][:4]
-                df[year] = pd.Series(metrics)
-
-        df = df.sort_index(axis=1)
-        df = df.round(2)
-
-        return df
\ No newline at end of file
+            fetched = dict(zip(requests_to_make, responses))
+
+        tables = {
+            symbol: _financial_metrics_table(
+                *[fetched[(symbol, endpoint)] for endpoint in FINANCIAL_METRICS_ENDPOINTS],
+                years,
+            )
+            for symbol in symbols
+        }
+        if isinstance(ticker_symbol, str):
+            return tables[ticker_symbol]
+        return pd.concat(tables, names=["Ticker", "Metric"]).sort_index(axis=1)
+
+
+FMP_BASE_URL = "https://financialmodelingprep.com/api/v3"
+
+FINANCIAL_METRICS_ENDPOINTS = ["income-statement", "ratios", "key-metrics"]
+
+
+# Parsed, date-sorted per-symbol series, shared by the single and batch lookups.
+SERIES_CACHE = TTLCache(maxsize=4096, ttl=24 * 3600)
+
+
+def _price_target_series(ticker_symbol: str):
+    """(sorted publication dates, target prices) of a symbol, or an error string."""
+
+    def load():
+        url = f"https://financialmodelingprep.com/api/v4/price-target?symbol={ticker_symbol}&apikey={fmp_api_key}"
+        response = _get(url)
+        if response.status_code != 200:
+            return f"Failed to retrieve data: {response.status_code}"
+        data = response.json()
+        dates = np.array(
+            [tprice["publishedDate"].split("T")[0] for tprice in data], dtype="datetime64[D]"
+        )
+        targets = np.array([tprice["priceTarget"] for tprice in data])
+        order = np.argsort(dates, kind="stable")
+        return dates[order], targets[order]
+
+    series = SERIES_CACHE.get_or_load(("price-target", ticker_symbol), load)
+    if isinstance(series, str):  # errors are not worth remembering
+        SERIES_CACHE.invalidate(("price-target", ticker_symbol))
+    return series
+
+
+def _target_price_around(dates: np.ndarray, targets: np.ndarray, date: np.datetime64) -> str:
+    """Range and median of the targets published within a day of date."""
+    lo = np.searchsorted(dates, date - 1, side="left")
+    hi = np.searchsorted(dates, date + 1, side="right")
+    est = targets[lo:hi]
+    if not len(est):
+        return "N/A"
+    return f"{np.min(est)} - {np.max(est)} (md. {np.median(est)})"
+
+
+def _bvps_series(ticker_symbol: str):
+    """(sorted report dates, book values per share) of a symbol, or an error string."""
+
+    def load():
+        url = f"https://financialmodelingprep.com/api/v3/key-metrics/{ticker_symbol}?limit=40&apikey={fmp_api_key}"
+        data = _get(url).json()
+        if not data:
+            return "No data available"
+        dates = np.array([entry["date"] for entry in data], dtype="datetime64[D]")
+        values = np.array(
+            [entry.get("bookValuePerShare", "No BVPS data available") for entry in data],
+            dtype=object,
+        )
+        order = np.argsort(dates, kind="stable")
+        return dates[order], values[order]
+
+    series = SERIES_CACHE.get_or_load(("key-metrics", ticker_symbol), load)
+    if isinstance(series, str):  # errors are not worth remembering
+        SERIES_CACHE.invalidate(("key-metrics", ticker_symbol))
+    return series
+
+
+def _closest_dates(dates: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Index of the closest of the sorted dates to each target; ties go to the later date."""
+    right = np.clip(np.searchsorted(dates, targets, side="left"), 0, len(dates) - 1)
+    left = np.clip(right - 1, 0, len(dates) - 1)
+    left_gap = np.abs(targets - dates[left])
+    right_gap = np.abs(dates[right] - targets)
+    return np.where(right_gap <= left_gap, right, left)
+
+
+def _load_series(loader, queries: list, max_workers: int) -> dict:
+    """Load each distinct symbol of the queries once, concurrently."""
+    symbols = list(dict.fromkeys(symbol for symbol, _ in queries))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(symbols, executor.map(in_current_context(loader), symbols)))
+
+
+def _fetch_json(endpoint: str, ticker_symbol: str, limit: int) -> list:
+    url = f"{FMP_BASE_URL}/{endpoint}/{ticker_symbol}?limit={limit}&apikey={fmp_api_key}"
+    return _get(url).json()
+
+
+def _financial_metrics_table(
+    income_data: list, ratios_data: list, key_metrics_data: list, years: int
+) -> pd.DataFrame:
+    """Year-by-metric table built from already fetched FMP statements."""
+    df = pd.DataFrame()
+    if not (
+        isinstance(income_data, list)
+        and isinstance(ratios_data, list)
+        and isinstance(key_metrics_data, list)
+    ):
+        return df
+
+    for year_offset in range(min(years, len(income_data), len(ratios_data), len(key_metrics_data))):
+        metrics = {
+            "Operating Revenue": income_data[year_offset]["revenue"] / 1e6,
+            "Adjusted Net Profit": income_data[year_offset]["netIncome"] / 1e6,
+            "Adjusted EPS": income_data[year_offset]["eps"],
+            "EBIT Margin": ratios_data[year_offset]["ebitPerRevenue"],
+            "ROE": key_metrics_data[year_offset]["roe"],
+            "PE Ratio": ratios_data[year_offset]["priceEarningsRatio"],
+            "EV/EBITDA": key_metrics_data[year_offset]["enterpriseValueOverEBITDA"],
+            "PB Ratio": key_metrics_data[year_offset]["pbRatio"],
+        }
+        # Extracting the year from the date
+        year = income_data[year_offset]["date"][:4]
+        df[year] = pd.Series(metrics)
+
+    df = df.sort_index(axis=1)
+    df = df.round(2)
+
+    return df
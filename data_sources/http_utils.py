@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from urllib3.util.retry import Retry
+from typing import Annotated, Dict, Optional
+
+from data_sources.cache_utils import CACHE_PATH, TTLCache
+from utils import record_io
+
+
+HTTP_CACHE_PATH = os.path.join(CACHE_PATH, "http")
+
+# Query parameters that carry credentials; they never reach a cache key.
+SECRET_PARAMS = {"apikey", "api_key", "token", "access_token"}
+
+DEFAULT_TIMEOUT = 30
+
+RESPONSE_CACHE = TTLCache(maxsize=1024, ttl=3600, disk_path=HTTP_CACHE_PATH)
+
+_session = None
+_session_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def pooled_adapter(retry_statuses=RETRY_STATUSES) -> HTTPAdapter:
+    """Connection-pooling adapter that retries retry_statuses a bounded number of times with backoff."""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=list(retry_statuses),
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+
+
+def mount_pool(session: requests.Session, retry_statuses=RETRY_STATUSES) -> requests.Session:
+    adapter = pooled_adapter(retry_statuses)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Process-wide keep-alive session with bounded, backed-off retries."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = mount_pool(requests.Session())
+        return _session
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: at most ``rate`` calls per ``per`` seconds, with
+    bursts of up to ``capacity``. ``acquire`` blocks until a token is free, so
+    threads sharing a bucket are paced rather than rejected.
+    """
+
+    def __init__(self, rate: float, per: float = 60.0, capacity: Optional[float] = None):
+        self.rate = rate / per
+        self.capacity = rate if capacity is None else capacity
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after the server answered 429."""
+        with self._lock:
+            self.tokens = 0.0
+            self.updated = time.monotonic()
+
+
+def cache_key(url: str) -> str:
+    """The url with credential parameters removed and the query sorted."""
+    parts = urlsplit(url)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in SECRET_PARAMS
+    )
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class CachedResponse:
+    """The parts of a requests.Response callers use, in a picklable form."""
+
+    def __init__(self, status_code: int, content: bytes, url: str = ""):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def ttl_for(url: str, ttls: Dict[str, float], default: float = 3600) -> float:
+    """TTL of the first ``ttls`` entry whose key appears in the url path."""
+    path = urlsplit(url).path
+    for fragment, ttl in ttls.items():
+        if fragment in path:
+            return ttl
+    return default
+
+
+def cached_get(
+    url: Annotated[str, "request url, credentials included"],
+    ttl: Annotated[Optional[float], "seconds to cache a 200 response, 0 disables caching"] = None,
+    timeout: Annotated[float, "request timeout in seconds"] = DEFAULT_TIMEOUT,
+    **kwargs,
+) -> CachedResponse:
+    """GET through the shared session, answering from the on-disk response cache when fresh."""
+    key = cache_key(url)
+    if ttl != 0:
+        cached = RESPONSE_CACHE.get(key)
+        if cached is not None:
+            with _stats_lock:
+                _stats["hits"] += 1
+            record_io(cache_hit=True)
+            return cached
+
+    with _stats_lock:
+        _stats["misses"] += 1
+    response = get_session().get(url, timeout=timeout, **kwargs)
+    record_io(len(response.content), cache_hit=False if ttl != 0 else None)
+    result = CachedResponse(response.status_code, response.content, key)
+    if response.status_code == 200 and ttl != 0:
+        RESPONSE_CACHE.set(key, result, ttl)
+    return result
+
+
+def cache_stats() -> Dict[str, float]:
+    """Hit/miss counters of the response cache since start-up."""
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / total if total else 0.0
+    return stats
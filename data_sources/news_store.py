@@ -0,0 +1,157 @@
+import os
+import json
+import threading
+import pandas as pd
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Annotated, Callable, List
+
+from data_sources.price_store import CACHE_PATH, USE_PARQUET, merge_ranges, missing_ranges
+from utils import in_current_context, record_io
+
+
+NEWS_STORE_PATH = os.path.join(CACHE_PATH, "news_store")
+
+
+def split_range(start: str, end: str, days: int) -> List[List[str]]:
+    """Split [start, end) into consecutive windows of at most ``days`` days."""
+    windows, cursor = [], date.fromisoformat(start)
+    stop = date.fromisoformat(end)
+    while cursor < stop:
+        window_end = min(cursor + timedelta(days=days), stop)
+        windows.append([cursor.isoformat(), window_end.isoformat()])
+        cursor = window_end
+    return windows
+
+
+class NewsStore:
+    """
+    On-disk store of news articles, one partition file per fetched window,
+    de-duplicated by article id when read.
+
+    Like ``PriceStore``, each symbol keeps a ``coverage.json`` of the [start, end)
+    day ranges already fetched, so overlapping queries only fetch the new days.
+    Ranges reaching today stay uncovered, as today's news is still coming in.
+    """
+
+    def __init__(self, root: str = NEWS_STORE_PATH):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol.replace("/", "_"))
+
+    def _partition_path(self, symbol: str, window: List[str]) -> str:
+        ext = "parquet" if USE_PARQUET else "pkl"
+        return os.path.join(self._symbol_dir(symbol), "articles", f"{window[0]}_{window[1]}.{ext}")
+
+    def coverage(self, symbol: str) -> List[List[str]]:
+        path = os.path.join(self._symbol_dir(symbol), "coverage.json")
+        if not os.path.exists(path):
+            return []
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _save_coverage(self, symbol: str, ranges: List[List[str]]) -> None:
+        path = os.path.join(self._symbol_dir(symbol), "coverage.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(merge_ranges(ranges), f)
+        os.replace(tmp_path, path)
+
+    def _load(self, symbol: str, start: str, end: str) -> pd.DataFrame:
+        directory = os.path.join(self._symbol_dir(symbol), "articles")
+        ext = "parquet" if USE_PARQUET else "pkl"
+        # Windows are cut on the source's local days, so a day of margin keeps
+        # articles published near a boundary within reach of the UTC filter.
+        low = (date.fromisoformat(start) - timedelta(days=1)).isoformat()
+        high = (date.fromisoformat(end) + timedelta(days=1)).isoformat()
+        paths = []
+        for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+            if not name.endswith(f".{ext}"):
+                continue
+            window_start, _, window_end = name[: -len(ext) - 1].partition("_")
+            if window_start < high and window_end > low:
+                paths.append(os.path.join(directory, name))
+        # Single-file layout written before the store was partitioned.
+        legacy_path = os.path.join(self._symbol_dir(symbol), f"articles.{ext}")
+        if os.path.exists(legacy_path):
+            paths.insert(0, legacy_path)
+        frames = [pd.read_parquet(p) if USE_PARQUET else pd.read_pickle(p) for p in paths]
+        if not frames:
+            return pd.DataFrame()
+        # Articles repeated across windows are kept once.
+        stored = pd.concat(frames, ignore_index=True)
+        stored = stored.drop_duplicates(subset="id", keep="last")
+        return stored.sort_values("datetime", ignore_index=True)
+
+    def add(self, symbol: str, articles: pd.DataFrame, window: List[str]) -> None:
+        """Store fetched articles of a [start, end) window in their own file and mark the window covered."""
+        today = date.today().isoformat()
+        if not articles.empty:
+            # Each window gets its own file, so a backfill writes every article once.
+            path = self._partition_path(symbol, window)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            if USE_PARQUET:
+                articles.to_parquet(tmp_path)
+            else:
+                articles.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+        with self._lock:
+            os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+            settled_end = min(window[1], today)
+            if window[0] < settled_end:
+                self._save_coverage(symbol, self.coverage(symbol) + [[window[0], settled_end]])
+
+    def read(self, symbol: str, start: str, end: str) -> pd.DataFrame:
+        """Stored articles published in [start, end) (UTC days), without touching the network."""
+        stored = self._load(symbol, start, end)
+        if stored.empty:
+            return stored
+        published = pd.to_datetime(stored["datetime"], unit="s")
+        mask = (published >= pd.Timestamp(start)) & (published < pd.Timestamp(end))
+        return stored[mask].reset_index(drop=True)
+
+    def get(
+        self,
+        symbol: Annotated[str, "ticker symbol"],
+        start: Annotated[str, "start date, yyyy-mm-dd (inclusive)"],
+        end: Annotated[str, "end date, yyyy-mm-dd (exclusive)"],
+        fetch: Annotated[
+            Callable[[str, str], pd.DataFrame],
+            "downloads the articles of a [start, end) window",
+        ],
+        window_days: Annotated[int, "days per fetched window"] = 7,
+        max_workers: Annotated[int, "number of windows fetched concurrently"] = 4,
+    ) -> pd.DataFrame:
+        """Serve [start, end) from disk, fetching the uncovered days window by window first."""
+        with self._lock:
+            covered = self.coverage(symbol)
+        windows = [
+            window
+            for gap_start, gap_end in missing_ranges(covered, start, end)
+            for window in split_range(gap_start, gap_end, window_days)
+        ]
+        record_io(cache_hit=not windows)
+        if windows:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                fetch = in_current_context(fetch)
+                futures = {executor.submit(fetch, *window): window for window in windows}
+                # Each window is persisted as soon as it arrives, so an
+                # interrupted or partly failed pull resumes from the windows
+                # still missing.
+                errors = []
+                for future in as_completed(futures):
+                    try:
+                        articles = future.result()
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    self.add(symbol, articles, futures[future])
+            if errors:
+                raise errors[0]
+        return self.read(symbol, start, end)
+
+
+NEWS_STORE = NewsStore()
@@ -0,0 +1,222 @@
+import os
+import json
+import threading
+import shutil
+import importlib.util
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from datetime import date
+from typing import Annotated, Callable, List, Optional
+
+from utils import record_io
+
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+PRICE_STORE_PATH = os.path.join(CACHE_PATH, "price_store")
+
+# Yearly partitions kept in memory; older ones are re-read from disk.
+PARTITION_MEMO_SIZE = 64
+
+# Parquet (memory-mapped through pyarrow) when available, pickle otherwise.
+USE_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+
+def merge_ranges(ranges: List[List[str]]) -> List[List[str]]:
+    """Merge overlapping or touching [start, end) date ranges (yyyy-mm-dd strings)."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_ranges(covered: List[List[str]], start: str, end: str) -> List[List[str]]:
+    """Parts of [start, end) not inside any of the covered ranges."""
+    gaps, cursor = [], start
+    for c_start, c_end in merge_ranges(covered):
+        if c_end <= cursor:
+            continue
+        if c_start >= end:
+            break
+        if c_start > cursor:
+            gaps.append([cursor, c_start])
+        cursor = max(cursor, c_end)
+    if cursor < end:
+        gaps.append([cursor, end])
+    return gaps
+
+
+def _slice(df: pd.DataFrame, start: str, end: str) -> pd.DataFrame:
+    if df.empty:
+        return df
+    tz = getattr(df.index, "tz", None)
+    lower = pd.Timestamp(start).tz_localize(tz) if tz else pd.Timestamp(start)
+    upper = pd.Timestamp(end).tz_localize(tz) if tz else pd.Timestamp(end)
+    return df[(df.index >= lower) & (df.index < upper)]
+
+
+class PriceStore:
+    """
+    On-disk OHLCV store partitioned as ``{root}/{symbol}/{year}.parquet``.
+
+    Each symbol keeps a ``coverage.json`` of the [start, end) ranges already
+    fetched, so a request only goes to the network for the gaps. Ranges that
+    reach today are never marked covered, since today's bar is still moving,
+    and neither are gaps the provider returned no rows for.
+
+    Providers adjust past bars for later splits and dividends, so bars fetched
+    before and after a corporate action are on different bases. The symbol's
+    actions are kept in ``actions.json``; when they change, its stored bars
+    are dropped and fetched again.
+    """
+
+    def __init__(self, root: str = PRICE_STORE_PATH, memo_size: int = PARTITION_MEMO_SIZE):
+        self.root = root
+        self.memo_size = memo_size
+        self._lock = threading.Lock()
+        self._symbol_locks = {}
+        # path -> (mtime, DataFrame), least recently read first, so repeat reads skip the disk
+        self._partitions = OrderedDict()
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol.replace("/", "_"))
+
+    def _partition_path(self, symbol: str, year: int) -> str:
+        ext = "parquet" if USE_PARQUET else "pkl"
+        return os.path.join(self._symbol_dir(symbol), f"{year}.{ext}")
+
+    def coverage(self, symbol: str) -> List[List[str]]:
+        path = os.path.join(self._symbol_dir(symbol), "coverage.json")
+        if not os.path.exists(path):
+            return []
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _save_coverage(self, symbol: str, ranges: List[List[str]]) -> None:
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+        path = os.path.join(self._symbol_dir(symbol), "coverage.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(merge_ranges(ranges), f)
+        os.replace(tmp_path, path)
+
+    def _stored_actions(self, symbol: str) -> Optional[list]:
+        path = os.path.join(self._symbol_dir(symbol), "actions.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _save_actions(self, symbol: str, actions: list) -> None:
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+        path = os.path.join(self._symbol_dir(symbol), "actions.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(actions, f)
+        os.replace(tmp_path, path)
+
+    def drop(self, symbol: str) -> None:
+        """Forget every stored bar of symbol, with its coverage."""
+        directory = self._symbol_dir(symbol)
+        with self._lock:
+            for path in [p for p in self._partitions if os.path.dirname(p) == directory]:
+                del self._partitions[path]
+        shutil.rmtree(directory, ignore_errors=True)
+
+    def _read_partition(self, path: str) -> pd.DataFrame:
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            entry = self._partitions.get(path)
+            if entry is not None and entry[0] == mtime:
+                self._partitions.move_to_end(path)
+                return entry[1]
+        if USE_PARQUET:
+            df = pd.read_parquet(path, memory_map=True)
+        else:
+            df = pd.read_pickle(path)
+        with self._lock:
+            self._partitions[path] = (mtime, df)
+            self._partitions.move_to_end(path)
+            while len(self._partitions) > self.memo_size:
+                self._partitions.popitem(last=False)
+        return df
+
+    def _write(self, symbol: str, data: pd.DataFrame) -> None:
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+        for year, rows in data.groupby(data.index.year):
+            path = self._partition_path(symbol, year)
+            if os.path.exists(path):
+                rows = pd.concat([self._read_partition(path), rows])
+                rows = rows[~rows.index.duplicated(keep="last")].sort_index()
+            tmp_path = path + ".tmp"
+            if USE_PARQUET:
+                rows.to_parquet(tmp_path)
+            else:
+                rows.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+
+    def read(self, symbol: str, start: str, end: str) -> pd.DataFrame:
+        """Stored rows of [start, end), without touching the network."""
+        frames = []
+        for year in range(int(start[:4]), int(end[:4]) + 1):
+            path = self._partition_path(symbol, year)
+            if os.path.exists(path):
+                frames.append(self._read_partition(path))
+        if not frames:
+            return pd.DataFrame()
+        return _slice(pd.concat(frames), start, end)
+
+    def get(
+        self,
+        symbol: Annotated[str, "ticker symbol"],
+        start: Annotated[str, "start date, yyyy-mm-dd (inclusive)"],
+        end: Annotated[str, "end date, yyyy-mm-dd (exclusive)"],
+        fetch: Annotated[Callable[[str, str], pd.DataFrame], "downloads [start, end) from the provider"],
+        actions: Annotated[
+            Optional[Callable[[], list]],
+            "returns the symbol's corporate actions as JSON-serializable rows, "
+            "e.g. [date, dividend, split]; stored bars are dropped when they change",
+        ] = None,
+    ) -> pd.DataFrame:
+        """Serve [start, end) from disk, fetching and storing only the missing gaps first."""
+        today = date.today().strftime("%Y-%m-%d")
+        # One lock per symbol: downloads of different symbols run in parallel.
+        with self._symbol_lock(symbol):
+            if actions is not None:
+                current, stored = actions(), self._stored_actions(symbol)
+                # Actions only accrue; an empty answer over stored ones is a provider error.
+                if stored != current and not (stored and not current):
+                    # Bars stored so far are on the old adjustment basis, or on an unknown one.
+                    self.drop(symbol)
+                    self._save_actions(symbol, current)
+            covered = self.coverage(symbol)
+            gaps = missing_ranges(covered, start, end)
+            record_io(cache_hit=not gaps)
+            for gap_start, gap_end in gaps:
+                settled_end = min(gap_end, today)
+                # A gap of weekend days holds no bars; there is nothing to fetch.
+                if np.busday_count(gap_start, gap_end) == 0:
+                    if gap_start < settled_end:
+                        covered.append([gap_start, settled_end])
+                    continue
+                fetched = fetch(gap_start, gap_end)
+                # Providers answer errors with an empty frame, so only a gap
+                # that returned rows counts as fetched.
+                if fetched is None or fetched.empty:
+                    continue
+                self._write(symbol, fetched)
+                if gap_start < settled_end:
+                    covered.append([gap_start, settled_end])
+            if gaps:
+                self._save_coverage(symbol, covered)
+            return self.read(symbol, start, end)
+
+
+PRICE_STORE = PriceStore()
@@ -1,32 +1,49 @@
 import os
+import pickle
+import hashlib
+import time
 import praw
 import pandas as pd
 from typing import Annotated, List
 from functools import wraps
 from datetime import datetime, timezone
-from utils import decorate_all_methods, save_output, SavePathType
+from concurrent.futures import ThreadPoolExecutor
+from utils import decorate_all_methods, save_output, SavePathType, instrument
+from data_sources.cache_utils import CACHE_PATH
+
+REDDIT_CACHE_PATH = os.path.join(CACHE_PATH, "reddit")
+
+SUBREDDITS = ["wallstreetbets", "stocks", "investing"]
+# Reddit serves at most this many posts per listing, whatever the limit.
+LISTING_CAP = 1000
+# Posts younger than this are re-scanned on every call, as their score and
+# comment count are still moving; older ones keep the counts last seen.
+SCORE_REFRESH_SECONDS = 2 * 24 * 3600
+
+
+def new_reddit_client() -> praw.Reddit:
+    # praw instances are not thread safe; every worker thread builds its own.
+    return praw.Reddit(
+        client_id=os.environ["REDDIT_CLIENT_ID"],
+        client_secret=os.environ["REDDIT_CLIENT_SECRET"],
+        user_agent="alpha agent",
+    )
+
 
 def init_reddit_client(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        global reddit_client
         if not all(
             [os.environ.get("REDDIT_CLIENT_ID"), os.environ.get("REDDIT_CLIENT_SECRET")]
         ):
             print("Please set the environment variables for Reddit API credentials.")
             return None
-        else:
-            reddit_client = praw.Reddit(
-                client_id=os.environ["REDDIT_CLIENT_ID"],
-                client_secret=os.environ["REDDIT_CLIENT_SECRET"],
-                user_agent="alpha agent",
-            )
-            print("Reddit client initialized")
-            return func(*args, **kwargs)
+        return func(*args, **kwargs)
 
     return wrapper
 
 
+@decorate_all_methods(instrument)
 @decorate_all_methods(init_reddit_client)
 class RedditUtils:
     
@@ -62,26 +79,24 @@ class RedditUtils:
             .timestamp()
         )
 
-        for subreddit_name in ["wallstreetbets", "stocks", "investing"]:
-            print("Searching in subreddit:", subreddit_name)
-            subreddit = reddit_client.subreddit(subreddit_name)
-            posts = subreddit.search(query, limit=limit)
-
-            for post in posts:
-                if start_timestamp <= post.created_utc <= end_timestamp:
-                    post_data.append(
-                        [
-                            datetime.fromtimestamp(
-                                post.created_utc, tz=timezone.utc
-                            ).strftime("%Y-%m-%d %H:%M:%S"),
-                            post.id,
-                            post.title,
-                            post.selftext,
-                            post.score,
-                            post.num_comments,
-                            post.url,
-                        ]
-                    )
+        with ThreadPoolExecutor(max_workers=len(SUBREDDITS)) as executor:
+            results = executor.map(
+                lambda name: _search_subreddit(
+                    query, name, start_timestamp, end_timestamp, limit
+                ),
+                SUBREDDITS,
+            )
+            for posts in results:
+                for created_utc, *fields in posts:
+                    if start_timestamp <= created_utc <= end_timestamp:
+                        post_data.append(
+                            [
+                                datetime.fromtimestamp(
+                                    created_utc, tz=timezone.utc
+                                ).strftime("%Y-%m-%d %H:%M:%S"),
+                                *fields,
+                            ]
+                        )
 
         output = pd.DataFrame(
             post_data,
@@ -99,3 +114,88 @@ class RedditUtils:
 
         # save_output(output, f"reddit posts related to {query}", save_path=save_path)
         return output
+
+
+def _state_path(query: str, subreddit_name: str) -> str:
+    digest = hashlib.sha1(query.encode()).hexdigest()[:16]
+    return os.path.join(REDDIT_CACHE_PATH, f"{subreddit_name}_{digest}.pkl")
+
+
+def _load_state(query: str, subreddit_name: str) -> dict:
+    path = _state_path(query, subreddit_name)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    return {"oldest": None, "newest": None, "posts": {}}
+
+
+def _save_state(query: str, subreddit_name: str, state: dict) -> None:
+    os.makedirs(REDDIT_CACHE_PATH, exist_ok=True)
+    path = _state_path(query, subreddit_name)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _search_subreddit(
+    query: str, subreddit_name: str, start_timestamp: int, end_timestamp: int, limit: int
+) -> list:
+    """
+    Posts of one subreddit matching query, newest first, as
+    [created_utc, id, title, selftext, score, num_comments, url] rows.
+
+    The search runs in "new" order and stops at the first post older than
+    what is needed: start_timestamp on a cold run, or the stored high-water
+    mark when the local copy already reaches back to start_timestamp. Only
+    posts up to end_timestamp count towards limit. Score and comment counts
+    are those of the last scan that saw the post.
+    """
+    print("Searching in subreddit:", subreddit_name)
+    state = _load_state(query, subreddit_name)
+    posts = state["posts"]
+    incremental = state["oldest"] is not None and state["oldest"] <= start_timestamp
+    if incremental:
+        refresh_from = time.time() - SCORE_REFRESH_SECONDS
+        stop_at = max(start_timestamp, min(state["newest"], refresh_from))
+    else:
+        stop_at = start_timestamp
+
+    reached_stop = truncated = False
+    scanned = []
+    in_range = 0
+    subreddit = new_reddit_client().subreddit(subreddit_name)
+    for post in subreddit.search(query, sort="new", limit=None):
+        if post.created_utc < stop_at:
+            reached_stop = True
+            break
+        scanned.append(post.created_utc)
+        posts[post.id] = [
+            post.created_utc,
+            post.id,
+            post.title,
+            post.selftext,
+            post.score,
+            post.num_comments,
+            post.url,
+        ]
+        if post.created_utc <= end_timestamp:
+            in_range += 1
+            if in_range >= limit:
+                truncated = True
+                break
+
+    # Everything between "oldest" and "newest" is stored. A scan cut short by
+    # the limit (or by the listing cap) before its stop point leaves a gap
+    # below what it saw.
+    complete = reached_stop or (not truncated and len(scanned) < LISTING_CAP)
+    if not complete:
+        oldest = min(scanned)
+    elif incremental:
+        oldest = state["oldest"]
+    else:
+        oldest = start_timestamp if reached_stop else 0
+    newest = max(scanned, default=state["newest"] if incremental else start_timestamp)
+    _save_state(query, subreddit_name, {"oldest": oldest, "newest": newest, "posts": posts})
+
+    return sorted(posts.values(), key=lambda row: row[0], reverse=True)
@@ -1,15 +1,59 @@
 import os
-import requests
+import json
+import hashlib
+import threading
 from sec_api import ExtractorApi, QueryApi, RenderApi
 from functools import wraps
 from typing import Annotated
-from utils import decorate_all_methods, SavePathType
+from utils import decorate_all_methods, SavePathType, instrument, record_io
 from data_sources import FMPUtils
+from data_sources.section_store import SECTION_STORE
+from data_sources.cache_utils import TTLCache
+from data_sources.http_utils import get_session
+from concurrent.futures import ThreadPoolExecutor
 
 
-CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
 PDF_GENERATOR_API = "https://api.sec-api.io/filing-reader"
 
+SECTIONS_10K = ["1", "1A", "1B", "2", "3", "4", "5", "6", "7", "7A", "8", "9", "9A", "9B", "10", "11", "12", "13", "14", "15"]
+
+# Section texts already read by this process.
+SECTION_MEMO = TTLCache(maxsize=256, ttl=24 * 3600)
+_FILING_URLS = TTLCache(maxsize=1024, ttl=24 * 3600)
+
+# A 'latest' filing changes once a year; a specific year's filing never does.
+LATEST_URL_MAX_AGE = 24 * 3600
+
+
+def resolve_10k_url(ticker_symbol: str, fyear: str) -> str:
+    """
+    URL of the 10-K of (ticker, fyear), or FMP's error message.
+
+    Resolved through FMP once and then remembered on disk, next to the
+    section store, so later reports skip the lookup.
+    """
+    key = (ticker_symbol, fyear)
+    max_age = LATEST_URL_MAX_AGE if fyear == "latest" else None
+
+    def load():
+        url = SECTION_STORE.filing_url(ticker_symbol, fyear, max_age)
+        if url is not None:
+            return url
+        report = FMPUtils.get_sec_report(ticker_symbol, fyear)
+        if not report or not report.startswith("Link: "):
+            return report or "Please set the environment variable FMP_API_KEY to resolve 10-K urls."
+        url = report[len("Link: ") :].split()[0]
+        if url == "None":
+            return f"No 10-K filing found for {ticker_symbol} in {fyear}"
+        SECTION_STORE.put_filing_url(ticker_symbol, fyear, url)
+        return url
+
+    url = _FILING_URLS.get_or_load(key, load)
+    if not url.startswith("http"):
+        _FILING_URLS.invalidate(key)
+    return url
+
+
 def init_sec_api(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -27,6 +71,7 @@ def init_sec_api(func):
     return wrapper
 
 
+@decorate_all_methods(instrument)
 @decorate_all_methods(init_sec_api)
 class SECUtils:
 
@@ -48,44 +93,27 @@ class SECUtils:
         """
         if isinstance(section, int):
             section = str(section)
-        if section not in [
-            "1A",
-            "1B",
-            "7A",
-            "9A",
-            "9B",
-        ] + [str(i) for i in range(1, 16)]:
+        if section not in SECTIONS_10K:
             raise ValueError(
                 "Section must be in [1, 1A, 1B, 2, 3, 4, 5, 6, 7, 7A, 8, 9, 9A, 9B, 10, 11, 12, 13, 14, 15]"
             )
 
-        # os.makedirs(f"{self.project_dir}/10k", exist_ok=True)
-
-        # report_name = f"{self.project_dir}/10k/section_{section}.txt"
-
-        # if USE_CACHE and os.path.exists(report_name):
-        #     with open(report_name, "r") as f:
-        #         section_text = f.read()
-        # else:
-        # TODO Extract link via a structured output(dictionary perhaps)
-        if report_address is None:
-            report_address = FMPUtils.get_sec_report(ticker_symbol, fyear)
-            if report_address.startswith("Link: "):
-                report_address = report_address.lstrip("Link: ").split()[0]
-            else:
-                return report_address  # debug info
-
-        cache_path = os.path.join(
-            CACHE_PATH, f"sec_utils/{ticker_symbol}_{fyear}_{section}.txt"
-        )
-        if os.path.exists(cache_path):
-            with open(cache_path, "r") as f:
-                section_text = f.read()
-        else:
+        # Memo, then disk store, and only then the network: the filing url is
+        # resolved solely for sections that are not cached yet.
+        cache_key = f"{ticker_symbol}_{fyear}_{section}"
+        section_text = SECTION_MEMO.get(cache_key)
+        if section_text is None:
+            section_text = SECTION_STORE.get_or_import_legacy(cache_key)
+        record_io(cache_hit=section_text is not None)
+        if section_text is None:
+            if report_address is None:
+                report_address = resolve_10k_url(ticker_symbol, fyear)
+                if not report_address.startswith("http"):
+                    return report_address  # debug info
             section_text = extractor_api.get_section(report_address, section, "text")
-            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-            with open(cache_path, "w") as f:
-                f.write(section_text)
+            record_io(len(section_text.encode("utf-8")))
+            SECTION_STORE.put(cache_key, section_text)
+        SECTION_MEMO.set(cache_key, section_text)
 
         if save_path:
             os.makedirs(os.path.dirname(save_path), exist_ok=True)
@@ -94,6 +122,72 @@ class SECUtils:
 
         return section_text
     
+    def prefetch_10k_sections(
+        ticker_symbol: Annotated[str, "ticker symbol"],
+        fyear: Annotated[str, "fiscal year of the 10-K report"],
+        sections: Annotated[
+            list[str | int] | None,
+            "sections to fetch, default to all sections of the 10-K report",
+        ] = None,
+        report_address: Annotated[
+            str,
+            "URL of the 10-K report, if not specified, will get report url from fmp api",
+        ] = None,
+        max_workers: Annotated[int, "number of concurrent extractions, default to 8"] = 8,
+    ) -> dict:
+        """
+        Fetch several sections of one 10-K report concurrently into the cache, resolving the report once.
+        """
+        sections = [str(s) for s in sections] if sections else SECTIONS_10K
+        missing = [
+            s for s in sections
+            if SECTION_STORE.get(f"{ticker_symbol}_{fyear}_{s}") is None
+        ]
+        if missing and report_address is None:
+            report_address = resolve_10k_url(ticker_symbol, fyear)
+            if not report_address.startswith("http"):
+                return {s: report_address for s in missing}
+
+        def fetch(section):
+            try:
+                SECUtils.get_10k_section(ticker_symbol, fyear, section, report_address)
+                return "ok"
+            except Exception as e:
+                return f"Failed: {e}"
+
+        status = {s: "cached" for s in sections if s not in missing}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            status.update(zip(missing, executor.map(fetch, missing)))
+        return status
+
+    def warm_10k_cache(
+        tickers: Annotated[list[str], "ticker symbols"],
+        fyears: Annotated[list[str], "fiscal years of the 10-K reports"],
+        sections: Annotated[
+            list[str | int] | None,
+            "sections to cache, default to all sections of the 10-K report",
+        ] = None,
+        max_workers: Annotated[int, "number of concurrent extractions, default to 4"] = 4,
+    ) -> dict:
+        """
+        Fill the section cache for every ticker x year x section combination and report failures.
+        """
+        sections = [str(s) for s in sections] if sections else SECTIONS_10K
+        jobs = [(t, y, s) for t in tickers for y in fyears for s in sections]
+
+        def warm(job):
+            try:
+                text = SECUtils.get_10k_section(*job)
+            except Exception as e:
+                return f"Failed: {e}"
+            # get_10k_section returns FMP's error message when no filing is found.
+            return "ok" if SECTION_STORE.get(f"{job[0]}_{job[1]}_{job[2]}") is not None else text
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = dict(zip(jobs, executor.map(warm, jobs)))
+        failed = {f"{t}_{y}_{s}": r for (t, y, s), r in results.items() if r != "ok"}
+        return {"cached": len(jobs) - len(failed), "failed": failed, **SECTION_STORE.stats()}
+
     def get_10k_metadata(
         ticker: Annotated[str, "ticker symbol"],
         start_date: Annotated[
@@ -136,8 +230,7 @@ class SECUtils:
             url = metadata["linkToFilingDetails"]
 
             try:
-                date = metadata["filedAt"][:10]
-                file_name = date + "_" + metadata["formType"] + "_" + url.split("/")[-1]
+                file_name = _filing_file_name(metadata)
 
                 if not os.path.isdir(save_folder):
                     os.makedirs(save_folder)
@@ -147,8 +240,8 @@ class SECUtils:
                 with open(file_path, "w") as f:
                     f.write(file_content)
                 return f"{ticker}: download succeeded. Saved to {file_path}"
-            except:
-                return f"❌ {ticker}: downloaded failed: {url}"
+            except Exception as e:
+                return f"❌ {ticker}: downloaded failed: {url}, {e}"
         else:
             return f"No 2023 10-K filing found for {ticker}"
 
@@ -171,30 +264,173 @@ class SECUtils:
             filing_url = metadata["linkToFilingDetails"]
 
             try:
-                date = metadata["filedAt"][:10]
-                print(filing_url.split("/")[-1])
-                file_name = (
-                    date
-                    + "_"
-                    + metadata["formType"].replace("/A", "")
-                    + "_"
-                    + filing_url.split("/")[-1]
-                    + ".pdf"
-                )
+                file_name = _filing_file_name(metadata, "pdf")
 
                 if not os.path.isdir(save_folder):
                     os.makedirs(save_folder)
 
-                api_url = f"{PDF_GENERATOR_API}?token={os.environ['SEC_API_KEY']}&type=pdf&url={filing_url}"
-                response = requests.get(api_url, stream=True)
-                response.raise_for_status()
-
                 file_path = os.path.join(save_folder, file_name)
-                with open(file_path, "wb") as file:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        file.write(chunk)
+                _download_pdf(filing_url, file_path)
                 return f"{ticker}: download succeeded. Saved to {file_path}"
             except Exception as e:
                 return f"❌ {ticker}: downloaded failed: {filing_url}, {e}"
         else:
-            return f"No 2023 10-K filing found for {ticker}"
\ No newline at end of file
+            return f"No 2023 10-K filing found for {ticker}"
+
+    def download_10k_filings_bulk(
+        tickers: Annotated[list[str], "ticker symbols"],
+        start_date: Annotated[
+            str, "start date of the 10-k file search range, in yyyy-mm-dd format"
+        ],
+        end_date: Annotated[
+            str, "end date of the 10-k file search range, in yyyy-mm-dd format"
+        ],
+        save_folder: Annotated[
+            str, "name of the folder to store the downloaded filings"
+        ],
+        file_type: Annotated[str, "'htm' or 'pdf', default to 'htm'"] = "htm",
+        max_workers: Annotated[int, "number of concurrent downloads, default to 8"] = 8,
+        tickers_per_query: Annotated[
+            int, "tickers OR-ed into one metadata query, default to 50"
+        ] = 50,
+    ) -> dict:
+        """Download every 10-K filing of many tickers within a given time period, skipping files already downloaded."""
+        if file_type not in ("htm", "pdf"):
+            raise ValueError("file_type must be 'htm' or 'pdf'")
+
+        filings = []
+        for i in range(0, len(tickers), tickers_per_query):
+            filings += _query_10k_filings(tickers[i : i + tickers_per_query], start_date, end_date)
+
+        os.makedirs(save_folder, exist_ok=True)
+        manifest = FilingManifest(save_folder)
+
+        def download(filing):
+            url = filing["linkToFilingDetails"]
+            file_name = _filing_file_name(filing, file_type)
+            file_path = os.path.join(save_folder, file_name)
+            if manifest.verify(file_name):
+                return file_name, "skipped"
+            try:
+                if file_type == "pdf":
+                    _download_pdf(url, file_path)
+                else:
+                    content = render_api.get_filing(url)
+                    with open(file_path + ".part", "w") as f:
+                        f.write(content)
+                    os.replace(file_path + ".part", file_path)
+                manifest.record(file_name)
+                return file_name, "downloaded"
+            except Exception as e:
+                return file_name, f"failed: {e}"
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(executor.map(download, filings))
+
+
+def _query_10k_filings(tickers: list[str], start_date: str, end_date: str) -> list:
+    """All 10-K filings of the tickers in the period, paging through one OR-ed query."""
+    ticker_clause = " OR ".join(f'"{t}"' for t in tickers)
+    filings, offset, page_size = [], 0, 50
+    while True:
+        query = {
+            "query": f"ticker:({ticker_clause}) AND formType:\"10-K\" AND filedAt:[{start_date} TO {end_date}]",
+            "from": offset,
+            "size": page_size,
+            "sort": [{"filedAt": {"order": "desc"}}],
+        }
+        page = query_api.get_filings(query).get("filings", [])
+        filings += page
+        offset += page_size
+        # sec-api serves at most 10,000 results per query.
+        if len(page) < page_size or offset >= 10000:
+            return filings
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FilingManifest:
+    """sha256 of every completed download in a folder, so reruns skip intact files."""
+
+    def __init__(self, folder: str):
+        self.path = os.path.join(folder, "manifest.json")
+        self._lock = threading.Lock()
+        self.checksums = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                self.checksums = json.load(f)
+
+    def verify(self, file_name: str) -> bool:
+        file_path = os.path.join(os.path.dirname(self.path), file_name)
+        expected = self.checksums.get(file_name)
+        return expected is not None and os.path.exists(file_path) and _sha256(file_path) == expected
+
+    def record(self, file_name: str) -> None:
+        checksum = _sha256(os.path.join(os.path.dirname(self.path), file_name))
+        with self._lock:
+            self.checksums[file_name] = checksum
+            with open(self.path + ".tmp", "w") as f:
+                json.dump(self.checksums, f, indent=1)
+            os.replace(self.path + ".tmp", self.path)
+
+
+def _filing_file_name(filing: dict, file_type: str = "htm") -> str:
+    """Local file name of a filing, shared by the single and bulk downloads."""
+    url = filing["linkToFilingDetails"]
+    return (
+        filing["filedAt"][:10]
+        + "_"
+        + filing["formType"].replace("/A", "")
+        + "_"
+        + url.split("/")[-1]
+        + (".pdf" if file_type == "pdf" else "")
+    )
+
+
+def _content_range_total(content_range: str | None) -> int | None:
+    """Total size from a 'bytes start-end/total' or 'bytes */total' header, if known."""
+    if not content_range or "/" not in content_range:
+        return None
+    total = content_range.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+def _download_pdf(filing_url: str, file_path: str) -> None:
+    """Stream the rendered pdf to file_path, resuming a previous partial download with a Range request."""
+    part_path = file_path + ".part"
+    api_url = f"{PDF_GENERATOR_API}?token={os.environ['SEC_API_KEY']}&type=pdf&url={filing_url}"
+    for _ in range(2):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with get_session().get(api_url, headers=headers, stream=True, timeout=120) as response:
+            if response.status_code == 416:
+                # Nothing left past the offset: done only if the part file has the full size.
+                if _content_range_total(response.headers.get("Content-Range")) == offset:
+                    os.replace(part_path, file_path)
+                    return
+                os.remove(part_path)  # truncated or corrupt: download again from scratch
+                continue
+            response.raise_for_status()
+            # A server ignoring the Range header sends the whole file again.
+            if response.status_code == 206:
+                mode, total = "ab", _content_range_total(response.headers.get("Content-Range"))
+            else:
+                length = response.headers.get("Content-Length")
+                encoded = response.headers.get("Content-Encoding")
+                mode, total = "wb", int(length) if length and not encoded else None
+            with open(part_path, mode) as file:
+                for chunk in response.iter_content(chunk_size=1 << 16):
+                    file.write(chunk)
+        size = os.path.getsize(part_path)
+        if total is not None and size != total:
+            # The part file is kept, so the next attempt resumes from it.
+            raise IOError(f"incomplete download of {filing_url}: {size} of {total} bytes")
+        os.replace(part_path, file_path)
+        return
+    raise IOError(f"could not download {filing_url}")
@@ -0,0 +1,230 @@
+import os
+import mmap
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+import importlib.util
+from typing import Annotated, Optional
+
+from data_sources.cache_utils import CACHE_PATH
+
+
+SECTION_STORE_PATH = os.path.join(CACHE_PATH, "sec_sections")
+LEGACY_SECTION_PATH = os.path.join(CACHE_PATH, "sec_utils")
+
+# Compressed bytes kept on disk before least recently used sections are evicted.
+SECTION_STORE_MAX_BYTES = int(os.environ.get("SEC_CACHE_MAX_BYTES", 2 * 1024**3))
+
+# zstd when available, zlib otherwise. Blobs carry their codec as the file
+# extension, so a store written with one codec stays readable with the other
+# one installed.
+USE_ZSTD = importlib.util.find_spec("zstandard") is not None
+if USE_ZSTD:
+    import zstandard
+
+
+def _compress(data: bytes) -> tuple[bytes, str]:
+    if USE_ZSTD:
+        return zstandard.ZstdCompressor(level=10).compress(data), "zst"
+    return zlib.compress(data, 9), "zz"
+
+
+def _decompress(data, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class SectionStore:
+    """
+    Compressed, content-addressed store of 10-K section texts.
+
+    Texts are saved once per sha256 digest under ``blobs/`` and indexed by
+    key in a SQLite manifest holding size, digest and last access time.
+    Reads are memory-mapped and verified against the digest; corrupt blobs
+    are dropped. When the compressed total exceeds ``max_bytes`` the least
+    recently read entries are evicted.
+    """
+
+    def __init__(
+        self,
+        root: str = SECTION_STORE_PATH,
+        max_bytes: int = SECTION_STORE_MAX_BYTES,
+        legacy_root: str = LEGACY_SECTION_PATH,
+    ):
+        self.root = root
+        self.legacy_root = legacy_root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(self.root, "manifest.sqlite"), check_same_thread=False
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sections ("
+                "key TEXT PRIMARY KEY, digest TEXT, codec TEXT, size INTEGER, "
+                "raw_size INTEGER, created REAL, accessed REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS by_access ON sections (accessed)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS filings ("
+                "ticker TEXT, fyear TEXT, url TEXT, resolved REAL, PRIMARY KEY (ticker, fyear))"
+            )
+        return self._db
+
+    def _blob_path(self, digest: str, codec: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.{codec}")
+
+    def _read_blob(self, path: str, codec: str) -> bytes:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return _decompress(b"", codec)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                return _decompress(view, codec)
+
+    def get(
+        self,
+        key: Annotated[str, "section key, e.g. 'AAPL_2023_7'"],
+        max_age: Annotated[Optional[float], "seconds after which an entry counts as stale"] = None,
+    ) -> Optional[str]:
+        """Cached text of key, or None if it is missing, stale or fails its integrity check."""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT digest, codec, created FROM sections WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        digest, codec, created = row
+        if max_age is not None and time.time() - created > max_age:
+            return None
+        # Decompress and verify outside the lock, so reads of different sections overlap.
+        try:
+            data = self._read_blob(self._blob_path(digest, codec), codec)
+        except Exception:  # missing or undecodable blob
+            data = None
+        with self._lock:
+            if data is None or hashlib.sha256(data).hexdigest() != digest:
+                # Only drop the entry if it was not rewritten meanwhile.
+                if self.db.execute(
+                    "SELECT 1 FROM sections WHERE key = ? AND digest = ?", (key, digest)
+                ).fetchone():
+                    self._delete(key)
+                    self.db.commit()
+                return None
+            self.db.execute("UPDATE sections SET accessed = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+        return data.decode("utf-8")
+
+    def put(self, key: str, text: str) -> None:
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            now = time.time()
+            row = self.db.execute(
+                "SELECT codec FROM sections WHERE key = ? AND digest = ?", (key, digest)
+            ).fetchone()
+            if row is not None and os.path.exists(self._blob_path(digest, row[0])):
+                # Same text stored again, e.g. by concurrent misses: just refresh it.
+                self.db.execute(
+                    "UPDATE sections SET created = ?, accessed = ? WHERE key = ?", (now, now, key)
+                )
+                self.db.commit()
+                return
+            # Drop the old entry first, so that its blob is only kept if another key shares it.
+            self._delete(key)
+            row = self.db.execute(
+                "SELECT codec FROM sections WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone()
+            if row is not None and os.path.exists(self._blob_path(digest, row[0])):
+                codec = row[0]
+                size = os.path.getsize(self._blob_path(digest, codec))
+            else:
+                compressed, codec = _compress(data)
+                path = self._blob_path(digest, codec)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(compressed)
+                os.replace(tmp_path, path)
+                size = len(compressed)
+            self.db.execute(
+                "INSERT INTO sections VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, digest, codec, size, len(data), now, now),
+            )
+            self._evict(keep=key)
+            self.db.commit()
+
+    def _delete(self, key: str) -> None:
+        row = self.db.execute(
+            "SELECT digest, codec FROM sections WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return
+        self.db.execute("DELETE FROM sections WHERE key = ?", (key,))
+        # Blobs are shared by identical texts; remove one only with its last key.
+        if not self.db.execute("SELECT 1 FROM sections WHERE digest = ?", (row[0],)).fetchone():
+            path = self._blob_path(*row)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Drop least recently read entries until the store fits max_bytes, never ``keep``."""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM sections").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute(
+            "SELECT key, size FROM sections WHERE key != ? ORDER BY accessed", (keep,)
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._delete(key)
+            total -= size
+
+    def get_or_import_legacy(self, key: str) -> Optional[str]:
+        """Like get, but also copies a section cached by the old plain .txt layout into the store."""
+        text = self.get(key)
+        if text is not None:
+            return text
+        legacy_path = os.path.join(self.legacy_root, f"{key}.txt")
+        if not os.path.exists(legacy_path):
+            return None
+        with open(legacy_path, "r") as f:
+            text = f.read()
+        # The .txt file is left in place: some ship with the repository.
+        self.put(key, text)
+        return text
+
+    def filing_url(self, ticker: str, fyear: str, max_age: Optional[float] = None) -> Optional[str]:
+        """Stored 10-K url of (ticker, fyear), or None if unknown or older than max_age."""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT url, resolved FROM filings WHERE ticker = ? AND fyear = ?", (ticker, fyear)
+            ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return row[0]
+
+    def put_filing_url(self, ticker: str, fyear: str, url: str) -> None:
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO filings VALUES (?, ?, ?, ?)",
+                (ticker, fyear, url, time.time()),
+            )
+            self.db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size, raw_size = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(raw_size), 0) FROM sections"
+            ).fetchone()
+        return {"sections": count, "bytes": size, "raw_bytes": raw_size, "max_bytes": self.max_bytes}
+
+
+SECTION_STORE = SectionStore()
@@ -1,8 +1,55 @@
+import os
+import numpy as np
+import pandas as pd
 from pandas import DataFrame
 import yfinance as yf
 from functools import wraps
 from typing import Annotated, Any, Callable, Optional
-from utils import SavePathType, decorate_all_methods, save_output
+from utils import SavePathType, decorate_all_methods, save_output, instrument
+from data_sources.price_store import PRICE_STORE
+from data_sources.cache_utils import CACHE_PATH, TTLCache
+
+
+# Seconds each yfinance dataset stays fresh. Company profiles and filings-based
+# statements change rarely; quotes inside ``info`` move during the session.
+TICKER_CACHE_TTLS = {
+    "info": 15 * 60,
+    "financials": 24 * 3600,
+    "balance_sheet": 24 * 3600,
+    "cashflow": 24 * 3600,
+    "recommendations": 6 * 3600,
+    "actions": 12 * 3600,
+}
+
+# Shared by every caller in the process and persisted to disk, so one report
+# hits Yahoo once per (symbol, dataset).
+TICKER_CACHE = TTLCache(
+    maxsize=512, disk_path=os.path.join(CACHE_PATH, "yfinance")
+)
+
+
+def cached_ticker_field(ticker: yf.Ticker, field: str) -> Any:
+    """Read a yf.Ticker attribute (info, financials, ...) through TICKER_CACHE."""
+    return TICKER_CACHE.get_or_load(
+        (ticker.ticker.upper(), field),
+        lambda: getattr(ticker, field),
+        ttl=TICKER_CACHE_TTLS[field],
+    )
+
+
+def corporate_actions(ticker: yf.Ticker) -> list:
+    """Dividends and splits of ticker as [date, dividend, split ratio] rows."""
+    actions = cached_ticker_field(ticker, "actions")
+    if actions is None or actions.empty:
+        return []
+    return [
+        [
+            index.strftime("%Y-%m-%d"),
+            float(row.get("Dividends", 0.0)),
+            float(row.get("Stock Splits", 0.0)),
+        ]
+        for index, row in actions.iterrows()
+    ]
 
 
 def init_ticker(func: Callable) -> Callable:
@@ -10,11 +57,13 @@ def init_ticker(func: Callable) -> Callable:
 
     @wraps(func)
     def wrapper(symbol: Annotated[str, "ticker symbol"], *args, **kwargs) -> Any:
-        ticker = yf.Ticker(symbol)
+        # Batch methods take a list of symbols and talk to yf.download directly.
+        ticker = yf.Ticker(symbol) if isinstance(symbol, str) else symbol
         return func(ticker, *args, **kwargs)
 
     return wrapper
 
+@decorate_all_methods(instrument)
 @decorate_all_methods(init_ticker)
 class YFinanceUtils:
 
@@ -30,18 +79,86 @@ class YFinanceUtils:
     ) -> DataFrame:
         """retrieve stock price data for designated ticker symbol"""
         ticker = symbol
-        stock_data = ticker.history(start=start_date, end=end_date)
+        # Served from the local price store; only uncovered date ranges hit Yahoo.
+        # Yahoo adjusts past bars for later actions, so a new split or dividend
+        # makes the store refetch the symbol rather than stitch two bases.
+        stock_data = PRICE_STORE.get(
+            ticker.ticker,
+            start_date,
+            end_date,
+            lambda start, end: ticker.history(start=start, end=end),
+            actions=lambda: corporate_actions(ticker),
+        )
 
         save_output(stock_data, f"Stock data for {ticker.ticker}", save_path)
         return stock_data
 
+    def get_stock_data_batch(
+        symbols: Annotated[list[str], "list of ticker symbols"],
+        start_date: Annotated[
+            str, "start date for retrieving stock price data, YYYY-mm-dd"
+        ],
+        end_date: Annotated[
+            str, "end date for retrieving stock price data, YYYY-mm-dd"
+        ],
+        layout: Annotated[
+            str,
+            "'wide' (columns are field x ticker), 'long' (one row per date and ticker) or 'panel' (dict of aligned dates x tickers NumPy arrays keyed by lower-case field). Default to 'wide'",
+        ] = "wide",
+        chunk_size: Annotated[
+            int, "maximum number of symbols per bulk request, default to 200"
+        ] = 200,
+        save_path: SavePathType = None,
+    ) -> DataFrame | dict:
+        """retrieve stock price data for many ticker symbols in bulk threaded downloads"""
+        # yf.download upper-cases tickers, so match on the same spelling.
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        chunks = []
+        for i in range(0, len(symbols), chunk_size):
+            chunk = symbols[i : i + chunk_size]
+            data = yf.download(
+                chunk,
+                start=start_date,
+                end=end_date,
+                auto_adjust=True,
+                group_by="column",
+                threads=True,
+                progress=False,
+            )
+            if not isinstance(data.columns, pd.MultiIndex):
+                data.columns = pd.MultiIndex.from_product([data.columns, chunk])
+            chunks.append(data)
+
+        wide = pd.concat(chunks, axis=1).sort_index()
+        wide = wide.dropna(axis=1, how="all")
+        fields = wide.columns.get_level_values(0).unique()
+        tickers = [t for t in symbols if t in wide.columns.get_level_values(1)]
+        wide = wide.reindex(columns=pd.MultiIndex.from_product([fields, tickers]))
+
+        if layout == "wide":
+            output = wide
+        elif layout == "long":
+            output = wide.stack(level=1, future_stack=True).dropna(how="all")
+            output = output.rename_axis(index=["Date", "Ticker"]).reset_index()
+        elif layout == "panel":
+            output = {"dates": wide.index, "tickers": tickers}
+            for field in fields:
+                output[field.lower()] = (
+                    wide[field].reindex(columns=tickers).to_numpy(dtype=np.float64)
+                )
+            return output
+        else:
+            raise ValueError("layout must be one of 'wide', 'long' or 'panel'")
+
+        save_output(output, f"Stock data for {len(tickers)} symbols", save_path)
+        return output
 
     def get_stock_info(
         symbol: Annotated[str, "ticker symbol"],
     ) -> dict:
         """Fetches and returns latest stock information."""
         ticker = symbol
-        stock_info = ticker.info
+        stock_info = cached_ticker_field(ticker, "info")
         return stock_info
 
     def get_company_info(
@@ -50,7 +167,7 @@ class YFinanceUtils:
     ) -> DataFrame:
         """Fetches and returns company information as a DataFrame."""
         ticker = symbol
-        info = ticker.info
+        info = cached_ticker_field(ticker, "info")
         company_info = {
             "Company Name": info.get("shortName", "N/A"),
             "Industry": info.get("industry", "N/A"),
@@ -79,25 +196,25 @@ class YFinanceUtils:
     def get_income_stmt(symbol: Annotated[str, "ticker symbol"]) -> DataFrame:
         """Fetches and returns the latest income statement of the company as a DataFrame."""
         ticker = symbol
-        income_stmt = ticker.financials
+        income_stmt = cached_ticker_field(ticker, "financials")
         return income_stmt
 
     def get_balance_sheet(symbol: Annotated[str, "ticker symbol"]) -> DataFrame:
         """Fetches and returns the latest balance sheet of the company as a DataFrame."""
         ticker = symbol
-        balance_sheet = ticker.balance_sheet
+        balance_sheet = cached_ticker_field(ticker, "balance_sheet")
         return balance_sheet
 
     def get_cash_flow(symbol: Annotated[str, "ticker symbol"]) -> DataFrame:
         """Fetches and returns the latest cash flow statement of the company as a DataFrame."""
         ticker = symbol
-        cash_flow = ticker.cashflow
+        cash_flow = cached_ticker_field(ticker, "cashflow")
         return cash_flow
 
     def get_analyst_recommendations(symbol: Annotated[str, "ticker symbol"]) -> tuple:
         """Fetches the latest analyst recommendations and returns the most common recommendation and its count."""
         ticker = symbol
-        recommendations = ticker.recommendations
+        recommendations = cached_ticker_field(ticker, "recommendations")
         if recommendations.empty:
             return None, 0  # No recommendations available
 
@@ -1,6 +1,28 @@
-from functional.analyzer import ReportAnalysisUtils
-from functional.charting import MplFinanceUtils, ReportChartUtils
-from functional.coding import CodingUtils, IPythonUtils
-from functional.quantitative import BackTraderUtils
-from functional.reportlab import ReportLabUtils
-from functional.text import TextUtils
+import importlib
+
+# Each tool is imported on first attribute access; plotting, reportlab,
+# backtrader and IPython are only loaded by the tools that use them.
+_MODULES = {
+    "ReportAnalysisUtils": "functional.analyzer",
+    "MplFinanceUtils": "functional.charting",
+    "ReportChartUtils": "functional.charting",
+    "CodingUtils": "functional.coding",
+    "IPythonUtils": "functional.coding",
+    "BackTraderUtils": "functional.quantitative",
+    "ReportLabUtils": "functional.reportlab",
+    "TextUtils": "functional.text",
+}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_MODULES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
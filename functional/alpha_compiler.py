@@ -0,0 +1,495 @@
+"""
+Compile "101 Formulaic Alphas" expression strings into a shared DAG.
+
+Expressions such as ``rank(correlation(vwap, sum(adv10, 49.6), 8.47))`` are
+parsed into typed nodes (scalar, panel or industry grouping). Nodes are
+hash-consed, so identical subterms across a whole batch of alphas -- the many
+``rank(vwap)`` and ``adv20`` terms -- become a single node that is evaluated
+once with the kernels in ``functional.alpha_ops``.
+"""
+
+import re
+import numpy as np
+from typing import Annotated, Dict, Iterable, List, Tuple
+
+from functional import alpha_ops
+
+
+SCALAR, PANEL, GROUP = "scalar", "panel", "group"
+
+INPUT_FIELDS = ["open", "high", "low", "close", "volume", "vwap", "returns", "cap"]
+GROUP_FIELDS = ["sector", "industry", "subindustry"]
+
+# time-series operator -> number of panel arguments before the window
+TS_OPERATORS = {
+    "delay": 1,
+    "delta": 1,
+    "ts_sum": 1,
+    "ts_mean": 1,
+    "ts_product": 1,
+    "stddev": 1,
+    "decay_linear": 1,
+    "ts_min": 1,
+    "ts_max": 1,
+    "ts_argmax": 1,
+    "ts_argmin": 1,
+    "ts_rank": 1,
+    "correlation": 2,
+    "covariance": 2,
+}
+FUNCTION_ALIASES = {
+    "sum": "ts_sum",
+    "product": "ts_product",
+    "mean": "ts_mean",
+    "ts_stddev": "stddev",
+    "ts_correlation": "correlation",
+    "ts_covariance": "covariance",
+    "ts_decay_linear": "decay_linear",
+    "ts_delay": "delay",
+    "ts_delta": "delta",
+}
+COMMUTATIVE = {"add", "mul", "min", "max", "eq", "ne", "or", "and", "correlation", "covariance"}
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<num>\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)"
+    r"|(?P<name>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)?)"
+    r"|(?P<op>&&|\|\||<=|>=|==|!=|[-+*/^<>?:(),]))"
+)
+_LABEL = re.compile(r"^\s*alpha\s*#?\s*(\d+)\s*:", re.IGNORECASE)
+_ADV = re.compile(r"^adv(\d+)$")
+
+_BINARY = {
+    "+": "add",
+    "-": "sub",
+    "*": "mul",
+    "/": "div",
+    "^": "pow",
+    "<": "lt",
+    ">": "gt",
+    "<=": "le",
+    ">=": "ge",
+    "==": "eq",
+    "!=": "ne",
+    "||": "or",
+    "&&": "and",
+}
+
+
+class AlphaSyntaxError(ValueError):
+    """Raised when an alpha expression cannot be parsed or type-checked."""
+
+
+class Node:
+    """One unique operation in the alpha DAG."""
+
+    __slots__ = ("id", "op", "args", "params", "kind", "value")
+
+    def __init__(self, id, op, args, params, kind, value=None):
+        self.id = id
+        self.op = op
+        self.args = args
+        self.params = params
+        self.kind = kind
+        self.value = value
+
+    def __repr__(self):
+        if self.op == "const":
+            return f"Node({self.id}, const={self.value})"
+        inner = ", ".join([f"#{a.id}" for a in self.args] + [str(p) for p in self.params])
+        return f"Node({self.id}, {self.op}({inner}), {self.kind})"
+
+
+class AlphaCompiler:
+    """Parses expressions into a hash-consed DAG shared by every compiled alpha."""
+
+    def __init__(self):
+        self.nodes: List[Node] = []
+        self._interned: Dict[tuple, Node] = {}
+        self.terms_parsed = 0
+
+    # DAG construction
+
+    def _intern(self, op, args=(), params=(), kind=PANEL, value=None) -> Node:
+        self.terms_parsed += 1
+        if op in COMMUTATIVE:
+            args = tuple(sorted(args, key=lambda n: n.id))
+        key = (op, tuple(a.id for a in args), params, value)
+        node = self._interned.get(key)
+        if node is None:
+            node = Node(len(self.nodes), op, tuple(args), params, kind, value)
+            self.nodes.append(node)
+            self._interned[key] = node
+        return node
+
+    def const(self, value: float) -> Node:
+        return self._intern("const", kind=SCALAR, value=float(value))
+
+    def apply(self, op: str, *args: Node) -> Node:
+        """Element-wise operation; scalar-only operands are folded at compile time."""
+        if all(a.kind == SCALAR for a in args):
+            return self.const(_ELEMENTWISE[op](*[a.value for a in args]))
+        if any(a.kind == GROUP for a in args):
+            raise AlphaSyntaxError(f"Industry classification cannot be used in '{op}'")
+        return self._intern(op, args)
+
+    # Parsing
+
+    def parse(self, expression: str) -> Node:
+        tokens = self._tokenize(expression)
+        self._tokens, self._pos, self._text = tokens, 0, expression
+        node = self._ternary()
+        if self._pos != len(tokens):
+            self._fail(f"unexpected token '{tokens[self._pos]}'")
+        if node.kind == GROUP:
+            self._fail("expression evaluates to an industry classification")
+        return node
+
+    def _tokenize(self, expression: str) -> List[str]:
+        tokens, pos = [], 0
+        expression = expression.rstrip()
+        while pos < len(expression):
+            match = _TOKEN.match(expression, pos)
+            if not match:
+                raise AlphaSyntaxError(
+                    f"Invalid character {expression[pos:].strip()[:1]!r} at position {pos} in {expression!r}"
+                )
+            tokens.append(match.group(match.lastgroup))
+            pos = match.end()
+        return tokens
+
+    def _fail(self, message):
+        raise AlphaSyntaxError(f"{message} in {self._text!r}")
+
+    def _peek(self):
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+
+    def _take(self, expected=None):
+        token = self._peek()
+        if token is None or (expected is not None and token != expected):
+            self._fail(f"expected '{expected or 'token'}' but found '{token}'")
+        self._pos += 1
+        return token
+
+    def _ternary(self) -> Node:
+        cond = self._binary(0)
+        if self._peek() == "?":
+            self._take("?")
+            if_true = self._ternary()
+            self._take(":")
+            if_false = self._ternary()
+            return self.apply("where", cond, if_true, if_false)
+        return cond
+
+    _LEVELS = [("||",), ("&&",), ("<", ">", "<=", ">=", "==", "!="), ("+", "-"), ("*", "/")]
+
+    def _binary(self, level: int) -> Node:
+        if level == len(self._LEVELS):
+            return self._unary()
+        left = self._binary(level + 1)
+        while self._peek() in self._LEVELS[level]:
+            op = _BINARY[self._take()]
+            left = self.apply(op, left, self._binary(level + 1))
+        return left
+
+    def _unary(self) -> Node:
+        if self._peek() == "-":
+            self._take()
+            return self.apply("neg", self._unary())
+        if self._peek() == "+":
+            self._take()
+            return self._unary()
+        return self._power()
+
+    def _power(self) -> Node:
+        base = self._primary()
+        if self._peek() == "^":
+            self._take()
+            return self.apply("pow", base, self._unary())
+        return base
+
+    def _primary(self) -> Node:
+        token = self._take()
+        if token == "(":
+            node = self._ternary()
+            self._take(")")
+            return node
+        if token[0].isdigit() or token[0] == ".":
+            return self.const(float(token))
+        if not (token[0].isalpha() or token[0] == "_"):
+            self._fail(f"unexpected token '{token}'")
+        if self._peek() == "(":
+            self._take("(")
+            args = []
+            if self._peek() != ")":
+                args.append(self._ternary())
+                while self._peek() == ",":
+                    self._take(",")
+                    args.append(self._ternary())
+            self._take(")")
+            return self._call(token.lower(), args)
+        return self._variable(token.lower())
+
+    def _variable(self, name: str) -> Node:
+        if name.startswith("indclass."):
+            group = name.split(".", 1)[1]
+            if group not in GROUP_FIELDS:
+                self._fail(f"unknown industry classification '{name}'")
+            return self._intern("input", params=(group,), kind=GROUP)
+        match = _ADV.match(name)
+        if match:
+            volume = self._intern("input", params=("volume",))
+            vwap = self._intern("input", params=("vwap",))
+            return self._intern("adv", (volume, vwap), (int(match.group(1)),))
+        if name not in INPUT_FIELDS:
+            self._fail(f"unknown variable '{name}'")
+        return self._intern("input", params=(name,))
+
+    def _window(self, name: str, node: Node) -> int:
+        if node.kind != SCALAR:
+            self._fail(f"window of '{name}' must be a constant")
+        return max(int(np.floor(node.value)), 1)
+
+    def _call(self, name: str, args: List[Node]) -> Node:
+        name = FUNCTION_ALIASES.get(name, name)
+
+        def arity(*counts):
+            if len(args) not in counts:
+                self._fail(f"'{name}' takes {' or '.join(map(str, counts))} arguments, got {len(args)}")
+
+        if name in ("min", "max"):
+            arity(2)
+            # min(x, d) is the time-series operator, min(x, y) the element-wise one.
+            if args[1].kind == SCALAR and args[0].kind != SCALAR:
+                name = "ts_" + name
+            else:
+                return self.apply(name, *args)
+
+        if name in TS_OPERATORS:
+            n_panels = TS_OPERATORS[name]
+            arity(n_panels + 1)
+            panels = args[:n_panels]
+            if any(a.kind != PANEL for a in panels):
+                self._fail(f"'{name}' expects a time series as its first {n_panels} argument(s)")
+            return self._intern(name, tuple(panels), (self._window(name, args[-1]),))
+        if name == "rank":
+            arity(1)
+            if args[0].kind != PANEL:
+                self._fail("'rank' expects a time series")
+            return self._intern("rank", (args[0],))
+        if name in ("abs", "log", "sign"):
+            arity(1)
+            return self.apply(name, args[0])
+        if name == "scale":
+            arity(1, 2)
+            a = args[1].value if len(args) == 2 and args[1].kind == SCALAR else 1.0
+            if len(args) == 2 and args[1].kind != SCALAR:
+                self._fail("scale factor must be a constant")
+            return self._intern("scale", (args[0],), (a,))
+        if name == "signedpower":
+            arity(2)
+            return self.apply("signedpower", *args)
+        if name == "indneutralize":
+            arity(2)
+            if args[1].kind != GROUP:
+                self._fail("second argument of 'indneutralize' must be an IndClass")
+            return self._intern("indneutralize", (args[0], args[1]))
+        self._fail(f"unknown function '{name}'")
+
+
+def _compare(fn):
+    def op(a, b):
+        with np.errstate(invalid="ignore"):
+            out = fn(a, b).astype(np.float64)
+        return np.where(np.isnan(a) | np.isnan(b), np.nan, out)
+
+    return op
+
+
+def _logical(fn):
+    def op(a, b):
+        out = fn(np.nan_to_num(a) != 0, np.nan_to_num(b) != 0).astype(np.float64)
+        return np.where(np.isnan(a) | np.isnan(b), np.nan, out)
+
+    return op
+
+
+def _where(cond, if_true, if_false):
+    out = np.where(np.nan_to_num(cond) != 0, if_true, if_false)
+    return np.where(np.isnan(cond), np.nan, out)
+
+
+def _divide(a, b):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.true_divide(a, b)
+    return np.where(np.isinf(out), np.nan, out)
+
+
+def _log(a):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.log(a)
+
+
+def _power(a, b):
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        return np.power(a, b)
+
+
+_ELEMENTWISE = {
+    "add": np.add,
+    "sub": np.subtract,
+    "mul": np.multiply,
+    "div": _divide,
+    "pow": _power,
+    "neg": np.negative,
+    "abs": np.abs,
+    "log": _log,
+    "sign": np.sign,
+    "signedpower": lambda a, b: np.sign(a) * _power(np.abs(a), b),
+    "min": np.minimum,
+    "max": np.maximum,
+    "lt": _compare(np.less),
+    "gt": _compare(np.greater),
+    "le": _compare(np.less_equal),
+    "ge": _compare(np.greater_equal),
+    "eq": _compare(np.equal),
+    "ne": _compare(np.not_equal),
+    "or": _logical(np.logical_or),
+    "and": _logical(np.logical_and),
+    "where": _where,
+}
+
+
+class AlphaProgram:
+    """A batch of compiled alphas sharing one de-duplicated DAG."""
+
+    def __init__(self, compiler: AlphaCompiler, outputs: Dict[str, Node]):
+        self.nodes = list(compiler.nodes)
+        self.outputs = outputs
+        self.terms_parsed = compiler.terms_parsed
+
+    @property
+    def inputs(self) -> List[str]:
+        """Names of the data fields the program reads."""
+        return [n.params[0] for n in self.nodes if n.op == "input"]
+
+    def stats(self) -> dict:
+        """Number of parsed terms against number of unique nodes actually evaluated."""
+        return {
+            "alphas": len(self.outputs),
+            "terms_parsed": self.terms_parsed,
+            "unique_nodes": len(self.nodes),
+        }
+
+    def _schedule(self) -> List[Node]:
+        """Nodes reachable from the outputs, in evaluation (topological) order."""
+        needed = set()
+        stack = list(self.outputs.values())
+        while stack:
+            node = stack.pop()
+            if node.id not in needed:
+                needed.add(node.id)
+                stack.extend(node.args)
+        return [n for n in self.nodes if n.id in needed]
+
+    def evaluate(
+        self,
+        data: Annotated[
+            Dict[str, np.ndarray],
+            "field name -> (dates x tickers) panel, plus optional 'sector' / 'industry' / 'subindustry' labels",
+        ],
+    ) -> Dict[str, np.ndarray]:
+        """Evaluate every alpha, computing each unique node exactly once."""
+        schedule = self._schedule()
+        shape = np.shape(data[next(f for f in INPUT_FIELDS if f in data)])
+
+        # Free intermediates as soon as their last consumer has run.
+        remaining = {}
+        for node in schedule:
+            for arg in node.args:
+                remaining[arg.id] = remaining.get(arg.id, 0) + 1
+        keep = {n.id for n in self.outputs.values()}
+
+        values = {}
+        for node in schedule:
+            values[node.id] = self._evaluate_node(node, values, data)
+            for arg in node.args:
+                remaining[arg.id] -= 1
+                if remaining[arg.id] == 0 and arg.id not in keep:
+                    del values[arg.id]
+
+        results = {}
+        for name, node in self.outputs.items():
+            value = values[node.id]
+            results[name] = np.broadcast_to(value, shape).astype(np.float64) if node.kind == SCALAR else value
+        return results
+
+    @staticmethod
+    def _evaluate_node(node: Node, values: dict, data: dict):
+        args = [values[a.id] for a in node.args]
+        op = node.op
+        if op == "const":
+            return node.value
+        if op == "input":
+            field = node.params[0]
+            if field not in data:
+                raise KeyError(f"Alpha input '{field}' missing from data")
+            value = data[field]
+            return np.asarray(value) if node.kind == GROUP else alpha_ops._panel(value)
+        if op == "adv":
+            return alpha_ops.adv(args[0], node.params[0], price=args[1])
+        if op == "scale":
+            return alpha_ops.scale(args[0], node.params[0])
+        if op == "indneutralize":
+            return alpha_ops.indneutralize(args[0], args[1])
+        if op in TS_OPERATORS:
+            return alpha_ops.OPERATORS[op](*args, *node.params)
+        if op == "rank":
+            return alpha_ops.rank(args[0])
+        return _ELEMENTWISE[op](*args)
+
+
+def _named(expressions) -> Iterable[Tuple[str, str]]:
+    if isinstance(expressions, str):
+        expressions = [expressions]
+    items = expressions.items() if isinstance(expressions, dict) else enumerate(expressions)
+    for name, expression in items:
+        label = _LABEL.match(expression)
+        if label:
+            expression = expression[label.end():]
+            if not isinstance(name, str):
+                name = f"Alpha#{label.group(1)}"
+        yield (name if isinstance(name, str) else f"alpha_{name}"), expression
+
+
+def compile_alphas(
+    expressions: Annotated[
+        Dict[str, str] | List[str] | str,
+        "alpha expressions, optionally keyed by name; a leading 'Alpha#N:' label is used as the name",
+    ],
+) -> AlphaProgram:
+    """Parse a batch of alpha expressions into a single de-duplicated program."""
+    compiler = AlphaCompiler()
+    outputs = {name: compiler.parse(expression) for name, expression in _named(expressions)}
+    return AlphaProgram(compiler, outputs)
+
+
+def prepare_inputs(
+    panel: Annotated[Dict[str, np.ndarray], "OHLCV panels keyed by lower-case field name"],
+) -> Dict[str, np.ndarray]:
+    """Add the derived fields the alphas expect (vwap, returns) when the source lacks them."""
+    data = {k.lower(): v for k, v in panel.items()}
+    close = alpha_ops._panel(data["close"])
+    if "vwap" not in data:
+        # Typical price is the usual stand-in when no intraday VWAP is available.
+        data["vwap"] = (alpha_ops._panel(data["high"]) + alpha_ops._panel(data["low"]) + close) / 3
+    if "returns" not in data:
+        data["returns"] = _divide(close, alpha_ops.delay(close, 1)) - 1
+    return data
+
+
+def evaluate_alphas(
+    expressions: Annotated[Dict[str, str] | List[str] | str, "alpha expressions to evaluate"],
+    data: Annotated[Dict[str, np.ndarray], "field name -> (dates x tickers) panel"],
+) -> Dict[str, np.ndarray]:
+    """Compile and evaluate a batch of alphas over the same data in one pass."""
+    return compile_alphas(expressions).evaluate(prepare_inputs(data))
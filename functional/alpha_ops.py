@@ -0,0 +1,329 @@
+"""
+Operators of the "101 Formulaic Alphas" paper as batched NumPy kernels.
+
+Every operator works on (dates x tickers) float panels, so one call evaluates
+the whole universe at once. Missing values are NaN; a rolling window that
+contains a NaN yields NaN, and the first ``d - 1`` rows of a ``d``-day window
+are NaN as well. Time-series windows given as floats (e.g. ``8.47``) are
+floored, as in the paper.
+"""
+
+import warnings
+import numpy as np
+
+
+def _panel(x) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[:, None]
+    return x
+
+
+def _window(d) -> int:
+    return max(int(np.floor(d)), 1)
+
+
+def _lag(x: np.ndarray, k: int) -> np.ndarray:
+    """Shift a panel k rows forward in time, padding with NaN."""
+    if k == 0:
+        return x
+    out = np.full_like(x, np.nan)
+    if k < x.shape[0]:
+        out[k:] = x[:-k]
+    return out
+
+
+def _rolling_sum(x: np.ndarray, d: int) -> np.ndarray:
+    """Rolling sum via cumulative sums, NaN if any value in the window is NaN."""
+    out = np.full_like(x, np.nan)
+    if d > x.shape[0]:
+        return out
+    nan_mask = np.isnan(x)
+    has_nan = nan_mask.any()
+    csum = np.cumsum(np.where(nan_mask, 0.0, x) if has_nan else x, axis=0)
+    out[d - 1 :] = csum[d - 1 :]
+    out[d:] -= csum[:-d]
+    if has_nan:
+        ncount = np.cumsum(nan_mask, axis=0)
+        nans = ncount[d - 1 :].copy()
+        nans[1:] -= ncount[:-d]
+        out[d - 1 :][nans > 0] = np.nan
+    return out
+
+
+def _window_mask(x: np.ndarray, d: int) -> np.ndarray:
+    """True where the d-day window ending at each row is complete and NaN free."""
+    mask = np.zeros(x.shape, dtype=bool)
+    mask[d - 1 :] = True
+    nan_mask = np.isnan(x)
+    if nan_mask.any():
+        mask &= _rolling_sum(nan_mask.astype(np.float64), d) == 0
+    return mask
+
+
+# Cross-sectional operators
+
+
+def rank(x) -> np.ndarray:
+    """Cross-sectional percentile rank of each row (ties averaged, NaN kept)."""
+    x = _panel(x)
+    n_rows, n_cols = x.shape
+    order = np.argsort(x, axis=1, kind="stable")  # NaN sorts last
+    sorted_x = np.take_along_axis(x, order, axis=1)
+
+    # Every element of a run of ties gets the average of the run's positions.
+    positions = np.broadcast_to(np.arange(n_cols), x.shape)
+    new_run = np.ones(x.shape, dtype=bool)
+    new_run[:, 1:] = sorted_x[:, 1:] != sorted_x[:, :-1]
+    run_start = np.maximum.accumulate(np.where(new_run, positions, 0), axis=1)
+    run_end = np.ones(x.shape, dtype=bool)
+    run_end[:, :-1] = new_run[:, 1:]
+    run_stop = np.minimum.accumulate(
+        np.where(run_end, positions, n_cols - 1)[:, ::-1], axis=1
+    )[:, ::-1]
+    sorted_rank = (run_start + run_stop) / 2 + 1
+
+    valid = np.count_nonzero(~np.isnan(x), axis=1, keepdims=True)
+    out = np.empty_like(x)
+    np.put_along_axis(out, order, sorted_rank, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out /= valid
+    out[np.isnan(x)] = np.nan
+    return out
+
+
+def scale(x, a: float = 1.0) -> np.ndarray:
+    """Rescale each row so that sum(abs(x)) = a."""
+    x = _panel(x)
+    gross = np.nansum(np.abs(x), axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(gross > 0, x * a / gross, np.nan)
+
+
+def indneutralize(x, groups) -> np.ndarray:
+    """
+    Demean x cross-sectionally within each group.
+
+    ``groups`` holds integer labels (industry, sector, ...) per ticker, either
+    as a (tickers,) vector or a (dates x tickers) panel.
+    """
+    x = _panel(x)
+    groups = np.broadcast_to(np.asarray(groups), x.shape)
+    out = np.full_like(x, np.nan)
+    valid = ~np.isnan(x)
+    for g in np.unique(groups):
+        mask = (groups == g) & valid
+        count = mask.sum(axis=1, keepdims=True)
+        total = np.where(mask, x, 0.0).sum(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+        out = np.where(mask, x - mean, out)
+    return out
+
+
+# Element-wise operators
+
+
+def signedpower(x, a) -> np.ndarray:
+    """sign(x) * abs(x)^a"""
+    x = _panel(x)
+    return np.sign(x) * np.power(np.abs(x), a)
+
+
+def log(x) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.log(_panel(x))
+
+
+def sign(x) -> np.ndarray:
+    return np.sign(_panel(x))
+
+
+# Time-series operators
+
+
+def delay(x, d) -> np.ndarray:
+    """Value of x d days ago."""
+    return _lag(_panel(x), _window(d))
+
+
+def delta(x, d) -> np.ndarray:
+    """Today's value of x minus the value of x d days ago."""
+    x = _panel(x)
+    return x - _lag(x, _window(d))
+
+
+def ts_sum(x, d) -> np.ndarray:
+    """Time-series sum over the past d days."""
+    return _rolling_sum(_panel(x), _window(d))
+
+
+def ts_mean(x, d) -> np.ndarray:
+    """Time-series mean over the past d days."""
+    d = _window(d)
+    return _rolling_sum(_panel(x), d) / d
+
+
+def ts_product(x, d) -> np.ndarray:
+    """Time-series product over the past d days."""
+    x = _panel(x)
+    d = _window(d)
+    out = x.copy()
+    for k in range(1, d):
+        out[k:] *= x[:-k]
+    out[: d - 1] = np.nan
+    return out
+
+
+def _centered(x: np.ndarray) -> np.ndarray:
+    # Centering each column first keeps the cumulative sums well conditioned
+    # for large-valued inputs such as volume.
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return x - np.nanmean(x, axis=0)
+
+
+def stddev(x, d) -> np.ndarray:
+    """Moving time-series (population) standard deviation over the past d days."""
+    x = _centered(_panel(x))
+    d = _window(d)
+    mean_x = _rolling_sum(x, d) / d
+    var_x = _rolling_sum(x * x, d) / d - mean_x * mean_x
+    return np.sqrt(np.maximum(var_x, 0.0))
+
+
+def covariance(x, y, d) -> np.ndarray:
+    """Time-serial (population) covariance of x and y for the past d days."""
+    x, y = _centered(_panel(x)), _centered(_panel(y))
+    d = _window(d)
+    mean_x = _rolling_sum(x, d) / d
+    mean_y = _rolling_sum(y, d) / d
+    return _rolling_sum(x * y, d) / d - mean_x * mean_y
+
+
+def correlation(x, y, d) -> np.ndarray:
+    """Time-serial correlation of x and y for the past d days."""
+    x, y = _centered(_panel(x)), _centered(_panel(y))
+    d = _window(d)
+    mean_x = _rolling_sum(x, d) / d
+    mean_y = _rolling_sum(y, d) / d
+    cov = _rolling_sum(x * y, d) / d - mean_x * mean_y
+    var_x = _rolling_sum(x * x, d) / d - mean_x * mean_x
+    var_y = _rolling_sum(y * y, d) / d - mean_y * mean_y
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = cov / np.sqrt(var_x * var_y)
+        corr[(var_x <= 1e-12) | (var_y <= 1e-12)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def decay_linear(x, d) -> np.ndarray:
+    """Weighted moving average over the past d days, weights d, d-1, ..., 1 (rescaled to sum to 1)."""
+    x = _panel(x)
+    d = _window(d)
+    out = d * x
+    for k in range(1, d):
+        out[k:] += (d - k) * x[:-k]
+    out[: d - 1] = np.nan
+    return out / (d * (d + 1) / 2)
+
+
+def ts_min(x, d) -> np.ndarray:
+    """Time-series min over the past d days."""
+    x = _panel(x)
+    d = _window(d)
+    out = x.copy()
+    for k in range(1, d):
+        np.minimum(out[k:], x[:-k], out=out[k:])
+    out[: d - 1] = np.nan
+    return out
+
+
+def ts_max(x, d) -> np.ndarray:
+    """Time-series max over the past d days."""
+    x = _panel(x)
+    d = _window(d)
+    out = x.copy()
+    for k in range(1, d):
+        np.maximum(out[k:], x[:-k], out=out[k:])
+    out[: d - 1] = np.nan
+    return out
+
+
+def _ts_argext(x: np.ndarray, d: int, better) -> np.ndarray:
+    best = x.copy()
+    lag_of_best = np.zeros_like(x)
+    for k in range(1, d):
+        lagged, current = x[:-k], best[k:]
+        # Ties resolve to the oldest observation, like np.argmax over the window.
+        take = ~better(current, lagged)
+        np.copyto(current, lagged, where=take)
+        np.copyto(lag_of_best[k:], k, where=take)
+    # Position inside the window, 1 = oldest day, d = today.
+    out = d - lag_of_best
+    out[~_window_mask(x, d)] = np.nan
+    return out
+
+
+def ts_argmax(x, d) -> np.ndarray:
+    """Which day ts_max(x, d) occurred on, as a 1-based position in the window (d = today)."""
+    return _ts_argext(_panel(x), _window(d), np.greater)
+
+
+def ts_argmin(x, d) -> np.ndarray:
+    """Which day ts_min(x, d) occurred on, as a 1-based position in the window (d = today)."""
+    return _ts_argext(_panel(x), _window(d), np.less)
+
+
+def ts_rank(x, d) -> np.ndarray:
+    """Time-series percentile rank of today's value within the past d days."""
+    x = _panel(x)
+    d = _window(d)
+    less = np.zeros_like(x)
+    equal = np.zeros_like(x)
+    for k in range(1, d):
+        lagged, current = x[:-k], x[k:]
+        less[k:] += lagged < current
+        equal[k:] += lagged == current
+    # Average rank of today's value among the window, ties included.
+    out = (less + (equal + 2) / 2) / d
+    out[~_window_mask(x, d)] = np.nan
+    return out
+
+
+def adv(volume, d, price=None) -> np.ndarray:
+    """
+    Average daily dollar volume for the past d days.
+
+    If ``price`` is None, ``volume`` is taken to already be in dollars.
+    """
+    volume = _panel(volume)
+    if price is not None:
+        volume = volume * _panel(price)
+    return ts_mean(volume, d)
+
+
+OPERATORS = {
+    "rank": rank,
+    "scale": scale,
+    "indneutralize": indneutralize,
+    "signedpower": signedpower,
+    "log": log,
+    "sign": sign,
+    "delay": delay,
+    "delta": delta,
+    "sum": ts_sum,
+    "ts_sum": ts_sum,
+    "ts_mean": ts_mean,
+    "product": ts_product,
+    "ts_product": ts_product,
+    "stddev": stddev,
+    "covariance": covariance,
+    "correlation": correlation,
+    "decay_linear": decay_linear,
+    "ts_min": ts_min,
+    "ts_max": ts_max,
+    "ts_argmax": ts_argmax,
+    "ts_argmin": ts_argmin,
+    "ts_rank": ts_rank,
+    "adv": adv,
+}
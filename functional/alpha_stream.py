@@ -0,0 +1,290 @@
+"""
+Incremental evaluation of compiled alphas, one cross-section at a time.
+
+Each rolling node of an ``AlphaProgram`` keeps a ring buffer of its last
+``d`` inputs. Sums, moments (stddev / covariance / correlation), linear decay
+and delays are updated in O(1) per ticker from running totals; rank-type and
+extremum windows (ts_rank, ts_min/ts_max, ts_argmax/ts_argmin, product) are a
+single vectorized pass over the (d x tickers) buffer. Stateless operators
+(arithmetic, rank, scale, indneutralize) reuse the batch kernels on a one-row
+panel, so a pushed bar produces exactly the last row of the batch result.
+"""
+
+import numpy as np
+from typing import Annotated, Dict
+
+from functional.alpha_compiler import GROUP_FIELDS, AlphaProgram, Node, _divide, compile_alphas
+
+
+# Running totals drift with floating point error; rebuild them from the
+# buffer every this many pushes.
+RESYNC_INTERVAL = 1024
+
+
+class _Ring:
+    """Fixed-size (d x tickers) ring buffer of the most recent rows."""
+
+    def __init__(self, d: int, n: int, fill: float = np.nan):
+        self.d = d
+        self.buffer = np.full((d, n), fill)
+        self.pos = 0
+        self.count = 0
+
+    def push(self, row: np.ndarray) -> np.ndarray:
+        """Store a row and return the row it evicts (the fill value while filling)."""
+        evicted = self.buffer[self.pos].copy()
+        self.buffer[self.pos] = row
+        self.pos = (self.pos + 1) % self.d
+        self.count = min(self.count + 1, self.d)
+        return evicted
+
+    def ordered(self) -> np.ndarray:
+        """Buffer rows from oldest to newest."""
+        return np.concatenate([self.buffer[self.pos :], self.buffer[: self.pos]])
+
+    def oldest(self) -> np.ndarray:
+        return self.buffer[self.pos]
+
+    def full(self) -> bool:
+        return self.count == self.d
+
+    def complete(self) -> np.ndarray:
+        """Per ticker: True if the window is full and NaN free."""
+        if not self.full():
+            return np.zeros(self.buffer.shape[1], dtype=bool)
+        return ~np.isnan(self.buffer).any(axis=0)
+
+
+class _RollingSums:
+    """O(1) rolling sums of several aligned series; a NaN in any series masks the row."""
+
+    def __init__(self, d: int, n: int, series: int):
+        self.d = d
+        self.values = _Ring(d, series * n, fill=0.0)
+        self.nan_flags = _Ring(d, n, fill=0.0)
+        self.sums = np.zeros((series, n))
+        self.nans = np.zeros(n)
+        self.pushes = 0
+
+    def push(self, *rows: np.ndarray) -> np.ndarray:
+        rows = np.stack(rows)
+        row_nan = np.isnan(rows).any(axis=0)
+        rows = np.where(row_nan, 0.0, rows)
+
+        evicted = self.values.push(rows.ravel()).reshape(rows.shape)
+        self.sums += rows - evicted
+        self.nans += row_nan - self.nan_flags.push(row_nan)
+
+        self.pushes += 1
+        if self.pushes % RESYNC_INTERVAL == 0:
+            self.sums = self.values.buffer.sum(axis=0).reshape(self.sums.shape)
+        valid = self.values.full() & (self.nans == 0)
+        return np.where(valid, self.sums, np.nan)
+
+    def window(self, series: int = 0) -> np.ndarray:
+        """Oldest-to-newest rows of one series (NaN rows stored as 0)."""
+        n = self.sums.shape[1]
+        return self.values.ordered()[:, series * n : (series + 1) * n]
+
+
+class _Delay:
+    def __init__(self, node: Node, n: int):
+        self.ring = _Ring(node.params[0] + 1, n)
+        self.is_delta = node.op == "delta"
+
+    def update(self, x):
+        row = x[0]
+        self.ring.push(row)
+        past = self.ring.oldest() if self.ring.full() else np.full_like(row, np.nan)
+        return (row - past if self.is_delta else past)[None, :]
+
+
+class _Sum:
+    def __init__(self, node: Node, n: int):
+        self.d = node.params[-1]
+        self.sums = _RollingSums(self.d, n, 1)
+        self.op = node.op
+
+    def update(self, x, price=None):
+        row = x[0] if price is None else x[0] * price[0]
+        total = self.sums.push(row)[0]
+        return (total if self.op == "ts_sum" else total / self.d)[None, :]
+
+
+class _Moments:
+    """stddev, covariance and correlation from running first and second moments."""
+
+    def __init__(self, node: Node, n: int):
+        self.d = node.params[0]
+        self.op = node.op
+        self.sums = _RollingSums(self.d, n, 5)
+        # Shifting each ticker by its first observation keeps the running
+        # second moments well conditioned (the streaming analogue of the
+        # column centering done by the batch kernels).
+        self.shift_x = None
+        self.shift_y = None
+
+    def update(self, x, y=None):
+        x = x[0]
+        y = x if y is None else y[0]
+        if self.shift_x is None:
+            self.shift_x = np.full_like(x, np.nan)
+            self.shift_y = np.full_like(y, np.nan)
+        self.shift_x = np.where(np.isnan(self.shift_x), x, self.shift_x)
+        self.shift_y = np.where(np.isnan(self.shift_y), y, self.shift_y)
+        x = x - np.nan_to_num(self.shift_x)
+        y = y - np.nan_to_num(self.shift_y)
+
+        s_x, s_y, s_xy, s_xx, s_yy = self.sums.push(x, y, x * y, x * x, y * y) / self.d
+        cov = s_xy - s_x * s_y
+        if self.op == "covariance":
+            return cov[None, :]
+        var_x = s_xx - s_x * s_x
+        if self.op == "stddev":
+            return np.sqrt(np.maximum(var_x, 0.0))[None, :]
+        var_y = s_yy - s_y * s_y
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.sqrt(var_x * var_y)
+            corr[(var_x <= 1e-12) | (var_y <= 1e-12)] = np.nan
+        return np.clip(corr, -1.0, 1.0)[None, :]
+
+
+class _DecayLinear:
+    """
+    Linearly weighted sum updated in O(1): W_t = W_{t-1} + d * x_t - S_{t-1},
+    where S_{t-1} is the plain sum of the previous window.
+    """
+
+    def __init__(self, node: Node, n: int):
+        self.d = node.params[0]
+        self.sums = _RollingSums(self.d, n, 1)
+        self.weighted = np.zeros(n)
+
+    def update(self, x):
+        row = x[0]
+        previous_sum = self.sums.sums[0].copy()
+        window_sum = self.sums.push(row)[0]
+        self.weighted += self.d * np.nan_to_num(row) - previous_sum
+        if self.sums.pushes % RESYNC_INTERVAL == 0:
+            weights = np.arange(1, self.d + 1)[:, None]
+            self.weighted = (weights * self.sums.window()).sum(axis=0)
+        out = np.where(np.isnan(window_sum), np.nan, self.weighted / (self.d * (self.d + 1) / 2))
+        return out[None, :]
+
+
+class _WindowScan:
+    """Operators that need the whole window: one vectorized pass over the ring buffer."""
+
+    def __init__(self, node: Node, n: int):
+        self.d = node.params[0]
+        self.op = node.op
+        self.ring = _Ring(self.d, n)
+
+    def update(self, x):
+        row = x[0]
+        self.ring.push(row)
+        complete = self.ring.complete()
+        window = self.ring.ordered()
+        with np.errstate(invalid="ignore"):
+            if self.op == "ts_min":
+                out = window.min(axis=0)
+            elif self.op == "ts_max":
+                out = window.max(axis=0)
+            elif self.op == "ts_product":
+                out = window.prod(axis=0)
+            elif self.op in ("ts_argmax", "ts_argmin"):
+                scan = np.nan_to_num(window, nan=0.0)
+                position = scan.argmax(axis=0) if self.op == "ts_argmax" else scan.argmin(axis=0)
+                out = position + 1.0
+            else:  # ts_rank
+                less = (window < row).sum(axis=0)
+                equal = (window == row).sum(axis=0)
+                out = (less + (equal + 1) / 2) / self.d
+        return np.where(complete, out, np.nan)[None, :]
+
+
+_STATEFUL = {
+    "delay": _Delay,
+    "delta": _Delay,
+    "ts_sum": _Sum,
+    "ts_mean": _Sum,
+    "adv": _Sum,
+    "stddev": _Moments,
+    "covariance": _Moments,
+    "correlation": _Moments,
+    "decay_linear": _DecayLinear,
+    "ts_min": _WindowScan,
+    "ts_max": _WindowScan,
+    "ts_argmax": _WindowScan,
+    "ts_argmin": _WindowScan,
+    "ts_rank": _WindowScan,
+    "ts_product": _WindowScan,
+}
+
+
+class StreamingAlphaProgram:
+    """Stateful evaluator that turns each new bar into the latest alpha values."""
+
+    def __init__(
+        self,
+        program: Annotated[AlphaProgram | dict | list | str, "compiled program or alpha expressions"],
+        n_tickers: Annotated[int, "number of tickers in every pushed cross-section"],
+    ):
+        if not isinstance(program, AlphaProgram):
+            program = compile_alphas(program)
+        self.program = program
+        self.n_tickers = n_tickers
+        self.schedule = program._schedule()
+        self.states = {
+            node.id: _STATEFUL[node.op](node, n_tickers)
+            for node in self.schedule
+            if node.op in _STATEFUL
+        }
+        self.bars = 0
+        self._prev_close = np.full((1, n_tickers), np.nan)
+
+    def push(
+        self,
+        bar: Annotated[
+            Dict[str, np.ndarray],
+            "field name -> (tickers,) values of the new bar, plus optional industry labels",
+        ],
+    ) -> Dict[str, np.ndarray]:
+        """Advance every rolling state by one bar and return the latest value of each alpha."""
+        data = {
+            k.lower(): np.asarray(v) if k.lower() in GROUP_FIELDS else np.asarray(v, dtype=np.float64)[None, :]
+            for k, v in bar.items()
+        }
+        # Derive vwap and returns like prepare_inputs does for the batch path.
+        if "close" in data:
+            close = data["close"]
+            if "vwap" not in data and "high" in data and "low" in data:
+                data["vwap"] = (data["high"] + data["low"] + close) / 3
+            if "returns" not in data:
+                data["returns"] = _divide(close, self._prev_close) - 1
+            self._prev_close = close
+        values = {}
+        for node in self.schedule:
+            state = self.states.get(node.id)
+            if state is None:
+                values[node.id] = AlphaProgram._evaluate_node(node, values, data)
+            else:
+                values[node.id] = state.update(*[values[a.id] for a in node.args])
+        self.bars += 1
+
+        results = {}
+        for name, node in self.program.outputs.items():
+            value = values[node.id]
+            results[name] = np.broadcast_to(value, (1, self.n_tickers))[0].astype(np.float64)
+        return results
+
+    def warm_up(
+        self,
+        data: Annotated[Dict[str, np.ndarray], "field name -> (dates x tickers) history panel"],
+    ) -> Dict[str, np.ndarray]:
+        """Replay a history panel through the states; returns the values after the last bar."""
+        length = len(next(v for k, v in data.items() if k not in GROUP_FIELDS))
+        results = {}
+        for t in range(length):
+            results = self.push({k: v if k in GROUP_FIELDS else v[t] for k, v in data.items()})
+        return results
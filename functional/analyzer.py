@@ -1,8 +1,14 @@
 import os
+import time
+import pickle
 from textwrap import dedent
 from typing import Annotated
 from datetime import timedelta, datetime
 from data_sources import YFinanceUtils, SECUtils, FMPUtils
+from data_sources.cache_utils import CACHE_PATH, TTLCache
+from data_sources.sec_utils import SECTION_MEMO
+from data_sources.yfinance_utils import TICKER_CACHE_TTLS
+from utils import run_dag
 from pathlib import Path
 
 
@@ -11,8 +17,6 @@ relative_path = Path("../financial_annual_report")
 # Resolve the relative path to an absolute path
 REPORT_DIRECTORY = relative_path.resolve()
 
-print("Report directory: ", REPORT_DIRECTORY)
-
 
 def combine_prompt(instruction, resource, table_str=None):
     if table_str:
@@ -29,7 +33,158 @@ def save_to_file(data: str, file_path: str):
         f.write(data)
 
 
+# 10-K sections read by the analyzer methods.
+SNAPSHOT_SECTIONS = ["1", "1A", "7"]
+
+# Statement fields of a snapshot and the yfinance dataset each one comes from.
+SNAPSHOT_FIELDS = {
+    "info": "info",
+    "income_stmt": "financials",
+    "balance_sheet": "balance_sheet",
+    "cash_flow": "cashflow",
+}
+
+# A snapshot is as fresh as its most volatile field (the stock info).
+SNAPSHOT_TTL = min(TICKER_CACHE_TTLS[dataset] for dataset in SNAPSHOT_FIELDS.values())
+
+# Snapshots already loaded, by (ticker, fyear); pickled to disk so later runs reuse them.
+FILING_SNAPSHOTS = TTLCache(
+    maxsize=32, ttl=SNAPSHOT_TTL, disk_path=os.path.join(CACHE_PATH, "filing_snapshots")
+)
+
+
+def _capture(load):
+    """Wrap a loader to return (value, None), or (None, exception) if it raised."""
+
+    def run():
+        try:
+            return load(), None
+        except Exception as e:
+            return None, e
+
+    return run
+
+
+class FilingSnapshot:
+    """
+    Everything the ReportAnalysisUtils methods read about one (ticker, fyear):
+    stock info, the three financial statements and the 10-K sections in
+    SNAPSHOT_SECTIONS. Loaded concurrently, once, and picklable.
+
+    A field that failed to load raises its error when read, so only the
+    methods that need it fail.
+    """
+
+    def __init__(self, ticker_symbol: str, fyear: str, values: dict, errors: dict, complete: bool):
+        self.ticker_symbol = ticker_symbol
+        self.fyear = fyear
+        self._values = values
+        self._errors = errors
+        # Whether every field loaded, so the snapshot may be registered and reused.
+        self.complete = complete
+        self.loaded_at = time.time()
+
+    @classmethod
+    def fetch(cls, ticker_symbol: str, fyear: str, max_workers: int = 8) -> "FilingSnapshot":
+        """Load a new snapshot from the data sources, bypassing the registry."""
+        tasks = {
+            "info": (lambda: YFinanceUtils.get_stock_info(ticker_symbol), []),
+            "income_stmt": (lambda: YFinanceUtils.get_income_stmt(ticker_symbol), []),
+            "balance_sheet": (lambda: YFinanceUtils.get_balance_sheet(ticker_symbol), []),
+            "cash_flow": (lambda: YFinanceUtils.get_cash_flow(ticker_symbol), []),
+        }
+        for section in SNAPSHOT_SECTIONS:
+            tasks[section] = (
+                lambda section=section: SECUtils.get_10k_section(ticker_symbol, fyear, section),
+                [],
+            )
+        tasks = {name: (_capture(load), deps) for name, (load, deps) in tasks.items()}
+        results = run_dag(tasks, max_workers=max_workers)
+        values = {name: value for name, (value, error) in results.items() if error is None}
+        errors = {name: error for name, (value, error) in results.items() if error is not None}
+
+        # get_10k_section returns error messages (or None without an API key)
+        # instead of raising; only text it also memoized is a real section.
+        def section_loaded(section):
+            text = values.get(section)
+            return (
+                isinstance(text, str)
+                and bool(text)
+                and SECTION_MEMO.get(f"{ticker_symbol}_{fyear}_{section}") == text
+            )
+
+        complete = not errors and all(section_loaded(s) for s in SNAPSHOT_SECTIONS)
+        return cls(ticker_symbol, fyear, values, errors, complete)
+
+    @classmethod
+    def load(cls, ticker_symbol: str, fyear: str) -> "FilingSnapshot":
+        """The registered snapshot of (ticker, fyear), fetching and registering it on first use."""
+        key = (ticker_symbol, fyear)
+        snapshot = FILING_SNAPSHOTS.get(key)
+        if snapshot is None:
+            snapshot = cls.fetch(ticker_symbol, fyear)
+            # A snapshot with a failed field is used once, not kept, so the
+            # next call retries the data sources.
+            if snapshot.complete:
+                FILING_SNAPSHOTS.set(key, snapshot)
+        return snapshot
+
+    def _field(self, name: str):
+        if name in self._errors:
+            raise self._errors[name]
+        return self._values[name]
+
+    @property
+    def info(self) -> dict:
+        return self._field("info")
+
+    @property
+    def income_stmt(self):
+        return self._field("income_stmt")
+
+    @property
+    def balance_sheet(self):
+        return self._field("balance_sheet")
+
+    @property
+    def cash_flow(self):
+        return self._field("cash_flow")
+
+    def section(self, section: str | int) -> str:
+        return self._field(str(section))
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @classmethod
+    def from_file(cls, path: str) -> "FilingSnapshot":
+        """
+        Read a saved snapshot and, while it is still fresh, register it so
+        analyzer calls on its (ticker, fyear) use it.
+        """
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+        ttl = SNAPSHOT_TTL - (time.time() - snapshot.loaded_at)
+        if ttl > 0 and snapshot.complete:
+            FILING_SNAPSHOTS.set((snapshot.ticker_symbol, snapshot.fyear), snapshot, ttl)
+        return snapshot
+
+
+def get_snapshot(ticker_symbol: "str | FilingSnapshot", fyear: str) -> FilingSnapshot:
+    """The snapshot passed in place of a ticker symbol, or the registered one of (ticker, fyear)."""
+    if isinstance(ticker_symbol, FilingSnapshot):
+        return ticker_symbol
+    return FilingSnapshot.load(ticker_symbol, fyear)
+
+
 class ReportAnalysisUtils:
+    """
+    Every method taking (ticker_symbol, fyear) reads its inputs from the
+    FilingSnapshot of that filing, so a full run of the analysis tools loads
+    the data once. A FilingSnapshot may also be passed as ticker_symbol.
+    """
 
     def analyze_income_stmt(
         ticker_symbol: Annotated[str, "ticker symbol"],
@@ -40,8 +195,9 @@ class ReportAnalysisUtils:
         Retrieve the income statement for the given ticker symbol with the related section of its 10-K report.
         Then return with an instruction on how to analyze the income statement.
         """
+        snapshot = get_snapshot(ticker_symbol, fyear)
         # Retrieve the income statement
-        income_stmt = YFinanceUtils.get_income_stmt(ticker_symbol)
+        income_stmt = snapshot.income_stmt
         df_string = "Income statement:\n" + income_stmt.to_string().strip()
 
         # Analysis instruction
@@ -61,7 +217,7 @@ class ReportAnalysisUtils:
         )
 
         # Retrieve the related section from the 10-K report
-        section_text = SECUtils.get_10k_section(ticker_symbol, fyear, 7)
+        section_text = snapshot.section(7)
 
         # Combine the instruction, section text, and income statement
         prompt = combine_prompt(instruction, section_text, df_string)
@@ -78,7 +234,8 @@ class ReportAnalysisUtils:
         Retrieve the balance sheet for the given ticker symbol with the related section of its 10-K report.
         Then return with an instruction on how to analyze the balance sheet.
         """
-        balance_sheet = YFinanceUtils.get_balance_sheet(ticker_symbol)
+        snapshot = get_snapshot(ticker_symbol, fyear)
+        balance_sheet = snapshot.balance_sheet
         df_string = "Balance sheet:\n" + balance_sheet.to_string().strip()
 
         instruction = dedent(
@@ -93,7 +250,7 @@ class ReportAnalysisUtils:
             """
         )
 
-        section_text = SECUtils.get_10k_section(ticker_symbol, fyear, 7)
+        section_text = snapshot.section(7)
         prompt = combine_prompt(instruction, section_text, df_string)
 
         save_to_file(prompt, save_path)
@@ -108,7 +265,8 @@ class ReportAnalysisUtils:
         Retrieve the cash flow statement for the given ticker symbol with the related section of its 10-K report.
         Then return with an instruction on how to analyze the cash flow statement.
         """
-        cash_flow = YFinanceUtils.get_cash_flow(ticker_symbol)
+        snapshot = get_snapshot(ticker_symbol, fyear)
+        cash_flow = snapshot.cash_flow
         df_string = "Cash flow statement:\n" + cash_flow.to_string().strip()
 
         instruction = dedent(
@@ -123,7 +281,7 @@ class ReportAnalysisUtils:
             """
         )
 
-        section_text = SECUtils.get_10k_section(ticker_symbol, fyear, 7)
+        section_text = snapshot.section(7)
         prompt = combine_prompt(instruction, section_text, df_string)
         save_to_file(prompt, save_path)
         return f"instruction & resources saved to {save_path}"
@@ -137,7 +295,8 @@ class ReportAnalysisUtils:
         Retrieve the income statement and the related section of its 10-K report for the given ticker symbol.
         Then return with an instruction on how to create a segment analysis.
         """
-        income_stmt = YFinanceUtils.get_income_stmt(ticker_symbol)
+        snapshot = get_snapshot(ticker_symbol, fyear)
+        income_stmt = snapshot.income_stmt
         df_string = (
             "Income statement (Segment Analysis):\n" + income_stmt.to_string().strip()
         )
@@ -155,7 +314,7 @@ class ReportAnalysisUtils:
             reliance on evidence-backed information. For each segment, the output should be one single paragraph within 150 words.
             """
         )
-        section_text = SECUtils.get_10k_section(ticker_symbol, fyear, 7)
+        section_text = snapshot.section(7)
         prompt = combine_prompt(instruction, section_text, df_string)
         save_to_file(prompt, save_path)
 
@@ -172,6 +331,7 @@ class ReportAnalysisUtils:
         With the income statement and segment analysis for the given ticker symbol.
         Then return with an instruction on how to synthesize these analyses into a single coherent paragraph.
         """
+        snapshot = get_snapshot(ticker_symbol, fyear)
         # income_stmt_analysis = analyze_income_stmt(ticker_symbol)
         # segment_analysis = analyze_segment_stmt(ticker_symbol)
 
@@ -194,7 +354,7 @@ class ReportAnalysisUtils:
             """
         )
 
-        section_text = SECUtils.get_10k_section(ticker_symbol, fyear, 7)
+        section_text = snapshot.section(7)
         prompt = combine_prompt(instruction, section_text, "")
         save_to_file(prompt, save_path)
 
@@ -209,8 +369,9 @@ class ReportAnalysisUtils:
         Retrieve the risk factors for the given ticker symbol with the related section of its 10-K report.
         Then return with an instruction on how to summarize the top 3 key risks of the company.
         """
-        company_name = YFinanceUtils.get_stock_info(ticker_symbol)["shortName"]
-        risk_factors = SECUtils.get_10k_section(ticker_symbol, fyear, "1A")
+        snapshot = get_snapshot(ticker_symbol, fyear)
+        company_name = snapshot.info["shortName"]
+        risk_factors = snapshot.section("1A")
         section_text = (
             "Company Name: "
             + company_name
@@ -234,8 +395,9 @@ class ReportAnalysisUtils:
         Retrieve the business summary and related section of its 10-K report for the given ticker symbol.
         Then return with an instruction on how to describe the performance highlights per business of the company.
         """
-        business_summary = SECUtils.get_10k_section(ticker_symbol, fyear, 1)
-        section_7 = SECUtils.get_10k_section(ticker_symbol, fyear, 7)
+        snapshot = get_snapshot(ticker_symbol, fyear)
+        business_summary = snapshot.section(1)
+        section_7 = snapshot.section(7)
         section_text = (
             "Business summary:\n"
             + business_summary
@@ -263,11 +425,12 @@ class ReportAnalysisUtils:
         Retrieve the company description and related sections of its 10-K report for the given ticker symbol.
         Then return with an instruction on how to describe the company's industry, strengths, trends, and strategic initiatives.
         """
-        company_name = YFinanceUtils.get_stock_info(ticker_symbol).get(
+        snapshot = get_snapshot(ticker_symbol, fyear)
+        company_name = snapshot.info.get(
             "shortName", "N/A"
         )
-        business_summary = SECUtils.get_10k_section(ticker_symbol, fyear, 1)
-        section_7 = SECUtils.get_10k_section(ticker_symbol, fyear, 7)
+        business_summary = snapshot.section(1)
+        section_7 = snapshot.section(7)
         section_text = (
             "Company Name: "
             + company_name
@@ -304,64 +467,76 @@ class ReportAnalysisUtils:
         return key financial data used in annual report for the given ticker symbol and filing date
         """
 
-        # This ensures only date portion is used even if datetime(2023-07-27 00:00:00) is provided
-        filing_date = filing_date.split()[0]
+        tasks = key_data_tasks(ticker_symbol, filing_date)
+        tasks["key_data"] = (format_key_data, ["filing_date"] + KEY_DATA_INPUTS)
+        return run_dag(tasks)["key_data"]
 
-        if not isinstance(filing_date, datetime):
-            filing_date = datetime.strptime(filing_date, "%Y-%m-%d")
 
-        # Fetch historical market data for the past 6 months
-        start = (filing_date - timedelta(weeks=52)).strftime("%Y-%m-%d")
-        end = filing_date.strftime("%Y-%m-%d")
+# Fetched inputs of the key data table, in the order format_key_data takes them.
+KEY_DATA_INPUTS = ["hist", "info", "rating", "target_price", "market_cap", "bvps"]
 
-        hist = YFinanceUtils.get_stock_data(ticker_symbol, start, end)
 
-        info = YFinanceUtils.get_stock_info(ticker_symbol)
-        close_price = hist["Close"].iloc[-1]
-
-        # Calculate the average daily trading volume
-        six_months_start = (filing_date - timedelta(weeks=26)).strftime("%Y-%m-%d")
-        hist_last_6_months = hist[
-            (hist.index >= six_months_start) & (hist.index <= end)
-        ]
-
-        avg_daily_volume_6m = (
-            hist_last_6_months["Volume"].mean()
-            if not hist_last_6_months["Volume"].empty
-            else 0
-        )
-
-        fiftyTwoWeekLow = hist["High"].min()
-        fiftyTwoWeekHigh = hist["Low"].max()
-
-        # avg_daily_volume_6m = hist['Volume'].mean()
-
-        # convert back to str for function calling
+def key_data_tasks(ticker_symbol: str, filing_date: str | datetime) -> dict:
+    """
+    Independent fetches behind get_key_data, as run_dag tasks named after
+    KEY_DATA_INPUTS, plus a "filing_date" task holding the normalized date.
+    """
+    # This ensures only date portion is used even if datetime(2023-07-27 00:00:00) is provided
+    if isinstance(filing_date, datetime):
         filing_date = filing_date.strftime("%Y-%m-%d")
+    filing_date = filing_date.split()[0]
+    end_date = datetime.strptime(filing_date, "%Y-%m-%d")
+
+    # Fetch historical market data for the past year
+    start = (end_date - timedelta(weeks=52)).strftime("%Y-%m-%d")
+
+    return {
+        "filing_date": (lambda: filing_date, []),
+        "hist": (lambda: YFinanceUtils.get_stock_data(ticker_symbol, start, filing_date), []),
+        "info": (lambda: YFinanceUtils.get_stock_info(ticker_symbol), []),
+        "rating": (lambda: YFinanceUtils.get_analyst_recommendations(ticker_symbol)[0], []),
+        "target_price": (lambda: FMPUtils.get_target_price(ticker_symbol, filing_date), []),
+        "market_cap": (lambda: FMPUtils.get_historical_market_cap(ticker_symbol, filing_date), []),
+        "bvps": (lambda: FMPUtils.get_historical_bvps(ticker_symbol, filing_date), []),
+    }
+
+
+def format_key_data(filing_date, hist, info, rating, target_price, market_cap, bvps) -> dict:
+    """Key data table of the annual report from already fetched inputs."""
+    end = filing_date
+    close_price = hist["Close"].iloc[-1]
+
+    # Calculate the average daily trading volume
+    six_months_start = (
+        datetime.strptime(filing_date, "%Y-%m-%d") - timedelta(weeks=26)
+    ).strftime("%Y-%m-%d")
+    hist_last_6_months = hist[(hist.index >= six_months_start) & (hist.index <= end)]
+
+    avg_daily_volume_6m = (
+        hist_last_6_months["Volume"].mean()
+        if not hist_last_6_months["Volume"].empty
+        else 0
+    )
+
+    fiftyTwoWeekLow = hist["High"].min()
+    fiftyTwoWeekHigh = hist["Low"].max()
+
+    result = {
+        "Rating": rating,
+        "Target Price": target_price,
+        f"6m avg daily vol ({info['currency']}mn)": "{:.2f}".format(
+            avg_daily_volume_6m / 1e6
+        ),
+        f"Closing Price ({info['currency']})": "{:.2f}".format(close_price),
+        f"Market Cap ({info['currency']}mn)": "{:.2f}".format(market_cap / 1e6),
+        f"52 Week Price Range ({info['currency']})": "{:.2f} - {:.2f}".format(
+            fiftyTwoWeekLow, fiftyTwoWeekHigh
+        ),
+        f"BVPS ({info['currency']})": "{:.2f}".format(bvps),
+    }
+
+    return result
 
-        # Print the result
-        # print(f"Over the past 6 months, the average daily trading volume for {ticker_symbol} was: {avg_daily_volume_6m:.2f}")
-        rating, _ = YFinanceUtils.get_analyst_recommendations(ticker_symbol)
-        target_price = FMPUtils.get_target_price(ticker_symbol, filing_date)
-        result = {
-            "Rating": rating,
-            "Target Price": target_price,
-            f"6m avg daily vol ({info['currency']}mn)": "{:.2f}".format(
-                avg_daily_volume_6m / 1e6
-            ),
-            f"Closing Price ({info['currency']})": "{:.2f}".format(close_price),
-            f"Market Cap ({info['currency']}mn)": "{:.2f}".format(
-                FMPUtils.get_historical_market_cap(ticker_symbol, filing_date) / 1e6
-            ),
-            f"52 Week Price Range ({info['currency']})": "{:.2f} - {:.2f}".format(
-                fiftyTwoWeekLow, fiftyTwoWeekHigh
-            ),
-            f"BVPS ({info['currency']})": "{:.2f}".format(
-                FMPUtils.get_historical_bvps(ticker_symbol, filing_date)
-            ),
-        }
-
-        return result
 
 if __name__ == "__main__":
     # Example usage:
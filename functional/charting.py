@@ -1,8 +1,6 @@
 import os
-import mplfinance as mpf
 import pandas as pd
 
-from matplotlib import pyplot as plt
 from typing import Annotated, List, Tuple
 from pandas import DateOffset
 from datetime import datetime, timedelta
@@ -15,8 +13,6 @@ relative_path = Path("../financial_annual_report")
 # Resolve the relative path to an absolute path
 REPORT_DIRECTORY = relative_path.resolve()
 
-print("Report directory: ", REPORT_DIRECTORY)
-
 
 class MplFinanceUtils:
 
@@ -74,6 +70,8 @@ class MplFinanceUtils:
         filtered_params = {k: v for k, v in params.items() if v is not None}
 
         # Plot chart
+        import mplfinance as mpf
+
         mpf.plot(stock_data, **filtered_params)
 
         return f"{type} chart saved to <img {REPORT_DIRECTORY / save_path}>"
@@ -116,6 +114,8 @@ class ReportChartUtils:
         eight_months = start_date + DateOffset(months=8)
         end_date = company_change.index.max()
 
+        from matplotlib import pyplot as plt
+
         plt.rcParams.update({"font.size": 20})  
         plt.figure(figsize=(14, 7))
         plt.plot(
@@ -197,6 +197,8 @@ class ReportChartUtils:
 
         info = YFinanceUtils.get_stock_info(ticker_symbol)
 
+        from matplotlib import pyplot as plt
+
         fig, ax1 = plt.subplots(figsize=(14, 7))
         plt.rcParams.update({"font.size": 20})
 
@@ -1,6 +1,5 @@
 import os
 from typing_extensions import Annotated
-from IPython import get_ipython
 
 default_path = "coding/"
 
@@ -11,6 +10,8 @@ class IPythonUtils:
         """
         run cell in ipython and return the execution result.
         """
+        from IPython import get_ipython
+
         ipython = get_ipython()
         result = ipython.run_cell(cell)
         log = str(result.result)
@@ -1,13 +1,26 @@
 import os
 import json
 import importlib
-import yfinance as yf
+import itertools
+import warnings
+import numpy as np
+import pandas as pd
 import backtrader as bt
 from backtrader.strategies import SMA_CrossOver
 from typing import Annotated, List, Tuple
-from matplotlib import pyplot as plt
 from pprint import pformat
-from IPython import get_ipython
+from concurrent.futures import ProcessPoolExecutor
+
+from functional import alpha_ops
+from functional.alpha_compiler import evaluate_alphas
+from data_sources import YFinanceUtils
+from utils import SavePathType, save_output
+
+
+# Both engines report the Sharpe ratio of daily returns, annualised over
+# PERIODS_PER_YEAR bars, against this annual risk-free rate.
+RISK_FREE_RATE = 0.01
+PERIODS_PER_YEAR = 252
 
 
 class DeployedCapitalAnalyzer(bt.Analyzer):
@@ -44,6 +57,487 @@ class DeployedCapitalAnalyzer(bt.Analyzer):
         return {"return_on_deployed_capital": self.retn}
 
 
+class PerNameTradeAnalyzer(bt.Analyzer):
+
+    def start(self):
+        """Invoked to indicate the start of operations, giving the analyzer time 
+        to setup needed things
+        """
+        self.per_name = {
+            data._name: {"trades": 0, "won": 0, "lost": 0, "pnl": 0.0, "pnlcomm": 0.0}
+            for data in self.strategy.datas
+        }
+
+    def notify_trade(self, trade):
+        """Receives trade notifications before each next cycle"""
+        if trade.isclosed:
+            stats = self.per_name[trade.data._name]
+            stats["trades"] += 1
+            stats["won" if trade.pnlcomm > 0 else "lost"] += 1
+            stats["pnl"] += trade.pnl
+            stats["pnlcomm"] += trade.pnlcomm
+
+    def stop(self):
+        """Invoked to indicate the end of operations, giving the analyzer time 
+        to shut down needed things
+        """
+        for data in self.strategy.datas:
+            position = self.strategy.getposition(data)
+            self.per_name[data._name]["open_position"] = position.size
+            self.per_name[data._name]["open_position_value"] = position.size * data.close[0]
+
+    def get_analysis(self):
+        """Provides closed-trade statistics and open positions per data feed"""
+        return self.per_name
+
+
+class MultiSMACrossOver(bt.Strategy):
+    """SMA_CrossOver applied independently to every data feed, sharing one broker."""
+
+    params = (("fast", 10), ("slow", 30), ("_movav", bt.indicators.MovAv.SMA))
+
+    def __init__(self):
+        self.crossovers = []
+        for data in self.datas:
+            sma_fast = self.p._movav(data, period=self.p.fast)
+            sma_slow = self.p._movav(data, period=self.p.slow)
+            self.crossovers.append((data, bt.indicators.CrossOver(sma_fast, sma_slow)))
+
+    def next(self):
+        for data, crossover in self.crossovers:
+            if not self.getposition(data):
+                if crossover > 0:
+                    self.buy(data=data)
+            elif crossover < 0:
+                self.close(data=data)
+
+
+def load_universe(
+    universe: Annotated[
+        str | List[str],
+        "List of ticker symbols, a comma separated string, or the path to a universe file with one symbol per line",
+    ],
+) -> List[str]:
+    """Resolve the ticker list of a portfolio backtest."""
+    if isinstance(universe, (list, tuple)):
+        return list(universe)
+    if os.path.isfile(universe):
+        with open(universe, "r") as f:
+            lines = [line.split(",")[0].strip() for line in f]
+        return [line for line in lines if line and not line.startswith("#")]
+    return [t.strip() for t in universe.replace(",", " ").split() if t.strip()]
+
+
+def load_prices(ticker_symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """Adjusted OHLCV of one ticker, served from the local price store when already fetched."""
+    prices = YFinanceUtils.get_stock_data(ticker_symbol, start_date, end_date).copy()
+    if getattr(prices.index, "tz", None) is not None:
+        prices.index = prices.index.tz_localize(None)  # backtrader feeds expect naive datetimes
+    return prices
+
+
+def download_universe(
+    tickers: List[str], start_date: str, end_date: str
+) -> dict:
+    """Download all tickers in one batched request; returns ticker -> OHLCV frame."""
+    wide = YFinanceUtils.get_stock_data_batch(tickers, start_date, end_date, layout="wide")
+    frames = {}
+    for ticker in tickers:
+        # The batch download reports tickers upper-cased.
+        if ticker.upper() in wide.columns.get_level_values(1):
+            frame = wide.xs(ticker.upper(), axis=1, level=1).dropna(how="all")
+            if not frame.empty:
+                frames[ticker] = frame
+    return frames
+
+
+def universe_panel(frames: dict) -> tuple:
+    """Align per-ticker frames into (dates x tickers) arrays keyed by lower-case field."""
+    if not frames:
+        raise ValueError("No price data was loaded for any ticker of the universe.")
+    tickers = list(frames)
+    index = frames[tickers[0]].index
+    for frame in frames.values():
+        index = index.union(frame.index)
+    panel = {
+        field.lower(): np.column_stack(
+            [frames[t][field].reindex(index).to_numpy(dtype=np.float64) for t in tickers]
+        )
+        for field in ["Open", "High", "Low", "Close", "Volume"]
+    }
+    return index, panel
+
+
+def signal_to_weights(
+    signal: Annotated[np.ndarray, "(dates x tickers) alpha signal"],
+) -> np.ndarray:
+    """Turn a raw alpha signal into dollar-neutral target weights with unit gross exposure."""
+    signal = np.asarray(signal, dtype=np.float64)
+    demeaned = signal
+    if signal.shape[1] > 1:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # rows with no valid signal
+            demeaned = signal - np.nanmean(signal, axis=1, keepdims=True)
+    return np.nan_to_num(alpha_ops.scale(demeaned))
+
+
+def sma_crossover_positions(
+    close: Annotated[np.ndarray, "(dates x tickers) close prices"],
+    fast: int = 10,
+    slow: int = 30,
+) -> np.ndarray:
+    """
+    Long/flat state of backtrader's SMA_CrossOver: enter when the fast SMA
+    crosses above the slow one, exit when it crosses back below.
+    """
+    close = np.asarray(close, dtype=np.float64).reshape(len(close), -1)
+    diff = alpha_ops.ts_mean(close, fast) - alpha_ops.ts_mean(close, slow)
+    previous = alpha_ops.delay(diff, 1)
+    state = np.full(close.shape, np.nan)
+    state[(previous <= 0) & (diff > 0)] = 1.0
+    state[(previous >= 0) & (diff < 0)] = 0.0
+    # Carry the last crossover forward; flat until the first one.
+    state = pd.DataFrame(state).ffill().fillna(0.0).to_numpy()
+    return state
+
+
+def _trade_analysis(held: np.ndarray, pnl: np.ndarray) -> dict:
+    """Round-trip summary in the shape of backtrader's TradeAnalyzer output."""
+    in_position = held != 0
+    opened = in_position & ~np.vstack([np.zeros((1, held.shape[1]), dtype=bool), in_position[:-1]])
+    trade_id = np.cumsum(opened, axis=0)
+    n_trades = int(opened.sum())
+    if n_trades == 0:
+        return {"total": {"total": 0}}
+
+    # A position held at the close of bar t earns the PnL booked on bar t + 1.
+    offsets = np.concatenate([[0], np.cumsum(trade_id.max(axis=0))[:-1]])
+    keys = (trade_id + offsets)[:-1][in_position[:-1]] - 1
+    trade_pnl = np.bincount(keys, weights=pnl[1:][in_position[:-1]], minlength=n_trades)
+    is_open = np.zeros(n_trades, dtype=bool)
+    last_open = (trade_id[-1] + offsets - 1)[in_position[-1]]
+    is_open[last_open] = True
+
+    closed = trade_pnl[~is_open]
+    return {
+        "total": {"total": n_trades, "open": int(is_open.sum()), "closed": int(len(closed))},
+        "won": {"total": int((closed > 0).sum())},
+        "lost": {"total": int((closed <= 0).sum())},
+        "pnl": {
+            "net": {
+                "total": float(closed.sum()),
+                "average": float(closed.mean()) if len(closed) else 0.0,
+            }
+        },
+    }
+
+
+def _simulate(
+    prices: np.ndarray, positions: np.ndarray, cash: float, position_type: str, commission: float
+) -> tuple:
+    """Portfolio value per bar and per-name PnL booked on each bar."""
+    filled = pd.DataFrame(prices).ffill().to_numpy()
+    price_move = np.nan_to_num(np.diff(filled, axis=0, prepend=filled[:1]))
+    traded = np.abs(np.diff(positions, axis=0, prepend=np.zeros((1, prices.shape[1]))))
+    no_pnl = np.zeros((1, prices.shape[1]))
+
+    if position_type == "shares":
+        pnl = np.vstack([no_pnl, positions[:-1] * price_move[1:]])
+        costs = commission * (traded * np.nan_to_num(filled)).sum(axis=1)
+        value = cash + np.cumsum(pnl.sum(axis=1) - costs)
+    elif position_type == "weights":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            returns = np.nan_to_num(price_move / np.vstack([filled[:1], filled[:-1]]))
+        name_returns = np.vstack([no_pnl, positions[:-1] * returns[1:]])
+        port_returns = name_returns.sum(axis=1) - commission * traded.sum(axis=1)
+        value = cash * np.cumprod(1 + port_returns)
+        pnl = name_returns * np.concatenate([[cash], value[:-1]])[:, None]
+    else:
+        raise ValueError("position_type must be 'shares' or 'weights'")
+
+    # Losses beyond the account (shares are not checked against cash, weights
+    # may be leveraged) wipe it out: nothing is traded after the equity hits zero.
+    ruined = np.flatnonzero(value <= 0)
+    if ruined.size:
+        value[ruined[0]:] = 0.0
+        pnl[ruined[0] + 1:] = 0.0
+    return value, pnl
+
+
+def _equity_stats(
+    value: np.ndarray, cash: float, riskfreerate: float, periods_per_year: int
+) -> dict:
+    """Sharpe, drawdown and returns analysis of an equity curve, keyed like backtrader's analyzers."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bar_returns = np.diff(value, prepend=cash) / np.concatenate([[cash], value[:-1]])
+    bar_returns = np.nan_to_num(bar_returns, nan=0.0)  # flat at zero after a wipe-out
+    # backtrader's SharpeRatio converts the annual rate to a per-bar one the same way.
+    excess = bar_returns - ((1 + riskfreerate) ** (1 / periods_per_year) - 1)
+    std = bar_returns.std()
+    sharpe = float(excess.mean() / std * np.sqrt(periods_per_year)) if std > 0 else None
+
+    peak = np.maximum.accumulate(np.concatenate([[cash], value]))[1:]
+    drawdown = 100.0 * (peak - value) / peak
+    underwater = drawdown > 0
+    # Length of the underwater run ending at each bar.
+    since_start = np.cumsum(underwater)
+    runs = since_start - np.maximum.accumulate(np.where(underwater, 0, since_start))
+
+    rtot = float(np.log(value[-1] / cash)) if value[-1] > 0 else float("-inf")
+    ravg = rtot / len(value)
+    return {
+        "Sharpe Ratio": {"sharperatio": sharpe},
+        "Drawdown": {
+            "len": int(runs[-1]),
+            "drawdown": float(drawdown[-1]),
+            "moneydown": float(peak[-1] - value[-1]),
+            "max": {
+                "len": int(runs.max()),
+                "drawdown": float(drawdown.max()),
+                "moneydown": float((peak - value).max()),
+            },
+        },
+        "Returns": {
+            "rtot": rtot,
+            "ravg": ravg,
+            "rnorm": float(np.expm1(ravg * periods_per_year)),
+            "rnorm100": float(np.expm1(ravg * periods_per_year) * 100),
+        },
+    }
+
+
+def vectorized_back_test(
+    prices: Annotated[np.ndarray | pd.DataFrame, "(dates x tickers) close prices"],
+    positions: Annotated[np.ndarray | pd.DataFrame, "(dates x tickers) target positions decided at each close"],
+    cash: Annotated[float, "Initial cash amount. Default to 10000.0"] = 10000.0,
+    position_type: Annotated[
+        str, "'shares' for share counts or 'weights' for fractions of portfolio value"
+    ] = "shares",
+    commission: Annotated[float, "Commission as a fraction of traded value. Default to 0."] = 0.0,
+    riskfreerate: Annotated[float, "Annual risk-free rate used by the Sharpe ratio"] = RISK_FREE_RATE,
+    periods_per_year: Annotated[int, "Bars per year used to annualise"] = PERIODS_PER_YEAR,
+    return_equity: Annotated[bool, "Also return the portfolio value per bar"] = False,
+    names: Annotated[
+        List[str] | None, "Ticker names of the columns; adds a per-name PnL breakdown"
+    ] = None,
+) -> dict | tuple:
+    """
+    Backtest a position matrix with array operations. Positions chosen at the
+    close of bar t earn the price move from t to t + 1. Returns the same
+    statistics keys as the Cerebro engine; the Sharpe ratio is annualised from
+    per-bar returns.
+    """
+    prices = np.asarray(prices, dtype=np.float64).reshape(len(prices), -1)
+    positions = np.nan_to_num(np.asarray(positions, dtype=np.float64).reshape(prices.shape))
+    value, pnl = _simulate(prices, positions, cash, position_type, commission)
+
+    stats_dict = {"Starting Portfolio Value:": cash, "Final Portfolio Value": float(value[-1])}
+    stats_dict.update(_equity_stats(value, cash, riskfreerate, periods_per_year))
+    stats_dict["Trade Analysis"] = _trade_analysis(positions, pnl)
+    if names is not None:
+        stats_dict["Per Name"] = {
+            name: {
+                "trades": _trade_analysis(positions[:, [i]], pnl[:, [i]])["total"]["total"],
+                "pnl": float(pnl[:, i].sum()),
+                "open_position": float(positions[-1, i]),
+            }
+            for i, name in enumerate(names)
+        }
+    if return_equity:
+        return stats_dict, value
+    return stats_dict
+
+
+def _check_vectorized_args(
+    strategy: str,
+    sizer: int | str | None,
+    sizer_params: str | dict | None = None,
+    indicator: str | None = None,
+    indicator_params: str | dict | None = None,
+) -> None:
+    """Reject the cerebro-only arguments the vectorized engine would otherwise ignore."""
+    if sizer is not None and not isinstance(sizer, int):
+        raise ValueError("The vectorized engine only supports fixed integer sizers.")
+    if sizer is not None and strategy != "SMA_CrossOver":
+        raise ValueError(
+            "With the vectorized engine, sizer only applies to SMA_CrossOver; "
+            "other strategies trade portfolio weights."
+        )
+    if sizer_params:
+        raise ValueError("The vectorized engine does not support sizer_params.")
+    if indicator or indicator_params:
+        raise ValueError("The vectorized engine does not support custom indicators.")
+
+
+def _vectorized_positions(
+    prices: pd.DataFrame | dict, strategy: str, strategy_params: dict, stake: int
+) -> tuple:
+    """
+    Resolve the strategy argument of back_test into a position matrix for the
+    vectorized engine. ``prices`` is a single-ticker OHLCV frame or a panel
+    from universe_panel.
+    """
+    if isinstance(prices, dict):
+        panel = prices
+    else:
+        panel = {
+            field.lower(): np.asarray(prices[field], dtype=np.float64).reshape(len(prices), -1)
+            for field in ["Open", "High", "Low", "Close", "Volume"]
+        }
+    close = panel["close"]
+    if strategy == "SMA_CrossOver":
+        return sma_crossover_positions(close, **strategy_params) * stake, "shares"
+    if ":" in strategy and "(" not in strategy:
+        # module:function returning a position matrix from the price frame
+        module_path, func_name = strategy.split(":")
+        func = getattr(importlib.import_module(module_path), func_name)
+        return np.asarray(func(prices, **strategy_params), dtype=np.float64), "weights"
+    # Anything else is treated as a 101-Alphas style expression.
+    signal = list(evaluate_alphas(strategy, panel).values())[0]
+    return signal_to_weights(signal), "weights"
+
+
+def _build_cerebro(
+    prices: pd.DataFrame | dict,
+    strategy: str,
+    strategy_params: dict,
+    sizer: int | str | None,
+    sizer_params: dict,
+    indicator: str | None,
+    indicator_params: dict,
+    cash: float,
+) -> bt.Cerebro:
+    """
+    Set up a Cerebro run over an already downloaded price frame, or over a
+    ticker -> frame dict for a portfolio run with shared cash.
+    """
+    cerebro = bt.Cerebro()
+    portfolio = isinstance(prices, dict)
+
+    if strategy == "SMA_CrossOver":
+        strategy_class = MultiSMACrossOver if portfolio else SMA_CrossOver
+    else:
+        assert (
+            ":" in strategy
+        ), "Custom strategy should be module path and class name separated by a colon."
+        module_path, class_name = strategy.split(":")
+        module = importlib.import_module(module_path)
+        strategy_class = getattr(module, class_name)
+
+    cerebro.addstrategy(strategy_class, **strategy_params)
+
+    if portfolio:
+        for ticker, frame in prices.items():
+            cerebro.adddata(bt.feeds.PandasData(dataname=frame), name=ticker)
+    else:
+        data = bt.feeds.PandasData(dataname=prices)
+        cerebro.adddata(data)  # Add the data feed
+    # Set our desired cash start
+    cerebro.broker.setcash(cash)
+
+    # Set the size of the trades
+    if sizer is not None:
+        if isinstance(sizer, int):
+            cerebro.addsizer(bt.sizers.FixedSize, stake=sizer)
+        else:
+            assert (
+                ":" in sizer
+            ), "Custom sizer should be module path and class name separated by a colon."
+            module_path, class_name = sizer.split(":")
+            module = importlib.import_module(module_path)
+            sizer_class = getattr(module, class_name)
+            cerebro.addsizer(sizer_class, **sizer_params)
+
+    # Set additional indicator
+    if indicator is not None:
+        assert (
+            ":" in indicator
+        ), "Custom indicator should be module path and class name separated by a colon."
+        module_path, class_name = indicator.split(":")
+        module = importlib.import_module(module_path)
+        indicator_class = getattr(module, class_name)
+        cerebro.addindicator(indicator_class, **indicator_params)
+
+    # Attach analyzers
+    # Daily and annualised, so it matches the vectorized engine's Sharpe ratio.
+    cerebro.addanalyzer(
+        bt.analyzers.SharpeRatio,
+        _name="sharpe_ratio",
+        timeframe=bt.TimeFrame.Days,
+        annualize=True,
+        factor=PERIODS_PER_YEAR,
+        riskfreerate=RISK_FREE_RATE,
+    )
+    cerebro.addanalyzer(bt.analyzers.DrawDown, _name="draw_down")
+    cerebro.addanalyzer(bt.analyzers.Returns, _name="returns")
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name="trade_analyzer")
+    # cerebro.addanalyzer(DeployedCapitalAnalyzer, _name="deployed_capital")
+    if portfolio:
+        cerebro.addanalyzer(PerNameTradeAnalyzer, _name="per_name")
+    return cerebro
+
+
+def _run_cerebro(cerebro: bt.Cerebro) -> dict:
+    """Run a prepared Cerebro and collect its analyzer output."""
+    stats_dict = {"Starting Portfolio Value:": cerebro.broker.getvalue()}
+
+    results = cerebro.run()  # run it all
+    first_strategy = results[0]
+
+    # Access analysis results
+    stats_dict["Final Portfolio Value"] = cerebro.broker.getvalue()
+    # stats_dict["Deployed Capital"] = pformat(
+    #     first_strategy.analyzers.deployed_capital.get_analysis(), indent=4
+    # )
+    stats_dict["Sharpe Ratio"] = first_strategy.analyzers.sharpe_ratio.get_analysis()
+    stats_dict["Drawdown"] = first_strategy.analyzers.draw_down.get_analysis()
+    stats_dict["Returns"] = first_strategy.analyzers.returns.get_analysis()
+    stats_dict["Trade Analysis"] = first_strategy.analyzers.trade_analyzer.get_analysis()
+    if hasattr(first_strategy.analyzers, "per_name"):
+        stats_dict["Per Name"] = first_strategy.analyzers.per_name.get_analysis()
+    return stats_dict
+
+
+def _summarize_run(params: dict, stats_dict: dict) -> dict:
+    """One row of a parameter sweep table."""
+    start_value = stats_dict["Starting Portfolio Value:"]
+    final_value = stats_dict["Final Portfolio Value"]
+    sharpe = stats_dict["Sharpe Ratio"].get("sharperatio")
+    return {
+        **params,
+        "Sharpe Ratio": np.nan if sharpe is None else sharpe,
+        "Total Return %": (final_value / start_value - 1) * 100,
+        "Annual Return %": stats_dict["Returns"].get("rnorm100"),
+        "Max Drawdown %": stats_dict["Drawdown"]["max"]["drawdown"],
+        "Final Portfolio Value": final_value,
+    }
+
+
+def _sweep_worker(prices: pd.DataFrame, params: dict, engine: str, run_args: dict) -> dict:
+    """Run one grid point; module level so it can be shipped to a process pool."""
+    strategy = run_args["strategy"]
+    if engine == "vectorized":
+        positions, position_type = _vectorized_positions(
+            prices, strategy, params, run_args["sizer"] or 1
+        )
+        stats_dict = vectorized_back_test(
+            prices["Close"], positions, cash=run_args["cash"], position_type=position_type
+        )
+    else:
+        cerebro = _build_cerebro(
+            prices,
+            strategy,
+            params,
+            run_args["sizer"],
+            run_args["sizer_params"],
+            None,
+            {},
+            run_args["cash"],
+        )
+        stats_dict = _run_cerebro(cerebro)
+    return _summarize_run(params, stats_dict)
+
+
 class BackTraderUtils:
 
     def back_test(
@@ -86,88 +580,71 @@ class BackTraderUtils:
         save_fig: Annotated[
             str | None, "Path to save the plot of backtest results. Default to None."
         ] = None,
+        engine: Annotated[
+            str,
+            "Backtest engine: 'cerebro' (event-driven backtrader run) or 'vectorized' (array-based, much faster for screening). With 'vectorized', strategy can also be 'module:function' returning a position matrix, or an alpha expression like 'rank(delta(close, 5))'. Default to 'cerebro'.",
+        ] = "cerebro",
     ) -> str:
         """
         Use the Backtrader library to backtest a trading strategy on historical stock data.
         """
-        cerebro = bt.Cerebro()
+        if engine == "vectorized":
+            _check_vectorized_args(
+                strategy, sizer, sizer_params, indicator, indicator_params
+            )
+            prices = load_prices(ticker_symbol, start_date, end_date)
+            strategy_params = json.loads(strategy_params) if strategy_params else {}
+            positions, position_type = _vectorized_positions(
+                prices, strategy, strategy_params, sizer or 1
+            )
+            stats_dict, equity_curve = vectorized_back_test(
+                prices["Close"],
+                positions,
+                cash=cash,
+                position_type=position_type,
+                return_equity=True,
+            )
 
-        if strategy == "SMA_CrossOver":
-            strategy_class = SMA_CrossOver
-        else:
-            assert (
-                ":" in strategy
-            ), "Custom strategy should be module path and class name separated by a colon."
-            module_path, class_name = strategy.split(":")
-            module = importlib.import_module(module_path)
-            strategy_class = getattr(module, class_name)
+            if save_fig:
+                directory = os.path.dirname(save_fig)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                from matplotlib import pyplot as plt
+
+                plt.figure(figsize=(12, 8))
+                plt.plot(prices.index, equity_curve)
+                plt.title(f"{ticker_symbol} portfolio value")
+                plt.savefig(save_fig)
+                plt.close()
+
+            return "Back Test Finished. Results: \n" + pformat(stats_dict, indent=2)
+        elif engine != "cerebro":
+            raise ValueError("engine must be 'cerebro' or 'vectorized'")
 
         strategy_params = json.loads(strategy_params) if strategy_params else {}
-        cerebro.addstrategy(strategy_class, **strategy_params)
+        sizer_params = json.loads(sizer_params) if sizer_params else {}
+        indicator_params = json.loads(indicator_params) if indicator_params else {}
 
         # Create a data feed
-        data = bt.feeds.PandasData(
-            dataname=yf.download(ticker_symbol, start_date, end_date, auto_adjust=True)
-        )
-        cerebro.adddata(data)  # Add the data feed
-        # Set our desired cash start
-        cerebro.broker.setcash(cash)
-
-        # Set the size of the trades
-        if sizer is not None:
-            if isinstance(sizer, int):
-                cerebro.addsizer(bt.sizers.FixedSize, stake=sizer)
-            else:
-                assert (
-                    ":" in sizer
-                ), "Custom sizer should be module path and class name separated by a colon."
-                module_path, class_name = sizer.split(":")
-                module = importlib.import_module(module_path)
-                sizer_class = getattr(module, class_name)
-                sizer_params = json.loads(sizer_params) if sizer_params else {}
-                cerebro.addsizer(sizer_class, **sizer_params)
-
-        # Set additional indicator
-        if indicator is not None:
-            assert (
-                ":" in indicator
-            ), "Custom indicator should be module path and class name separated by a colon."
-            module_path, class_name = indicator.split(":")
-            module = importlib.import_module(module_path)
-            indicator_class = getattr(module, class_name)
-            indicator_params = json.loads(indicator_params) if indicator_params else {}
-            cerebro.addindicator(indicator_class, **indicator_params)
-
-        # Attach analyzers
-        cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name="sharpe_ratio")
-        cerebro.addanalyzer(bt.analyzers.DrawDown, _name="draw_down")
-        cerebro.addanalyzer(bt.analyzers.Returns, _name="returns")
-        cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name="trade_analyzer")
-        # cerebro.addanalyzer(DeployedCapitalAnalyzer, _name="deployed_capital")
-
-        stats_dict = {"Starting Portfolio Value:": cerebro.broker.getvalue()}
-
-        results = cerebro.run()  # run it all
-        first_strategy = results[0]
-
-        # Access analysis results
-        stats_dict["Final Portfolio Value"] = cerebro.broker.getvalue()
-        # stats_dict["Deployed Capital"] = pformat(
-        #     first_strategy.analyzers.deployed_capital.get_analysis(), indent=4
-        # )
-        stats_dict["Sharpe Ratio"] = (
-            first_strategy.analyzers.sharpe_ratio.get_analysis()
-        )
-        stats_dict["Drawdown"] = first_strategy.analyzers.draw_down.get_analysis()
-        stats_dict["Returns"] = first_strategy.analyzers.returns.get_analysis()
-        stats_dict["Trade Analysis"] = (
-            first_strategy.analyzers.trade_analyzer.get_analysis()
+        prices = load_prices(ticker_symbol, start_date, end_date)
+        cerebro = _build_cerebro(
+            prices,
+            strategy,
+            strategy_params,
+            sizer,
+            sizer_params,
+            indicator,
+            indicator_params,
+            cash,
         )
+        stats_dict = _run_cerebro(cerebro)
 
         if save_fig:
             directory = os.path.dirname(save_fig)
             if directory:
                 os.makedirs(directory, exist_ok=True)
+            from matplotlib import pyplot as plt
+
             plt.figure(figsize=(12, 8))
             cerebro.plot()
             plt.savefig(save_fig)
@@ -175,6 +652,184 @@ class BackTraderUtils:
 
         return "Back Test Finished. Results: \n" + pformat(stats_dict, indent=2)
 
+    def back_test_portfolio(
+        ticker_symbols: Annotated[
+            str | List[str],
+            "Ticker symbols of the portfolio: a list, a comma separated string like 'AAPL,MSFT,NVDA', or the path to a universe file with one symbol per line",
+        ],
+        start_date: Annotated[
+            str, "Start date of the historical data in 'YYYY-MM-DD' format"
+        ],
+        end_date: Annotated[
+            str, "End date of the historical data in 'YYYY-MM-DD' format"
+        ],
+        strategy: Annotated[
+            str,
+            "Strategy run across all tickers. Pre-defined options: 'SMA_CrossOver' (applied to each ticker). If custom, provide module path and class name as a string like 'my_module:TestStrategy'; the class should trade every feed in self.datas. With the vectorized engine, an alpha expression like 'rank(delta(close, 5))' is also accepted.",
+        ],
+        strategy_params: Annotated[
+            str,
+            "Additional parameters to be passed to the strategy class formatted as json string. E.g. {'fast': 10, 'slow': 30} for SMACross.",
+        ] = "",
+        sizer: Annotated[
+            int | str | None,
+            "Sizer used for backtesting. Can be a fixed number or a custom Sizer class. If input is integer, a corresponding fixed sizer will be applied. If custom, provide module path and class name as a string like 'my_module:TestSizer'.",
+        ] = None,
+        sizer_params: Annotated[
+            str,
+            "Additional parameters to be passed to the sizer class formatted as json string.",
+        ] = "",
+        cash: Annotated[
+            float, "Initial cash amount shared by the whole portfolio. Default to 10000.0"
+        ] = 10000.0,
+        engine: Annotated[
+            str,
+            "Backtest engine: 'cerebro' or 'vectorized'. Default to 'cerebro'.",
+        ] = "cerebro",
+        save_fig: Annotated[
+            str | None, "Path to save the plot of the portfolio value. Default to None."
+        ] = None,
+    ) -> str:
+        """
+        Backtest one strategy across a portfolio of stocks with shared cash, loading all price
+        data in a single batched download. Reports portfolio-level and per-ticker results.
+        """
+        if engine == "vectorized":
+            _check_vectorized_args(strategy, sizer, sizer_params)
+
+        tickers = load_universe(ticker_symbols)
+        frames = download_universe(tickers, start_date, end_date)
+        if not frames:
+            raise ValueError("No price data was loaded for any ticker of the universe.")
+        strategy_params = json.loads(strategy_params) if strategy_params else {}
+
+        if engine == "vectorized":
+            index, panel = universe_panel(frames)
+            positions, position_type = _vectorized_positions(
+                panel, strategy, strategy_params, sizer or 1
+            )
+            stats_dict, equity_curve = vectorized_back_test(
+                panel["close"],
+                positions,
+                cash=cash,
+                position_type=position_type,
+                return_equity=True,
+                names=list(frames),
+            )
+        elif engine == "cerebro":
+            sizer_params = json.loads(sizer_params) if sizer_params else {}
+            cerebro = _build_cerebro(
+                frames, strategy, strategy_params, sizer, sizer_params, None, {}, cash
+            )
+            cerebro.addanalyzer(bt.analyzers.TimeReturn, _name="time_return")
+            stats_dict = _run_cerebro(cerebro)
+            time_return = cerebro.runstrats[0][0].analyzers.time_return.get_analysis()
+            index = list(time_return.keys())
+            equity_curve = cash * np.cumprod(1 + np.array(list(time_return.values())))
+        else:
+            raise ValueError("engine must be 'cerebro' or 'vectorized'")
+
+        stats_dict["Universe"] = {
+            "requested": len(tickers),
+            "loaded": len(frames),
+            "missing": [t for t in tickers if t not in frames],
+        }
+
+        if save_fig:
+            directory = os.path.dirname(save_fig)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            from matplotlib import pyplot as plt
+
+            plt.figure(figsize=(12, 8))
+            plt.plot(index, equity_curve)
+            plt.title(f"Portfolio value ({len(frames)} tickers)")
+            plt.savefig(save_fig)
+            plt.close()
+
+        return "Back Test Finished. Results: \n" + pformat(stats_dict, indent=2)
+
+    def back_test_sweep(
+        ticker_symbol: Annotated[
+            str, "Ticker symbol of the stock (e.g., 'AAPL' for Apple)"
+        ],
+        start_date: Annotated[
+            str, "Start date of the historical data in 'YYYY-MM-DD' format"
+        ],
+        end_date: Annotated[
+            str, "End date of the historical data in 'YYYY-MM-DD' format"
+        ],
+        strategy: Annotated[
+            str,
+            "BackTrader Strategy class to be backtested. Can be pre-defined or custom. Pre-defined options: 'SMA_CrossOver'. If custom, provide module path and class name as a string like 'my_module:TestStrategy'.",
+        ],
+        param_grid: Annotated[
+            str,
+            "Parameter grid formatted as json string, mapping each strategy parameter to a list of values to try. E.g. {'fast': [5, 10, 20], 'slow': [30, 50]} for SMACross.",
+        ],
+        sizer: Annotated[
+            int | str | None,
+            "Sizer used for backtesting. Can be a fixed number or a custom Sizer class. If input is integer, a corresponding fixed sizer will be applied. If custom, provide module path and class name as a string like 'my_module:TestSizer'.",
+        ] = None,
+        sizer_params: Annotated[
+            str,
+            "Additional parameters to be passed to the sizer class formatted as json string.",
+        ] = "",
+        cash: Annotated[
+            float, "Initial cash amount for the backtest. Default to 10000.0"
+        ] = 10000.0,
+        engine: Annotated[
+            str,
+            "Backtest engine: 'cerebro' or 'vectorized'. Default to 'cerebro'.",
+        ] = "cerebro",
+        max_workers: Annotated[
+            int | None,
+            "Number of worker processes for cerebro runs. Default to the number of CPUs.",
+        ] = None,
+        save_path: SavePathType = None,
+    ) -> str:
+        """
+        Backtest every combination of a strategy parameter grid on one download of the price data,
+        running the combinations in parallel, and return them ranked by Sharpe ratio.
+        """
+        grid = json.loads(param_grid) if param_grid else {}
+        grid = {k: v if isinstance(v, list) else [v] for k, v in grid.items()}
+        combinations = [
+            dict(zip(grid.keys(), values)) for values in itertools.product(*grid.values())
+        ]
+        run_args = {
+            "strategy": strategy,
+            "sizer": sizer,
+            "sizer_params": json.loads(sizer_params) if sizer_params else {},
+            "cash": cash,
+        }
+
+        if engine == "vectorized":
+            _check_vectorized_args(strategy, sizer, sizer_params)
+
+        prices = load_prices(ticker_symbol, start_date, end_date)
+
+        if engine == "vectorized":
+            # Array runs are cheap enough that process start-up would dominate.
+            rows = [_sweep_worker(prices, params, engine, run_args) for params in combinations]
+        elif engine == "cerebro":
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(_sweep_worker, prices, params, engine, run_args)
+                    for params in combinations
+                ]
+                rows = [future.result() for future in futures]
+        else:
+            raise ValueError("engine must be 'cerebro' or 'vectorized'")
+
+        table = pd.DataFrame(rows).sort_values(
+            "Sharpe Ratio", ascending=False, na_position="last"
+        )
+        table = table.reset_index(drop=True)
+        save_output(table, f"parameter sweep of {strategy} on {ticker_symbol}", save_path)
+
+        return "Parameter Sweep Finished. Results: \n" + table.to_string()
+
 
 if __name__ == "__main__":
     # Example usage:
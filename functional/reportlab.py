@@ -19,8 +19,9 @@ from reportlab.lib.units import inch
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
 
-from data_sources import FMPUtils, YFinanceUtils
-from functional import ReportAnalysisUtils
+from data_sources import FMPUtils
+from functional.analyzer import KEY_DATA_INPUTS, format_key_data, key_data_tasks
+from utils import run_dag
 from typing import Annotated
 from pathlib import Path
 
@@ -31,6 +32,25 @@ relative_path = Path("../financial_annual_report")
 REPORT_DIRECTORY = relative_path.resolve()
 
 
+def prefetch_report_data(
+    ticker_symbol: Annotated[str, "ticker symbol"],
+    filing_date: Annotated[str, "filing date of the analyzed financial report"],
+    max_workers: Annotated[int, "number of fetches run concurrently"] = 8,
+) -> dict:
+    """
+    Everything build_annual_report reads from the data sources, fetched as a
+    dependency graph so independent calls overlap. The stock info is fetched
+    once and shared by the title, the metrics table and the key data table.
+    """
+    tasks = key_data_tasks(ticker_symbol, filing_date)
+    tasks["financial_metrics"] = (
+        lambda: FMPUtils.get_financial_metrics(ticker_symbol, years=5),
+        [],
+    )
+    tasks["key_data"] = (format_key_data, ["filing_date"] + KEY_DATA_INPUTS)
+    return run_dag(tasks, max_workers=max_workers)
+
+
 class ReportLabUtils:
 
     def build_annual_report(
@@ -65,6 +85,8 @@ class ReportLabUtils:
         risk assessment and share performance, PE & EPS performance charts all into a PDF report.
         """
         try:
+            snapshot = prefetch_report_data(ticker_symbol, filing_date)
+
             page_width, page_height = pagesizes.A4
             left_column_width = page_width * 2 / 3
             right_column_width = page_width - left_column_width
@@ -184,7 +206,7 @@ class ReportLabUtils:
                 ]
             )
 
-            name = YFinanceUtils.get_stock_info(ticker_symbol)["shortName"]
+            name = snapshot["info"]["shortName"]
 
 
             content = []
@@ -209,9 +231,9 @@ class ReportLabUtils:
             content.append(Paragraph(risk_assessment, custom_style))
 
             # content.append(Paragraph("Summarization", subtitle_style))
-            df = FMPUtils.get_financial_metrics(ticker_symbol, years=5)
+            df = snapshot["financial_metrics"].copy()
             df.reset_index(inplace=True)
-            currency = YFinanceUtils.get_stock_info(ticker_symbol)["currency"]
+            currency = snapshot["info"]["currency"]
             df.rename(columns={"index": f"FY ({currency} mn)"}, inplace=True)
             table_data = [["Financial Metrics"]]
             table_data += [df.columns.to_list()] + df.values.tolist()
@@ -253,7 +275,7 @@ class ReportLabUtils:
 
             # content.append(Paragraph("", custom_style))
             content.append(Spacer(1, 0.15 * inch))
-            key_data = ReportAnalysisUtils.get_key_data(ticker_symbol, filing_date)
+            key_data = snapshot["key_data"]
           
             data = [["Key data", ""]]
             data += [[k, v] for k, v in key_data.items()]
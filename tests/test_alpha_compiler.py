@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from functional.alpha_compiler import AlphaSyntaxError, compile_alphas, evaluate_alphas
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, (40, 5)), axis=0)
+    return {
+        "open": close * (1 + rng.normal(0, 0.01, close.shape)),
+        "high": close * 1.02,
+        "low": close * 0.98,
+        "close": close,
+        "volume": rng.uniform(1e5, 1e6, close.shape),
+    }
+
+
+def _assert(actual, expected):
+    np.testing.assert_allclose(actual, np.asarray(expected, dtype=float), rtol=1e-9, equal_nan=True)
+
+
+def test_shared_subexpressions_are_compiled_once():
+    program = compile_alphas({"a": "rank(delta(close, 5))", "b": "-1 * rank(delta(close, 5))"})
+    # Evaluated: close, delta, rank, the folded -1 constant and the product.
+    assert len(program._schedule()) == 5
+    assert program.outputs["b"].args[0] is program.outputs["a"]
+    assert program.stats()["terms_parsed"] > program.stats()["unique_nodes"]
+
+
+def test_commutative_operands_and_constants_are_normalized():
+    program = compile_alphas({"a": "close * volume", "b": "volume * close", "c": "close * volume * (2 + 3)"})
+    assert program.outputs["a"] is program.outputs["b"]
+    # Evaluated: close, volume, close * volume, the folded constant 5 and the final product.
+    assert len(program._schedule()) == 5
+
+
+def test_paper_alphas_match_hand_computation(data):
+    alphas = {
+        "101": "Alpha#101: ((close - open) / ((high - low) + .001))",
+        "12": "Alpha#12: (sign(delta(volume, 1)) * (-1 * delta(close, 1)))",
+        "6": "Alpha#6: (-1 * correlation(open, volume, 10))",
+    }
+    out = evaluate_alphas(alphas, data)
+    close, volume = pd.DataFrame(data["close"]), pd.DataFrame(data["volume"])
+    _assert(out["101"], (data["close"] - data["open"]) / ((data["high"] - data["low"]) + 0.001))
+    _assert(out["12"], np.sign(volume.diff()) * (-1 * close.diff()))
+    _assert(out["6"], -1 * pd.DataFrame(data["open"]).rolling(10).corr(volume))
+
+
+def test_ternary_and_comparison(data):
+    out = evaluate_alphas("((close > open) ? 1 : -1)", data)
+    _assert(list(out.values())[0], np.where(data["close"] > data["open"], 1.0, -1.0))
+
+
+def test_leading_label_names_the_alpha(data):
+    out = evaluate_alphas(["Alpha#101: ((close - open) / ((high - low) + .001))"], data)
+    assert list(out) == ["Alpha#101"]
+
+
+def test_derived_inputs_are_added(data):
+    out = evaluate_alphas({"r": "returns", "v": "vwap"}, data)
+    _assert(out["r"][1:], data["close"][1:] / data["close"][:-1] - 1)
+    _assert(out["v"], (data["high"] + data["low"] + data["close"]) / 3)
+
+
+def test_errors():
+    with pytest.raises(AlphaSyntaxError):
+        compile_alphas("rank(close")
+    with pytest.raises(KeyError):
+        compile_alphas("cap").evaluate({"close": np.ones((3, 2))})
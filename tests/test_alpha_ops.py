@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from functional import alpha_ops
+
+D = 5
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(40, 6))
+
+
+@pytest.fixture
+def other():
+    rng = np.random.default_rng(1)
+    return rng.normal(size=(40, 6))
+
+
+def _assert(actual, expected):
+    np.testing.assert_allclose(actual, np.asarray(expected, dtype=float), rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+def test_rolling_moments_match_pandas(panel, other):
+    frame, other_frame = pd.DataFrame(panel), pd.DataFrame(other)
+    _assert(alpha_ops.ts_sum(panel, D), frame.rolling(D).sum())
+    _assert(alpha_ops.ts_mean(panel, D), frame.rolling(D).mean())
+    _assert(alpha_ops.stddev(panel, D), frame.rolling(D).std(ddof=0))
+    _assert(alpha_ops.covariance(panel, other, D), frame.rolling(D).cov(other_frame, ddof=0))
+    _assert(alpha_ops.correlation(panel, other, D), frame.rolling(D).corr(other_frame))
+
+
+def test_rolling_extremes_match_pandas(panel):
+    frame = pd.DataFrame(panel)
+    _assert(alpha_ops.ts_min(panel, D), frame.rolling(D).min())
+    _assert(alpha_ops.ts_max(panel, D), frame.rolling(D).max())
+    _assert(alpha_ops.ts_product(panel, D), frame.rolling(D).apply(np.prod, raw=True))
+    _assert(alpha_ops.ts_argmax(panel, D), frame.rolling(D).apply(np.argmax, raw=True) + 1)
+    _assert(alpha_ops.ts_argmin(panel, D), frame.rolling(D).apply(np.argmin, raw=True) + 1)
+    _assert(alpha_ops.ts_rank(panel, D), frame.rolling(D).rank(pct=True))
+
+
+def test_ts_rank_averages_ties():
+    x = np.array([1.0, 2.0, 2.0, 2.0, 3.0, 2.0])
+    _assert(alpha_ops.ts_rank(x, 3)[:, 0], pd.Series(x).rolling(3).rank(pct=True))
+
+
+def test_decay_linear_weights_recent_days_most(panel):
+    weights = np.arange(1, D + 1) / np.arange(1, D + 1).sum()
+    expected = pd.DataFrame(panel).rolling(D).apply(lambda w: (w * weights).sum(), raw=True)
+    _assert(alpha_ops.decay_linear(panel, D), expected)
+
+
+def test_delay_and_delta_match_shift(panel):
+    frame = pd.DataFrame(panel)
+    _assert(alpha_ops.delay(panel, 3), frame.shift(3))
+    _assert(alpha_ops.delta(panel, 3), frame - frame.shift(3))
+
+
+def test_float_windows_are_floored(panel):
+    _assert(alpha_ops.ts_sum(panel, 5.9), alpha_ops.ts_sum(panel, 5))
+
+
+def test_nan_in_window_yields_nan(panel):
+    panel[10, 0] = np.nan
+    out = alpha_ops.ts_mean(panel, D)
+    assert np.isnan(out[10 : 10 + D, 0]).all()
+    assert not np.isnan(out[10 + D :, 0]).any()
+    assert not np.isnan(out[D - 1 :, 1]).any()
+
+
+def test_rank_matches_pandas_pct_rank(panel):
+    panel[3, 2] = np.nan
+    panel[4, :3] = 1.0  # ties
+    _assert(alpha_ops.rank(panel), pd.DataFrame(panel).rank(axis=1, pct=True))
+
+
+def test_scale_and_indneutralize():
+    x = np.array([[1.0, -3.0, 4.0, np.nan]])
+    _assert(alpha_ops.scale(x, 2.0), [[0.25, -0.75, 1.0, np.nan]])
+    groups = np.array([0, 0, 1, 1])
+    _assert(alpha_ops.indneutralize(x, groups), [[2.0, -2.0, 0.0, np.nan]])
+    _assert(alpha_ops.signedpower(np.array([-2.0, 3.0]), 2)[:, 0], [-4.0, 9.0])
@@ -0,0 +1,32 @@
+import numpy as np
+
+from functional.alpha_compiler import evaluate_alphas
+from functional.alpha_stream import StreamingAlphaProgram
+
+ALPHAS = {
+    "momentum": "rank(ts_sum(returns, 5))",
+    "vwap_volume": "correlation(vwap, volume, 5)",
+    "reversal": "-1 * delta(close, 2) * returns",
+}
+
+
+def _ohlcv(days=30, tickers=6, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, (days, tickers)), axis=0)
+    return {
+        "open": close * (1 + rng.normal(0, 0.005, (days, tickers))),
+        "high": close * 1.01,
+        "low": close * 0.99,
+        "close": close,
+        "volume": rng.uniform(1e5, 1e6, (days, tickers)),
+    }
+
+
+def test_push_raw_ohlcv_matches_batch():
+    data = _ohlcv()
+    batch = evaluate_alphas(ALPHAS, data)
+    stream = StreamingAlphaProgram(ALPHAS, n_tickers=data["close"].shape[1])
+    for t in range(len(data["close"])):
+        latest = stream.push({k: v[t] for k, v in data.items()})
+        for name in ALPHAS:
+            np.testing.assert_allclose(latest[name], batch[name][t], rtol=1e-8, equal_nan=True)
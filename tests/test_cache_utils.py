@@ -0,0 +1,30 @@
+import os
+import time
+
+from data_sources.cache_utils import TTLCache
+
+
+def test_expired_disk_entry_is_removed_on_read(tmp_path):
+    cache = TTLCache(disk_path=str(tmp_path))
+    cache.set("key", "value", ttl=0.01)
+    time.sleep(0.02)
+    assert TTLCache(disk_path=str(tmp_path)).get("key") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_sweep_keeps_disk_within_file_budget(tmp_path):
+    cache = TTLCache(disk_path=str(tmp_path), disk_max_files=3)
+    for i in range(5):
+        cache.set(i, i)
+        time.sleep(0.01)  # distinct mtimes, so the oldest files go first
+    cache.sweep_disk()
+    assert len(os.listdir(tmp_path)) == 3
+    assert TTLCache(disk_path=str(tmp_path)).get(4) == 4
+
+
+def test_clear_removes_disk_entries(tmp_path):
+    cache = TTLCache(disk_path=str(tmp_path))
+    cache.set("key", "value")
+    cache.clear()
+    assert cache.get("key") is None
+    assert os.listdir(tmp_path) == []
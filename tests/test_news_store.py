@@ -0,0 +1,83 @@
+import os
+
+import pandas as pd
+import pytest
+
+from data_sources import news_store
+from data_sources.news_store import NewsStore, split_range
+
+
+class StubFetcher:
+    """One article per day at noon UTC; records every requested window."""
+
+    def __init__(self, fail_on=()):
+        self.calls = []
+        self.fail_on = set(fail_on)
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        if start in self.fail_on:
+            raise RuntimeError(f"window {start} failed")
+        days = pd.date_range(start, end, inclusive="left")
+        return pd.DataFrame(
+            {
+                "id": [int(d.strftime("%Y%m%d")) for d in days],
+                "datetime": [int((d + pd.Timedelta(hours=12)).timestamp()) for d in days],
+                "headline": [f"news {d.date()}" for d in days],
+            }
+        )
+
+
+def test_split_range():
+    assert split_range("2020-01-01", "2020-01-16", 7) == [
+        ["2020-01-01", "2020-01-08"],
+        ["2020-01-08", "2020-01-15"],
+        ["2020-01-15", "2020-01-16"],
+    ]
+
+
+def test_only_gaps_are_fetched(tmp_path):
+    store, fetch = NewsStore(str(tmp_path)), StubFetcher()
+    first = store.get("AAA", "2020-01-01", "2020-01-15", fetch, window_days=7)
+    second = store.get("AAA", "2020-01-10", "2020-01-20", fetch, window_days=7)
+    assert sorted(fetch.calls) == [
+        ("2020-01-01", "2020-01-08"),
+        ("2020-01-08", "2020-01-15"),
+        ("2020-01-15", "2020-01-20"),
+    ]
+    assert len(first) == 14 and len(second) == 10
+    assert store.coverage("AAA") == [["2020-01-01", "2020-01-20"]]
+
+
+def test_articles_repeated_across_windows_are_kept_once(tmp_path):
+    store = NewsStore(str(tmp_path))
+    fetch = StubFetcher()
+    store.add("AAA", fetch("2020-01-01", "2020-01-08"), ["2020-01-01", "2020-01-08"])
+    store.add("AAA", fetch("2020-01-05", "2020-01-10"), ["2020-01-05", "2020-01-10"])
+    articles = store.read("AAA", "2020-01-01", "2020-01-10")
+    assert articles["id"].is_unique and len(articles) == 9
+    assert articles["datetime"].is_monotonic_increasing
+
+
+def test_failed_window_keeps_the_others(tmp_path):
+    store = NewsStore(str(tmp_path))
+    failing = StubFetcher(fail_on={"2020-01-08"})
+    with pytest.raises(RuntimeError, match="2020-01-08"):
+        store.get("AAA", "2020-01-01", "2020-01-22", failing, window_days=7)
+    assert store.coverage("AAA") == [["2020-01-01", "2020-01-08"], ["2020-01-15", "2020-01-22"]]
+
+    retry = StubFetcher()
+    articles = store.get("AAA", "2020-01-01", "2020-01-22", retry, window_days=7)
+    assert retry.calls == [("2020-01-08", "2020-01-15")]
+    assert len(articles) == 21
+
+
+def test_read_loads_only_overlapping_windows(tmp_path, monkeypatch):
+    monkeypatch.setattr(news_store, "USE_PARQUET", False)
+    store, fetch = NewsStore(str(tmp_path)), StubFetcher()
+    store.get("AAA", "2020-01-01", "2020-03-01", fetch, window_days=7)
+    loaded, read_pickle = [], pd.read_pickle
+    monkeypatch.setattr(pd, "read_pickle", lambda p: loaded.append(os.path.basename(p)) or read_pickle(p))
+    articles = store.read("AAA", "2020-01-10", "2020-01-12")
+    assert len(articles) == 2
+    assert loaded == ["2020-01-08_2020-01-15.pkl"]
@@ -0,0 +1,81 @@
+import pandas as pd
+
+from data_sources.price_store import PriceStore, merge_ranges, missing_ranges
+
+
+class StubFetcher:
+    """Business-day bars whose close is `level`; records every requested range."""
+
+    def __init__(self, level=1.0):
+        self.level = level
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        if self.fail:
+            return pd.DataFrame()
+        index = pd.bdate_range(start, end, inclusive="left")
+        return pd.DataFrame({"Close": self.level, "Volume": 100.0}, index=index)
+
+
+def test_merge_and_missing_ranges():
+    assert merge_ranges([["2020-03-01", "2020-04-01"], ["2020-01-01", "2020-03-01"]]) == [
+        ["2020-01-01", "2020-04-01"]
+    ]
+    covered = [["2020-02-01", "2020-03-01"]]
+    assert missing_ranges(covered, "2020-01-01", "2020-04-01") == [
+        ["2020-01-01", "2020-02-01"],
+        ["2020-03-01", "2020-04-01"],
+    ]
+    assert missing_ranges(covered, "2020-02-10", "2020-02-20") == []
+
+
+def test_only_gaps_are_fetched(tmp_path):
+    store, fetch = PriceStore(str(tmp_path)), StubFetcher()
+    first = store.get("AAA", "2020-01-01", "2020-02-01", fetch)
+    second = store.get("AAA", "2020-01-15", "2020-03-02", fetch)
+    assert fetch.calls == [("2020-01-01", "2020-02-01"), ("2020-02-01", "2020-03-02")]
+    assert len(first) == len(pd.bdate_range("2020-01-01", "2020-02-01", inclusive="left"))
+    assert second.index.min() == pd.Timestamp("2020-01-15")
+    assert store.coverage("AAA") == [["2020-01-01", "2020-03-02"]]
+
+
+def test_empty_fetch_is_not_covered(tmp_path):
+    store, fetch = PriceStore(str(tmp_path)), StubFetcher()
+    fetch.fail = True
+    assert store.get("AAA", "2020-01-01", "2020-02-01", fetch).empty
+    assert store.coverage("AAA") == []
+    fetch.fail = False
+    assert not store.get("AAA", "2020-01-01", "2020-02-01", fetch).empty
+    assert len(fetch.calls) == 2
+
+
+def test_weekend_gap_is_not_fetched(tmp_path):
+    store, fetch = PriceStore(str(tmp_path)), StubFetcher()
+    store.get("AAA", "2020-01-04", "2020-01-06", fetch)  # Saturday and Sunday
+    assert fetch.calls == []
+    assert store.coverage("AAA") == [["2020-01-04", "2020-01-06"]]
+
+
+def test_new_corporate_action_drops_stored_bars(tmp_path):
+    store, fetch = PriceStore(str(tmp_path)), StubFetcher(level=100.0)
+    actions = [["2019-06-01", 0.5, 0.0]]
+    store.get("AAA", "2020-01-01", "2020-02-01", fetch, actions=lambda: actions)
+    store.get("AAA", "2020-01-01", "2020-02-01", fetch, actions=lambda: actions)
+    assert len(fetch.calls) == 1
+
+    # A 2:1 split: the provider now serves every past bar on the new basis.
+    actions = actions + [["2021-01-04", 0.0, 2.0]]
+    fetch.level = 50.0
+    bars = store.get("AAA", "2020-01-01", "2020-03-02", fetch, actions=lambda: actions)
+    assert fetch.calls[-1] == ("2020-01-01", "2020-03-02")
+    assert (bars["Close"] == 50.0).all()
+
+
+def test_empty_actions_answer_keeps_stored_bars(tmp_path):
+    store, fetch = PriceStore(str(tmp_path)), StubFetcher()
+    actions = [["2019-06-01", 0.5, 0.0]]
+    store.get("AAA", "2020-01-01", "2020-02-01", fetch, actions=lambda: actions)
+    store.get("AAA", "2020-01-01", "2020-02-01", fetch, actions=lambda: [])
+    assert len(fetch.calls) == 1
@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+from utils import run_dag
+
+
+def test_results_flow_along_dependencies():
+    order = []
+
+    def task(name, value):
+        def run(*args):
+            order.append(name)
+            return value(*args)
+
+        return run
+
+    results = run_dag(
+        {
+            "total": (task("total", lambda a, b: a + b), ["a", "b"]),
+            "a": (task("a", lambda: 2), []),
+            "b": (task("b", lambda a: a * 10), ["a"]),
+            "report": (task("report", lambda b, total: f"{b}/{total}"), ["b", "total"]),
+        }
+    )
+    assert results == {"a": 2, "b": 20, "total": 22, "report": "20/22"}
+    assert order.index("a") < order.index("b") < order.index("total") < order.index("report")
+
+
+def test_independent_tasks_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+    tasks = {name: (lambda: barrier.wait() is not None, []) for name in "xyz"}
+    assert run_dag(tasks, max_workers=3) == {"x": True, "y": True, "z": True}
+
+
+def test_invalid_graphs_raise_value_error():
+    with pytest.raises(ValueError, match="unknown"):
+        run_dag({"a": (lambda m: m, ["missing"])})
+    with pytest.raises(ValueError, match="cycle"):
+        run_dag({"root": (lambda: 1, []), "a": (lambda b: b, ["b"]), "b": (lambda a: a, ["a"])})
+
+
+def test_task_exception_is_raised_and_dependents_skipped():
+    ran = []
+
+    def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_dag({"a": (boom, []), "b": (lambda a: ran.append(a), ["a"])})
+    assert ran == []
@@ -0,0 +1,43 @@
+from data_sources.section_store import SectionStore
+
+
+def test_put_same_text_twice_keeps_entry(tmp_path):
+    store = SectionStore(root=str(tmp_path))
+    store.put("AAPL_2023_7", "management discussion")
+    store.put("AAPL_2023_7", "management discussion")
+    assert store.get("AAPL_2023_7") == "management discussion"
+    assert store.stats()["sections"] == 1
+
+
+def test_put_new_text_replaces_entry(tmp_path):
+    store = SectionStore(root=str(tmp_path))
+    store.put("AAPL_2023_7", "old")
+    store.put("AAPL_2023_7", "new")
+    assert store.get("AAPL_2023_7") == "new"
+    assert store.stats()["sections"] == 1
+
+
+def test_shared_blob_survives_other_key_rewrite(tmp_path):
+    store = SectionStore(root=str(tmp_path))
+    store.put("AAPL_2023_7", "same")
+    store.put("AAPL_2024_7", "same")
+    store.put("AAPL_2023_7", "other")
+    assert store.get("AAPL_2024_7") == "same"
+
+
+def test_oversized_entry_is_not_evicted_by_its_own_put(tmp_path):
+    store = SectionStore(root=str(tmp_path), max_bytes=1)
+    store.put("AAPL_2023_1", "first section")
+    store.put("AAPL_2023_7", "second section")
+    assert store.get("AAPL_2023_7") == "second section"
+    assert store.get("AAPL_2023_1") is None
+
+
+def test_legacy_import_keeps_the_txt_file(tmp_path):
+    legacy = tmp_path / "legacy"
+    legacy.mkdir()
+    (legacy / "MSFT_2023_7.txt").write_text("legacy section")
+    store = SectionStore(root=str(tmp_path / "store"), legacy_root=str(legacy))
+    assert store.get_or_import_legacy("MSFT_2023_7") == "legacy section"
+    assert (legacy / "MSFT_2023_7.txt").read_text() == "legacy section"
+    assert store.get("MSFT_2023_7") == "legacy section"
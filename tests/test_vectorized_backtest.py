@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+bt = pytest.importorskip("backtrader")
+quantitative = pytest.importorskip("functional.quantitative")
+
+
+def test_shares_pnl_matches_hand_computation():
+    prices = np.array([10.0, 11.0, 12.0, 11.0])
+    positions = np.array([1.0, 1.0, 0.0, 0.0])
+    stats, value = quantitative.vectorized_back_test(
+        prices, positions, cash=100.0, return_equity=True
+    )
+    np.testing.assert_allclose(value, [100.0, 101.0, 102.0, 102.0])
+    assert stats["Final Portfolio Value"] == 102.0
+    assert stats["Trade Analysis"]["total"] == {"total": 1, "open": 0, "closed": 1}
+
+
+def test_full_weight_tracks_the_price():
+    prices = np.array([10.0, 12.0, 9.0, 15.0])
+    _, value = quantitative.vectorized_back_test(
+        prices, np.ones(4), cash=100.0, position_type="weights", return_equity=True
+    )
+    np.testing.assert_allclose(value, 100.0 * prices / prices[0])
+
+
+def test_sharpe_is_annualised_from_daily_returns():
+    rng = np.random.default_rng(1)
+    prices = 100 * np.cumprod(1 + rng.normal(0.001, 0.01, 300))
+    stats, value = quantitative.vectorized_back_test(
+        prices, np.ones(300), cash=1000.0, position_type="weights", return_equity=True
+    )
+    returns = np.diff(value, prepend=1000.0) / np.concatenate([[1000.0], value[:-1]])
+    daily_rate = (1 + quantitative.RISK_FREE_RATE) ** (1 / 252) - 1
+    expected = (returns - daily_rate).mean() / returns.std() * np.sqrt(252)
+    assert stats["Sharpe Ratio"]["sharperatio"] == pytest.approx(expected)
+
+
+def test_wiped_out_account_stays_at_zero():
+    prices = np.array([10.0, 5.0, 1.0, 20.0])
+    stats, value = quantitative.vectorized_back_test(
+        prices, np.full(4, 5.0), cash=10.0, return_equity=True
+    )
+    np.testing.assert_allclose(value, [10.0, 0.0, 0.0, 0.0])
+    assert stats["Returns"]["rtot"] == float("-inf")
+    assert stats["Returns"]["rnorm100"] == -100.0
+    assert stats["Drawdown"]["max"]["drawdown"] == 100.0
+
+
+def test_cerebro_sharpe_uses_daily_annualised_returns():
+    index = pd.bdate_range("2020-01-01", periods=60)
+    frame = pd.DataFrame(
+        {"Open": 1.0, "High": 1.0, "Low": 1.0, "Close": 1.0, "Volume": 1.0}, index=index
+    )
+    cerebro = quantitative._build_cerebro(
+        frame, "SMA_CrossOver", {}, None, {}, None, {}, 10000.0
+    )
+    kwargs = next(kw for cls, _, kw in cerebro.analyzers if cls is bt.analyzers.SharpeRatio)
+    assert kwargs["timeframe"] == bt.TimeFrame.Days
+    assert kwargs["annualize"] is True
+    assert kwargs["riskfreerate"] == quantitative.RISK_FREE_RATE
@@ -1,6 +1,13 @@
 import os
 import json
+import time
+import bisect
+import threading
+import contextvars
 import pandas as pd
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import wraps
 from datetime import date, timedelta, datetime
 from typing import Annotated
 
@@ -56,3 +63,192 @@ def get_next_weekday(date):
         return next_weekday
     else:
         return date
+
+
+# Tool-call instrumentation
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float("inf")]
+
+# Counters of the tool call running in the current context; I/O layers
+# (HTTP, caches, stores) add to them through record_io.
+_current_call = contextvars.ContextVar("current_tool_call", default=None)
+_record_lock = threading.Lock()
+
+
+def record_io(bytes_received: int = 0, cache_hit: bool | None = None) -> None:
+    """Attribute received bytes and a cache hit/miss to the tool call in progress, if any."""
+    call = _current_call.get()
+    if call is None:
+        return
+    with _record_lock:
+        call["bytes"] += bytes_received
+        if cache_hit is True:
+            call["cache_hits"] += 1
+        elif cache_hit is False:
+            call["cache_misses"] += 1
+
+
+def in_current_context(func):
+    """
+    Bind func to the caller's context, so work it does on a thread pool is
+    still attributed to the tool call that submitted it.
+    """
+    context = contextvars.copy_context()
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
+
+
+class MetricsRegistry:
+    """
+    In-process statistics of every instrumented tool: calls, errors, bytes,
+    cache hits/misses and a latency histogram. Percentiles come from the most
+    recent ``samples`` latencies of each tool.
+    """
+
+    def __init__(self, samples: int = 4096):
+        self.samples = samples
+        self._lock = threading.Lock()
+        self._tools = {}
+
+    def observe(self, tool: str, seconds: float, call: dict, error: bool) -> None:
+        with self._lock:
+            stats = self._tools.get(tool)
+            if stats is None:
+                stats = self._tools[tool] = {
+                    "calls": 0,
+                    "errors": 0,
+                    "seconds": 0.0,
+                    "bytes": 0,
+                    "cache_hits": 0,
+                    "cache_misses": 0,
+                    "buckets": [0] * len(LATENCY_BUCKETS),
+                    "latencies": deque(maxlen=self.samples),
+                }
+            stats["calls"] += 1
+            stats["errors"] += error
+            stats["seconds"] += seconds
+            stats["bytes"] += call["bytes"]
+            stats["cache_hits"] += call["cache_hits"]
+            stats["cache_misses"] += call["cache_misses"]
+            stats["buckets"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats["latencies"].append(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tools.clear()
+
+    def snapshot(self) -> dict:
+        """Per tool totals and p50/p90/p99 latency, slowest tools first."""
+        with self._lock:
+            tools = {
+                tool: dict(stats, latencies=sorted(stats["latencies"]))
+                for tool, stats in self._tools.items()
+            }
+        output = {}
+        for tool, stats in sorted(tools.items(), key=lambda item: -item[1]["seconds"]):
+            latencies = stats.pop("latencies")
+            stats.pop("buckets")
+            for q in (50, 90, 99):
+                index = min(int(len(latencies) * q / 100), len(latencies) - 1)
+                stats[f"p{q}"] = latencies[index]
+            output[tool] = stats
+        return output
+
+    def to_json(self, save_path: SavePathType = None) -> str:
+        text = json.dumps(self.snapshot(), indent=2)
+        if save_path:
+            with open(save_path, "w") as f:
+                f.write(text)
+        return text
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format."""
+        with self._lock:
+            tools = {tool: dict(stats) for tool, stats in self._tools.items()}
+        counters = [
+            ("tool_calls_total", "calls", "Tool calls."),
+            ("tool_errors_total", "errors", "Tool calls that raised."),
+            ("tool_bytes_received_total", "bytes", "Bytes received from providers."),
+            ("tool_cache_hits_total", "cache_hits", "Cache hits during tool calls."),
+            ("tool_cache_misses_total", "cache_misses", "Cache misses during tool calls."),
+        ]
+        lines = []
+        for name, key, help_text in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f'{name}{{tool="{tool}"}} {stats[key]}' for tool, stats in tools.items()]
+        lines += [
+            "# HELP tool_latency_seconds Tool call wall time.",
+            "# TYPE tool_latency_seconds histogram",
+        ]
+        for tool, stats in tools.items():
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'tool_latency_seconds_bucket{{tool="{tool}",le="{le}"}} {cumulative}')
+            lines.append(f'tool_latency_seconds_sum{{tool="{tool}"}} {stats["seconds"]}')
+            lines.append(f'tool_latency_seconds_count{{tool="{tool}"}} {stats["calls"]}')
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+def instrument(func):
+    """Record wall time, bytes, cache hits/misses and errors of every call into METRICS."""
+    tool = func.__qualname__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        call = {"bytes": 0, "cache_hits": 0, "cache_misses": 0}
+        token = _current_call.set(call)
+        start = time.perf_counter()
+        error = False
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            error = True
+            raise
+        finally:
+            _current_call.reset(token)
+            METRICS.observe(tool, time.perf_counter() - start, call, error)
+
+    return wrapper
+
+
+def run_dag(
+    tasks: Annotated[
+        dict,
+        "name -> (callable, [names of the tasks whose results it takes as positional arguments])",
+    ],
+    max_workers: Annotated[int, "number of tasks run concurrently"] = 8,
+) -> dict:
+    """
+    Run a small dependency graph of tasks on a thread pool, each as soon as its
+    dependencies are done, and return every task's result by name. The first
+    failing task's exception is raised.
+    """
+    for name, (_, deps) in tasks.items():
+        unknown = [d for d in deps if d not in tasks]
+        if unknown:
+            raise ValueError(f"Task {name} depends on unknown tasks {unknown}")
+
+    results, running = {}, {}
+    pending = dict(tasks)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            ready = [n for n, (_, deps) in pending.items() if all(d in results for d in deps)]
+            if not ready and not running:
+                raise ValueError(f"Tasks {sorted(pending)} form a dependency cycle")
+            for name in ready:
+                func, deps = pending.pop(name)
+                args = [results[d] for d in deps]
+                running[executor.submit(in_current_context(func), *args)] = name
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return results